@@ -0,0 +1,86 @@
+##
+# @file algorithms.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the circuit lists of the algorithms of Deutsch and Grover without the GUI.
+#
+##
+
+## number of positions of a circuit built in the GUI.
+NUMBER_OF_POSITIONS = 15
+
+##
+# @class Algorithms
+# @brief Build the circuit lists of the algorithms offered in the GUI, so they can be simulated without drawing them.
+##
+class Algorithms(object):
+
+    ## Builds an empty circuit of the size of the GUI grid.
+    # @param numberOfQubits
+    # The number of lanes.
+    # @return Returns a list of lanes filled with "0".
+    ##
+    def buildEmptyCircuit(self, numberOfQubits):
+        return [["0"] * NUMBER_OF_POSITIONS for _ in range(numberOfQubits)]
+
+    ## Builds the algorithm of Deutsch. Whether its oracle is constant or balanced is decided by the simulator.
+    # @return Returns the circuit list with two lanes.
+    ##
+    def buildDeutschCircuit(self):
+        circuit = self.buildEmptyCircuit(2)
+        circuit[1][0] = "Pauli-X-Gate"
+        circuit[0][1] = "Hadamard Gate"
+        circuit[1][1] = "Hadamard Gate"
+        circuit[0][2] = "Deutsch OracleC"
+        circuit[1][2] = "Deutsch Oracle"
+        circuit[0][3] = "Hadamard Gate"
+        circuit[1][3] = "Hadamard Gate"
+        circuit[0][4] = "Measurement"
+        circuit[1][4] = "Measurement"
+
+        return circuit
+
+    ## Draws the bit sequence searched by the algorithm of Grover.
+    # @param rng
+    # A numpy Generator.
+    # @return Returns a list [x1, x2].
+    ##
+    def randomBitSequence(self, rng):
+        return [int(bit) for bit in rng.integers(0, 2, size=2)]
+
+    ## Builds the algorithm of Grover for two bits as inserted by GuiCircuit.algorithmGrover. q0 is x1, q1 is x2 and q2 is the oracle qubit.
+    # @param bitSequence
+    # The searched bit sequence [x1, x2].
+    # @return Returns the circuit list with three lanes.
+    ##
+    def buildGroverCircuit(self, bitSequence):
+        circuit = self.buildEmptyCircuit(3)
+        circuit[2][0] = "Pauli-X-Gate"
+        for lane in range(3):
+            circuit[lane][1] = "Hadamard Gate"
+
+        #the oracle marks the bit sequence, bits that are 0 are flipped around the Toffoli Gate
+        for lane in range(2):
+            if bitSequence[lane] == 0:
+                circuit[lane][2] = "Pauli-X-Gate"
+                circuit[lane][4] = "Pauli-X-Gate"
+        circuit[0][3] = "Toffoli1"
+        circuit[1][3] = "Toffoli2"
+        circuit[2][3] = "Toffoli Gate"
+
+        #diffusion
+        for lane in range(2):
+            circuit[lane][5] = "Hadamard Gate"
+            circuit[lane][6] = "Pauli-X-Gate"
+        circuit[1][7] = "Hadamard Gate"
+        circuit[0][8] = "Control"
+        circuit[1][8] = "CNot Gate"
+        circuit[1][9] = "Hadamard Gate"
+        for lane in range(2):
+            circuit[lane][10] = "Pauli-X-Gate"
+            circuit[lane][11] = "Hadamard Gate"
+
+        return circuit
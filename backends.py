@@ -0,0 +1,351 @@
+##
+# @file backends.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the registry of all simulators a Simulator can use and the description of their capabilities.
+#
+##
+
+import os
+import tempfile
+import importlib
+
+import numpy as np
+
+from circuitCompiler import IDENTITY, PAULI_X, PAULI_Y, PAULI_Z, HADAMARD, S_GATE, T_GATE, MEASUREMENT, FUSED
+from matSim import MATRIX_ARRAYS, STATEVECTOR_ARRAYS
+
+## entry point group other packages use to add simulators, e.g. [project.entry-points."quasim.backends"] myengine = "mypackage.backend:MyBackend"
+ENTRY_POINT_GROUP = "quasim.backends"
+## largest number of Qubits of a circuit with non Clifford gates that is moved from the stabilizer to the statevector simulator.
+STABILIZER_FALLBACK_LIMIT = 25
+
+## opcodes of the gates acting on a single lane.
+singleLaneOpcodes = (IDENTITY, PAULI_X, PAULI_Y, PAULI_Z, HADAMARD, S_GATE, T_GATE, MEASUREMENT, FUSED)
+
+##
+# @class Backend
+# @brief Base class of all simulators a Simulator can use. A backend describes what it can simulate and how expensive it is, and is created on first use.
+# supports and cost are class methods, so a Simulator can compare backends without creating them.
+##
+class Backend(object):
+
+    ## opcodes of the gates the backend can simulate. None for all gates.
+    opcodes = None
+    ## largest number of Qubits the backend can simulate. None for no limit.
+    maxQubits = None
+    ## True if the backend simulates whole circuits.
+    wholeCircuit = True
+    ## True if the backend simulates every lane on its own.
+    singleLane = False
+    ## True if the backend computes the final state vector with runState, the Simulator then builds probabilities, caches and samples it.
+    statevector = False
+    ## True if the backend itself samples the circuit, so every run returns other shots.
+    samples = False
+    ## True if the result is exact and not approximated.
+    exact = True
+
+    ##
+    # init method storing the Simulator the backend belongs to. Its engines, random numbers and settings are shared by all backends.
+    # @param simulator
+    # The Simulator.
+    ##
+    def __init__(self, simulator):
+        self.simulator = simulator
+
+    ## Checks whether the backend can simulate a circuit.
+    # @param simulator
+    # The Simulator.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @return Returns True if all gates and the number of Qubits are supported.
+    ##
+    @classmethod
+    def supports(cls, simulator, compiledCircuit):
+        if cls.maxQubits is not None and compiledCircuit.numberOfQubits > cls.maxQubits:
+            return False
+        if cls.opcodes is not None and any(opcode not in cls.opcodes for opcode, qubits, matrix in compiledCircuit.instructions):
+            return False
+        return True
+
+    ## Estimates the number of floating point operations of a simulation, used to choose a backend.
+    # @param simulator
+    # The Simulator.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @return Returns the estimated cost.
+    ##
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        return float("inf")
+
+    ## Simulates a whole circuit up to its final state. Only called if statevector is True.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @return Returns the manipulation matrix, None if it is not computed, and the final state vector of shape (2^numberOfQubits, 1).
+    ##
+    def runState(self, compiledCircuit):
+        raise NotImplementedError
+
+    ## Simulates a whole circuit. Only called if statevector is False.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @param circuit
+    # The circuit list the CompiledCircuit was compiled from, with all gaps filled.
+    # @param repetitions
+    # The number of shots, None for the result of the backend.
+    # @return Returns the result of the simulation.
+    ##
+    def simulate(self, compiledCircuit, circuit, repetitions):
+        raise NotImplementedError
+
+    ## Simulates every lane of a circuit on its own. Only called if singleLane is True.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @return Returns a list with a list containing the result of every lane.
+    ##
+    def simulateLanes(self, compiledCircuit):
+        raise NotImplementedError
+
+##
+# @class TruthTableBackend
+# @brief Single lane simulation with the truth tables of TableSim.
+##
+class TruthTableBackend(Backend):
+    opcodes = singleLaneOpcodes
+    wholeCircuit = False
+    singleLane = True
+    exact = False
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        return len(compiledCircuit.instructions)
+
+    def simulateLanes(self, compiledCircuit):
+        return [[self.simulator.tableSim.simulateCompiledLane(compiledCircuit, lane)] for lane in range(compiledCircuit.numberOfQubits)]
+
+##
+# @class MatrixBackend
+# @brief Whole circuit simulation building the manipulation matrix of the circuit with MatSim, and batched single lane simulation.
+##
+class MatrixBackend(Backend):
+    singleLane = True
+    statevector = True
+
+    @classmethod
+    def supports(cls, simulator, compiledCircuit):
+        #the limit follows the memory limit and precision of MatSim, 13 Qubits with the defaults
+        return super(MatrixBackend, cls).supports(simulator, compiledCircuit) and simulator.matSim.fitsIntoMemory(4**compiledCircuit.numberOfQubits, MATRIX_ARRAYS)
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        return compiledCircuit.numberOfPositions * 8.0**compiledCircuit.numberOfQubits
+
+    def runState(self, compiledCircuit):
+        return self.simulator.matSim.runCompiledCircuit(compiledCircuit)
+
+    def simulateLanes(self, compiledCircuit):
+        #all lanes are simulated together, the result keeps the (2, 1) state vector of every lane
+        qubitStates = self.simulator.matSim.simulateCompiledLanes(compiledCircuit)
+        return [[np.reshape(qubitStates[lane], (2, 1))] for lane in range(compiledCircuit.numberOfQubits)]
+
+##
+# @class StatevectorBackend
+# @brief Whole circuit simulation applying every gate to the state vector with MatSim.
+##
+class StatevectorBackend(Backend):
+    statevector = True
+
+    @classmethod
+    def supports(cls, simulator, compiledCircuit):
+        #the limit follows the memory limit and precision of MatSim, 28 Qubits with the defaults
+        return super(StatevectorBackend, cls).supports(simulator, compiledCircuit) and simulator.matSim.fitsIntoMemory(2**compiledCircuit.numberOfQubits, STATEVECTOR_ARRAYS)
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        return len(compiledCircuit.instructions) * 2.0**compiledCircuit.numberOfQubits
+
+    def runState(self, compiledCircuit):
+        return None, self.simulator.matSim.runCompiledCircuitStatevector(compiledCircuit)
+
+##
+# @class StabilizerBackend
+# @brief Whole circuit simulation of Clifford circuits with the tableau of StabSim. Other circuits are moved to the statevector backend if they are small enough.
+##
+class StabilizerBackend(Backend):
+
+    @classmethod
+    def supports(cls, simulator, compiledCircuit):
+        return compiledCircuit.numberOfQubits <= STABILIZER_FALLBACK_LIMIT or simulator.stabSim.isClifford(compiledCircuit)
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        if not simulator.stabSim.isClifford(compiledCircuit):
+            return float("inf")
+        numberOfQubits = compiledCircuit.numberOfQubits
+        return len(compiledCircuit.instructions) * numberOfQubits / 8.0 + numberOfQubits**3 / 8.0
+
+    def simulate(self, compiledCircuit, circuit, repetitions):
+        if not self.simulator.stabSim.isClifford(compiledCircuit):
+            return self.simulator.circuitSimulation("statevector", compiledCircuit.numberOfQubits, circuit, repetitions)
+        if repetitions is not None:
+            return self.simulator.shotSampler.collectPackedShots(compiledCircuit.numberOfQubits, self.simulator.stabSim.sampleCompiledCircuit(compiledCircuit, repetitions))
+        return self.simulator.stabSim.simulateCompiledCircuit(compiledCircuit)
+
+##
+# @class MpsBackend
+# @brief Whole circuit simulation as a matrix product state with MpsSim, approximated if the bond dimension is exceeded.
+##
+class MpsBackend(Backend):
+    exact = False
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        return len(compiledCircuit.instructions) * 8.0 * simulator.mpsSim.maxBondDimension**3
+
+    def simulate(self, compiledCircuit, circuit, repetitions):
+        if repetitions is not None:
+            return self.simulator.shotSampler.collectShots(self.simulator.mpsSim.sampleCompiledCircuit(compiledCircuit, repetitions))
+        return self.simulator.mpsSim.simulateCompiledCircuit(compiledCircuit)
+
+##
+# @class DiskBackend
+# @brief Whole circuit simulation with the state vector in a memory mapped file with DiskSim, for registers whose state vector does not fit into RAM.
+##
+class DiskBackend(Backend):
+
+    @classmethod
+    def supports(cls, simulator, compiledCircuit):
+        path = simulator.diskSim.statePath or os.path.join(simulator.diskSim.directory or tempfile.gettempdir(), "state")
+        return super(DiskBackend, cls).supports(simulator, compiledCircuit) and simulator.diskSim.fitsOnDisk(compiledCircuit.numberOfQubits, path)
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        #every pass reads and writes the whole file
+        return 4 * len(compiledCircuit.instructions) * 2.0**compiledCircuit.numberOfQubits
+
+    def simulate(self, compiledCircuit, circuit, repetitions):
+        if repetitions is not None:
+            return self.simulator.shotSampler.collectShots(self.simulator.diskSim.sampleCompiledCircuit(compiledCircuit, repetitions))
+        return self.simulator.diskSim.simulateCompiledCircuit(compiledCircuit)
+
+##
+# @class SharedBackend
+# @brief Whole circuit simulation with the state vector in shared memory, partitioned over worker processes with SharedSim.
+##
+class SharedBackend(Backend):
+    statevector = True
+
+    @classmethod
+    def supports(cls, simulator, compiledCircuit):
+        return super(SharedBackend, cls).supports(simulator, compiledCircuit) and simulator.sharedSim.fitsIntoSharedMemory(compiledCircuit.numberOfQubits)
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        #SharedSim uses a worker per CPU unless another number was set, it is not created just to estimate the cost
+        workers = simulator._sharedSim.workers if simulator._sharedSim is not None else os.cpu_count() or 1
+        #the work is split between the workers, but every pass waits for all of them
+        return len(compiledCircuit.instructions) * 2.0**compiledCircuit.numberOfQubits / workers + 1e6
+
+    def runState(self, compiledCircuit):
+        return None, self.simulator.sharedSim.runCompiledCircuit(compiledCircuit)
+
+##
+# @class CirqBackend
+# @brief Whole circuit simulation with the Xmon Simulator of Cirq, which samples the circuit.
+##
+class CirqBackend(Backend):
+    samples = True
+
+    @classmethod
+    def cost(cls, simulator, compiledCircuit):
+        return len(compiledCircuit.instructions) * 2.0**compiledCircuit.numberOfQubits
+
+    def simulate(self, compiledCircuit, circuit, repetitions):
+        if repetitions is not None:
+            return self.simulator.shotSampler.collectShots(self.simulator.cirqSim.sampleCompiledCircuit(compiledCircuit, repetitions))
+        return self.simulator.cirqSim.simulateCompiledCircuit(compiledCircuit)
+
+##
+# @class BackendRegistry
+# @brief Maps the names of simulators to their Backend classes. Classes can be given as "module:Class" strings or entry points and are only imported when used.
+##
+class BackendRegistry(object):
+
+    ##
+    # init method creating an empty registry.
+    ##
+    def __init__(self):
+        self.backends = {}
+        self.entryPointsLoaded = False
+
+    ## Adds a backend.
+    # @param name
+    # The name of the simulator, as passed to Simulator.circuitSimulation.
+    # @param backend
+    # A subclass of Backend or a string "module:Class" naming it.
+    ##
+    def register(self, name, backend):
+        self.backends[name] = backend
+
+    ## Adds the backends other packages registered in the entry point group quasim.backends. Backends registered directly are not replaced.
+    ##
+    def loadEntryPoints(self):
+        self.entryPointsLoaded = True
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return
+
+        try:
+            entryPoints = entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:
+            #before Python 3.10 entry_points returns a dictionary of all groups
+            entryPoints = entry_points().get(ENTRY_POINT_GROUP, [])
+
+        for entryPoint in entryPoints:
+            if entryPoint.name not in self.backends:
+                self.backends[entryPoint.name] = entryPoint
+
+    ## Lists the names of all backends.
+    # @return Returns a list of names.
+    ##
+    def names(self):
+        if not self.entryPointsLoaded:
+            self.loadEntryPoints()
+        return list(self.backends)
+
+    ## Returns the class of a backend and imports it if necessary.
+    # @param name
+    # The name of the simulator.
+    # @return Returns the subclass of Backend.
+    ##
+    def backendClass(self, name):
+        if name not in self.backends and not self.entryPointsLoaded:
+            self.loadEntryPoints()
+        if name not in self.backends:
+            raise ValueError("The simulator " + str(name) + " is unknown. Known simulators are " + ", ".join(self.backends) + ".")
+
+        backend = self.backends[name]
+        if isinstance(backend, str):
+            moduleName, className = backend.split(":")
+            backend = getattr(importlib.import_module(moduleName), className)
+        elif not isinstance(backend, type):
+            backend = backend.load()
+        self.backends[name] = backend
+
+        return backend
+
+## the registry used by all Simulators.
+registry = BackendRegistry()
+registry.register("truth table", TruthTableBackend)
+registry.register("matrix", MatrixBackend)
+registry.register("statevector", StatevectorBackend)
+registry.register("stabilizer", StabilizerBackend)
+registry.register("mps", MpsBackend)
+registry.register("disk", DiskBackend)
+registry.register("shared", SharedBackend)
+registry.register("cirq", CirqBackend)
@@ -0,0 +1,348 @@
+##
+# @file benchmark.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the benchmark suite timing every simulator on generated circuits and comparing the timings with a stored baseline.
+#
+##
+
+import sys
+import time
+import json
+import platform
+import tracemalloc
+
+import numpy as np
+
+from algorithms import Algorithms
+from backends import registry
+
+## number of qubits of the generated circuits.
+DEFAULT_WIDTHS = (2, 4, 6, 8, 10)
+## number of qubits of the generated circuits of a quick run.
+QUICK_WIDTHS = (2, 4, 6)
+## number of cycles of the random circuits.
+DEFAULT_DEPTH = 16
+## number of timed runs of every workload, the fastest one is recorded.
+DEFAULT_REPEATS = 3
+## relative slowdown or memory growth compared to the baseline that is reported as a regression.
+DEFAULT_TOLERANCE = 0.25
+## differences in wall time below this number of seconds are timer noise and never reported.
+TIME_NOISE = 5e-3
+## differences in peak memory below this number of bytes are never reported.
+MEMORY_NOISE = 1024**2
+
+## gates drawn for the random circuits.
+singleQubitGates = ("Pauli-X-Gate", "Pauli-Y-Gate", "Pauli-Z-Gate", "Hadamard Gate", "S Gate", "T Gate")
+
+##
+# @class Workloads
+# @brief Generate circuit lists of parametrised size in the format of the GUI, e.g. random circuits of any width and depth or scaled versions of the algorithms.
+##
+class Workloads(object):
+
+    ##
+    # init method creating the random number generator of the random circuits.
+    # @param seed
+    # A seed, so every run benchmarks the same circuits.
+    ##
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.algorithms = Algorithms()
+
+    ## Builds an empty circuit.
+    # @param numberOfQubits
+    # The number of lanes.
+    # @param numberOfPositions
+    # The number of cycles.
+    # @return Returns a list of lanes filled with "0".
+    ##
+    def buildEmptyCircuit(self, numberOfQubits, numberOfPositions):
+        return [["0"] * numberOfPositions for _ in range(numberOfQubits)]
+
+    ## Builds a random circuit. Every cycle gets a random single qubit gate on every lane and, if two qubit gates are used, one CNot Gate between two random lanes.
+    # @param numberOfQubits
+    # The number of lanes.
+    # @param depth
+    # The number of cycles.
+    # @param twoQubitGates
+    # False to only use single qubit gates, e.g. for single lane simulation.
+    # @return Returns the circuit list.
+    ##
+    def randomCircuit(self, numberOfQubits, depth, twoQubitGates=True):
+        circuit = self.buildEmptyCircuit(numberOfQubits, depth)
+
+        for position in range(depth):
+            for lane in range(numberOfQubits):
+                circuit[lane][position] = singleQubitGates[self.rng.integers(len(singleQubitGates))]
+            if twoQubitGates and numberOfQubits > 1:
+                control, target = self.rng.choice(numberOfQubits, size=2, replace=False)
+                circuit[control][position] = "Control"
+                circuit[target][position] = "CNot Gate"
+
+        return circuit
+
+    ## Builds a circuit preparing the GHZ state (|0...0> + |1...1>) / sqrt(2) with a Hadamard Gate and a chain of CNot Gates.
+    # @param numberOfQubits
+    # The number of lanes.
+    # @return Returns the circuit list.
+    ##
+    def ghzCircuit(self, numberOfQubits):
+        circuit = self.buildEmptyCircuit(numberOfQubits, numberOfQubits)
+        circuit[0][0] = "Hadamard Gate"
+
+        for lane in range(1, numberOfQubits):
+            circuit[lane-1][lane] = "Control"
+            circuit[lane][lane] = "CNot Gate"
+
+        return circuit
+
+    ## Builds layers with the structure of the quantum Fourier transform. The gate selection has no controlled phase gates, so every controlled rotation
+    # is replaced by a T Gate between two CNot Gates, which has the same cost and entangles the same lanes.
+    # @param numberOfQubits
+    # The number of lanes.
+    # @return Returns the circuit list.
+    ##
+    def qftCircuit(self, numberOfQubits):
+        circuit = self.buildEmptyCircuit(numberOfQubits, numberOfQubits + 3 * numberOfQubits * (numberOfQubits - 1) // 2)
+        position = 0
+
+        for target in range(numberOfQubits):
+            circuit[target][position] = "Hadamard Gate"
+            position += 1
+            for control in range(target + 1, numberOfQubits):
+                circuit[control][position] = "Control"
+                circuit[target][position] = "CNot Gate"
+                circuit[target][position+1] = "T Gate"
+                circuit[control][position+2] = "Control"
+                circuit[target][position+2] = "CNot Gate"
+                position += 3
+
+        return circuit
+
+    ## Builds the algorithm of Deutsch for several input lanes. Every input lane is connected to the last lane by its own Deutsch Oracle.
+    # @param numberOfQubits
+    # The number of lanes, at least two.
+    # @return Returns the circuit list.
+    ##
+    def deutschCircuit(self, numberOfQubits):
+        numberOfInputs = numberOfQubits - 1
+        circuit = self.buildEmptyCircuit(numberOfQubits, numberOfInputs + 4)
+        circuit[numberOfInputs][0] = "Pauli-X-Gate"
+
+        for lane in range(numberOfQubits):
+            circuit[lane][1] = "Hadamard Gate"
+        #one oracle per cycle, an oracle finds its control by the marker of its cycle
+        for lane in range(numberOfInputs):
+            circuit[lane][2+lane] = "Deutsch OracleC"
+            circuit[numberOfInputs][2+lane] = "Deutsch Oracle"
+        for lane in range(numberOfQubits):
+            circuit[lane][numberOfInputs+2] = "Hadamard Gate"
+            circuit[lane][numberOfInputs+3] = "Measurement"
+
+        return circuit
+
+    ## Builds several copies of the algorithm of Grover for two bits on top of each other. Every copy is shifted by one cycle, so the Toffoli Gates
+    # of the copies are in different cycles.
+    # @param numberOfCopies
+    # The number of copies, the circuit has three lanes per copy.
+    # @return Returns the circuit list.
+    ##
+    def groverCircuit(self, numberOfCopies):
+        circuit = []
+
+        for copy in range(numberOfCopies):
+            grover = self.algorithms.buildGroverCircuit(self.algorithms.randomBitSequence(self.rng))
+            for lane in grover:
+                circuit.append(["0"] * copy + lane + ["0"] * (numberOfCopies - 1 - copy))
+
+        return circuit
+
+    ## Builds all workloads of a benchmark run.
+    # @param widths
+    # The numbers of qubits of the generated circuits.
+    # @param depth
+    # The number of cycles of the random circuits.
+    # @return Returns a list of tuples (name, circuit, mode). mode is "whole circuit" or "single lane".
+    ##
+    def buildSuite(self, widths=DEFAULT_WIDTHS, depth=DEFAULT_DEPTH):
+        suite = []
+
+        for width in widths:
+            suite.append(("random " + str(width) + "x" + str(depth), self.randomCircuit(width, depth), "whole circuit"))
+            suite.append(("ghz " + str(width), self.ghzCircuit(width), "whole circuit"))
+            suite.append(("qft " + str(width), self.qftCircuit(width), "whole circuit"))
+            if width >= 2:
+                suite.append(("deutsch " + str(width), self.deutschCircuit(width), "whole circuit"))
+            #lanes are simulated on their own, so much wider circuits are cheap
+            suite.append(("lanes " + str(8 * width) + "x" + str(depth), self.randomCircuit(8 * width, depth, False), "single lane"))
+        for numberOfCopies in range(1, max(widths) // 3 + 1):
+            suite.append(("grover " + str(3 * numberOfCopies), self.groverCircuit(numberOfCopies), "whole circuit"))
+
+        return suite
+
+##
+# @class Benchmark
+# @brief Time every simulator on a suite of workloads and compare the timings with a baseline.
+##
+class Benchmark(object):
+
+    ##
+    # init method setting how often every workload is run.
+    # @param repeats
+    # The number of timed runs of every workload, the fastest one is recorded.
+    # @param simulations
+    # The names of the simulators to benchmark. None for all registered simulators, simulators whose dependencies are not installed are left out.
+    ##
+    def __init__(self, repeats=DEFAULT_REPEATS, simulations=None):
+        self.repeats = repeats
+        self.simulations = simulations
+
+    ## Runs a workload once on a new Simulator, so no cached compiled circuits, matrices or results of an earlier run are used.
+    # @param simulation
+    # The name of the simulator.
+    # @param circuit
+    # The circuit list.
+    # @param mode
+    # "whole circuit" or "single lane".
+    # @param simulator
+    # The Simulator.
+    ##
+    def runOnce(self, simulation, circuit, mode, simulator):
+        if mode == "single lane":
+            simulator.singleLaneSimulation(simulation, len(circuit), circuit)
+        else:
+            simulator.circuitSimulation(simulation, len(circuit), circuit)
+
+    ## Times a workload on one simulator.
+    # @param simulation
+    # The name of the simulator.
+    # @param circuit
+    # The circuit list.
+    # @param mode
+    # "whole circuit" or "single lane".
+    # @return Returns a dictionary with the fastest and mean wall time in seconds, the peak memory in bytes and the throughput in gates per second,
+    # or None if the simulator does not support the workload.
+    ##
+    def measure(self, simulation, circuit, mode):
+        from simulator import Simulator
+
+        simulator = Simulator(seed=0)
+        backend = simulator.getBackend(simulation)
+        if (mode == "single lane" and not backend.singleLane) or (mode == "whole circuit" and not backend.wholeCircuit):
+            return None
+        compiledCircuit = simulator.compileCircuit(circuit)
+        #the limits of a backend only apply to whole circuits, lanes are always simulated on their own
+        if mode == "whole circuit" and not backend.supports(simulator, compiledCircuit):
+            return None
+        #the stabilizer backend moves other circuits to the statevector backend, their time would be recorded for the wrong simulator
+        if mode == "whole circuit" and simulation == "stabilizer" and not simulator.stabSim.isClifford(compiledCircuit):
+            return None
+
+        times = []
+        for _ in range(self.repeats):
+            simulator = Simulator(seed=0)
+            start = time.perf_counter()
+            self.runOnce(simulation, circuit, mode, simulator)
+            times.append(time.perf_counter() - start)
+
+        #tracemalloc slows down the simulation, so the memory is measured in a separate run
+        simulator = Simulator(seed=0)
+        tracemalloc.start()
+        try:
+            self.runOnce(simulation, circuit, mode, simulator)
+            peakMemory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {"wallTime": min(times), "meanTime": sum(times) / len(times), "peakMemory": peakMemory,
+                "gates": len(compiledCircuit.instructions), "gatesPerSecond": len(compiledCircuit.instructions) / max(min(times), 1e-9)}
+
+    ## Times every simulator on every workload of a suite.
+    # @param suite
+    # A list of tuples (name, circuit, mode) as returned by Workloads.buildSuite.
+    # @param progress
+    # A file the name of every finished measurement is written to, None for no output.
+    # @return Returns a dictionary with the environment and the measurements keyed by "workload | simulator | mode".
+    ##
+    def run(self, suite, progress=None):
+        results = {}
+        simulations = list(self.simulations if self.simulations is not None else registry.names())
+
+        for name, circuit, mode in suite:
+            for simulation in simulations[:]:
+                try:
+                    measurement = self.measure(simulation, circuit, mode)
+                except ImportError:
+                    #the dependencies of the simulator, e.g. Cirq, are not installed
+                    simulations.remove(simulation)
+                    continue
+                if measurement is None:
+                    continue
+                key = name + " | " + simulation + " | " + mode
+                results[key] = measurement
+                if progress is not None:
+                    progress.write(key + " :  " + format(measurement["wallTime"], ".4f") + "s\n")
+
+        environment = {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(), "processor": platform.processor()}
+
+        return {"environment": environment, "repeats": self.repeats, "results": results}
+
+    ## Compares measurements with a baseline. A measurement regressed if it is slower or uses more memory than the tolerance allows and the difference is above the noise.
+    # @param baseline
+    # The dictionary returned by run for the baseline.
+    # @param current
+    # The dictionary returned by run for the current code.
+    # @param tolerance
+    # The allowed relative slowdown and memory growth.
+    # @return Returns a tuple of a list of regressions and a list of all compared lines, both as strings.
+    ##
+    def compare(self, baseline, current, tolerance=DEFAULT_TOLERANCE):
+        regressions = []
+        report = []
+
+        for key, measurement in sorted(current["results"].items()):
+            if key not in baseline["results"]:
+                report.append(key + " :  new")
+                continue
+            reference = baseline["results"][key]
+            ratio = measurement["wallTime"] / max(reference["wallTime"], 1e-9)
+            memoryRatio = measurement["peakMemory"] / max(reference["peakMemory"], 1)
+            line = key + " :  " + format(ratio, ".2f") + "x time, " + format(memoryRatio, ".2f") + "x memory"
+            report.append(line)
+
+            if ratio > 1 + tolerance and measurement["wallTime"] - reference["wallTime"] > TIME_NOISE:
+                regressions.append(line)
+            elif memoryRatio > 1 + tolerance and measurement["peakMemory"] - reference["peakMemory"] > MEMORY_NOISE:
+                regressions.append(line)
+
+        for key in sorted(set(baseline["results"]) - set(current["results"])):
+            report.append(key + " :  missing")
+
+        return regressions, report
+
+## Reads a benchmark result written by writeResults.
+# @param path
+# The path of the JSON file.
+# @return Returns the dictionary returned by Benchmark.run.
+##
+def loadResults(path):
+    with open(path) as resultFile:
+        return json.load(resultFile)
+
+## Writes a benchmark result as JSON.
+# @param results
+# The dictionary returned by Benchmark.run.
+# @param path
+# The path of the JSON file, - for stdout.
+##
+def writeResults(results, path):
+    if path == "-":
+        json.dump(results, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+    else:
+        with open(path, "w") as resultFile:
+            json.dump(results, resultFile, indent=1)
@@ -0,0 +1,233 @@
+##
+# @file cache.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing a size bounded least recently used cache for intermediate results of simulations.
+#
+##
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+from collections import OrderedDict
+
+from sparseCircuit import SparseCircuit
+
+## gates whose effect is decided randomly during the simulation. Circuits containing them are never cached.
+randomGates = ("Deutsch Oracle",)
+
+##
+# @class LruCache
+# @brief A least recently used cache bounded by the number of entries and the number of bytes of the stored values.
+##
+class LruCache(object):
+
+    ##
+    # init method setting the bounds of the cache and the counters.
+    # @param maxBytes
+    # The maximum number of bytes all stored values may use together.
+    # @param maxEntries
+    # The maximum number of stored values. None for no bound.
+    ##
+    def __init__(self, maxBytes, maxEntries=None):
+        self.maxBytes = maxBytes
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        ## number of bytes used by all stored values.
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    ## Estimates the number of bytes a value uses. Numpy arrays report their buffer size, lists and tuples are summed up.
+    # @param value
+    # The value stored in the cache.
+    # @return Returns the size in bytes.
+    ##
+    def sizeOf(self, value):
+        if hasattr(value, "nbytes"):
+            return value.nbytes
+        elif isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(self.sizeOf(item) for item in value)
+        elif isinstance(value, dict):
+            return sys.getsizeof(value) + sum(self.sizeOf(item) for item in value.values())
+        else:
+            return sys.getsizeof(value)
+
+    ## Looks up a value and marks it as most recently used.
+    # @param key
+    # The key of the value.
+    # @return Returns the value or None if the key is not cached.
+    ##
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+        self.misses += 1
+        return None
+
+    ## Stores a value and evicts the least recently used values until the cache is within its bounds again. Values larger than the whole cache are not stored.
+    # @param key
+    # The key of the value.
+    # @param value
+    # The value to store.
+    ##
+    def put(self, key, value):
+        size = self.sizeOf(value)
+        if size > self.maxBytes:
+            return
+
+        if key in self.entries:
+            self.currentBytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.currentBytes += size
+
+        while self.currentBytes > self.maxBytes or (self.maxEntries is not None and len(self.entries) > self.maxEntries):
+            self.currentBytes -= self.entries.popitem(last=False)[1][1]
+            self.evictions += 1
+
+    ## Removes all values and resets the counters.
+    ##
+    def clear(self):
+        self.entries.clear()
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    ## Returns the counters of the cache, e.g. to choose its size.
+    # @return Returns a dictionary with the number of hits, misses, evictions, entries and used bytes.
+    ##
+    def statistics(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.entries), "bytes": self.currentBytes}
+
+##
+# @class ResultCache
+# @brief Cache for the results of whole circuit simulations addressed by a hash of the circuit. Results are kept in memory and optionally in a directory on disk.
+##
+class ResultCache(object):
+
+    ##
+    # init method setting the bounds of both tiers.
+    # @param maxBytes
+    # The maximum number of bytes of results kept in memory.
+    # @param directory
+    # A directory to store results in, so they survive the end of the program. None to only keep results in memory.
+    # @param maxDiskBytes
+    # The maximum number of bytes of all result files in the directory.
+    ##
+    def __init__(self, maxBytes, directory=None, maxDiskBytes=None):
+        self.memoryCache = LruCache(maxBytes)
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+        self.diskHits = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    ## Builds the key of a simulation. The circuit is written in a canonical form, fused gates with their matrix, and hashed together with the simulator and the number of qubits.
+    # @param simulation
+    # The name of the simulator.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param circuit
+    # The circuit with all gaps filled, as returned by MatSim.fillGapsInCircuit, or a SparseCircuit.
+    # @param options
+    # Further settings changing the result, e.g. whether gates were fused.
+    # @return Returns the key as a hex string or None if the circuit contains random gates and must not be cached.
+    ##
+    def buildKey(self, simulation, numberOfQubits, circuit, options=()):
+        canonicalCircuit = []
+
+        if isinstance(circuit, SparseCircuit):
+            #a sparse circuit is described by its operations, fused gates with their matrix
+            if any(operation.gate in randomGates for operation in circuit.operations):
+                return None
+            canonicalCircuit = list(circuit.signature())
+        else:
+            for lane in circuit:
+                canonicalLane = []
+                for gate in lane:
+                    if gate in randomGates:
+                        return None
+                    elif gate == "Fused Gate":
+                        canonicalLane.append(gate + ":" + gate.matrix.tobytes().hex())
+                    else:
+                        canonicalLane.append(str(gate))
+                canonicalCircuit.append(canonicalLane)
+
+        canonicalForm = json.dumps([simulation, numberOfQubits, list(options), canonicalCircuit])
+        return hashlib.sha256(canonicalForm.encode("utf-8")).hexdigest()
+
+    ## Returns the path of the file storing a result.
+    # @param key
+    # The key of the result.
+    # @return Returns the path.
+    ##
+    def filePath(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    ## Looks up a result in memory and afterwards on disk. Results found on disk are moved into memory.
+    # @param key
+    # The key as returned by buildKey.
+    # @return Returns the result or None if it is not cached.
+    ##
+    def get(self, key):
+        if key is None:
+            return None
+
+        value = self.memoryCache.get(key)
+        if value is None and self.directory is not None and os.path.exists(self.filePath(key)):
+            with open(self.filePath(key), "rb") as resultFile:
+                value = pickle.load(resultFile)
+            #mark the file as recently used for the eviction of the disk tier
+            os.utime(self.filePath(key))
+            self.diskHits += 1
+            self.memoryCache.put(key, value)
+
+        return value
+
+    ## Stores a result in memory and on disk.
+    # @param key
+    # The key as returned by buildKey. Nothing is stored if it is None.
+    # @param value
+    # The result of the simulation.
+    ##
+    def put(self, key, value):
+        if key is None:
+            return
+
+        self.memoryCache.put(key, value)
+        if self.directory is not None:
+            with open(self.filePath(key), "wb") as resultFile:
+                pickle.dump(value, resultFile, protocol=pickle.HIGHEST_PROTOCOL)
+            self.evictFiles()
+
+    ## Deletes the least recently used result files until the directory is within its bound.
+    ##
+    def evictFiles(self):
+        if self.maxDiskBytes is None:
+            return
+
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".pickle")]
+        files.sort(key=os.path.getmtime)
+        diskBytes = sum(os.path.getsize(path) for path in files)
+
+        while diskBytes > self.maxDiskBytes and files:
+            path = files.pop(0)
+            diskBytes -= os.path.getsize(path)
+            os.remove(path)
+
+    ## Returns the counters of the cache.
+    # @return Returns a dictionary with the counters of the memory tier and the number of results loaded from disk.
+    ##
+    def statistics(self):
+        statistics = self.memoryCache.statistics()
+        statistics["diskHits"] = self.diskHits
+        return statistics
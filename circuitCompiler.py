@@ -0,0 +1,218 @@
+##
+# @file circuitCompiler.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the compiler that translates the circuit list of gate names into a program of integer opcodes executed by all simulators.
+#
+##
+
+import numpy as np
+
+from gates import gateX, gateY, gateZ, gateH, gateS, gateT, gateCnotCFirst, gateSwap, gateToffoli, gateFredkin, identityMatrixTwo
+
+## opcodes of all gates. Named gates use their opcode as index into the matrix table of a compiled circuit.
+IDENTITY = 0
+PAULI_X = 1
+PAULI_Y = 2
+PAULI_Z = 3
+HADAMARD = 4
+S_GATE = 5
+T_GATE = 6
+MEASUREMENT = 7
+CNOT = 8
+SWAP = 9
+TOFFOLI = 10
+FREDKIN = 11
+DEUTSCH_ORACLE = 12
+FUSED = 13
+
+## opcodes of the gates that only permute the basis states.
+permutationOpcodes = (PAULI_X, CNOT, SWAP, TOFFOLI, FREDKIN, DEUTSCH_ORACLE)
+
+## opcodes of the gates whose matrix is diagonal, they only change the phase of basis states.
+diagonalOpcodes = (PAULI_Z, S_GATE, T_GATE)
+
+## opcodes of the gates of the Clifford group, circuits made of them can be simulated with a stabilizer tableau.
+cliffordOpcodes = (IDENTITY, PAULI_X, PAULI_Y, PAULI_Z, HADAMARD, S_GATE, MEASUREMENT, CNOT, SWAP, DEUTSCH_ORACLE)
+
+## opcodes of the single qubit gates of the gate selection.
+singleQubitOpcodes = {"Pauli-X-Gate": PAULI_X, "Pauli-Y-Gate": PAULI_Y, "Pauli-Z-Gate": PAULI_Z, "Hadamard Gate": HADAMARD, "S Gate": S_GATE, "T Gate": T_GATE,
+                      "Measurement": MEASUREMENT}
+
+## opcodes of the multi qubit gates of the gate selection.
+multiQubitOpcodes = {"CNot Gate": CNOT, "Swap Gate": SWAP, "Toffoli Gate": TOFFOLI, "Fredkin Gate": FREDKIN, "Deutsch Oracle": DEUTSCH_ORACLE}
+
+## cells without an own operation. They are either empty or mark a qubit of a multi qubit gate placed on another lane.
+markerCells = ("0", "Identity", "Control", "Toffoli1", "Toffoli2", "Fredkin1", "Fredkin2", "Deutsch OracleC")
+
+## matrix of every named gate indexed by its opcode. The matrix of a multi qubit gate acts on its controls followed by its targets.
+## A Deutsch Oracle is a CNot Gate that is only applied if the oracle is balanced.
+gateMatrices = [np.asarray(matrix, dtype=complex) for matrix in (identityMatrixTwo, gateX, gateY, gateZ, gateH, gateS, gateT, identityMatrixTwo,
+                                                                  gateCnotCFirst, gateSwap, gateToffoli, gateFredkin, gateCnotCFirst)]
+
+## record type of one operation. Unused targets and controls are -1.
+operationType = np.dtype([("opcode", np.int8), ("position", np.int32), ("targets", np.int32, (2,)), ("controls", np.int32, (2,)), ("matrix", np.int32)])
+
+##
+# @class CompiledCircuit
+# @brief A circuit translated into an array of (opcode, position, targets, controls, matrix) records sorted by position.
+##
+class CompiledCircuit(object):
+
+    ##
+    # init method storing the program of a circuit.
+    # @param numberOfQubits
+    # The number of lanes of the circuit.
+    # @param numberOfPositions
+    # The number of cycles of the circuit.
+    # @param operations
+    # A numpy array of operationType records sorted by position.
+    # @param matrices
+    # A list of all gate matrices, indexed by the matrix field of an operation.
+    ##
+    def __init__(self, numberOfQubits, numberOfPositions, operations, matrices):
+        self.numberOfQubits = numberOfQubits
+        self.numberOfPositions = numberOfPositions
+        self.operations = operations
+        self.matrices = matrices
+        ## index of the first operation of every cycle, the operations of cycle p are operations[positionStarts[p]:positionStarts[p+1]]
+        self.positionStarts = np.searchsorted(operations["position"], np.arange(numberOfPositions + 1))
+        ## the records unpacked into python tuples (opcode, qubits, matrix), so executing the program does not touch numpy scalars.
+        self.instructions = [(int(operation["opcode"]), tuple(int(qubit) for qubit in operation["controls"] if qubit >= 0) + tuple(int(qubit) for qubit in operation["targets"] if qubit >= 0),
+                              matrices[operation["matrix"]]) for operation in operations]
+
+    ## Returns the operations of one cycle.
+    # @param position
+    # The number of the cycle.
+    # @return Returns a list of tuples (opcode, qubits, matrix). qubits lists the controls followed by the targets in the order of the basis of matrix.
+    ##
+    def positionInstructions(self, position):
+        return self.instructions[self.positionStarts[position]:self.positionStarts[position+1]]
+
+    ## Returns the operations acting on one lane.
+    # @param lane
+    # The number of the lane.
+    # @return Returns a list of tuples (opcode, qubits, matrix) of all operations involving the lane.
+    ##
+    def laneInstructions(self, lane):
+        return [instruction for instruction in self.instructions if lane in instruction[1]]
+
+##
+# @class CircuitCompiler
+# @brief Translate the circuit list generated in the GUI into a CompiledCircuit.
+##
+class CircuitCompiler(object):
+
+    ## Resolves the gates of one cycle into operations. Marker cells like "Control", "Toffoli1" or "Fredkin2" are assigned to the gate they belong to,
+    # so multi qubit gates do not have to be placed on neighbouring lanes.
+    # @param column
+    # A list containing the gate of every lane in one position/cycle.
+    # @param position
+    # The number of the cycle.
+    # @param matrices
+    # The matrix table of the circuit. Matrices of fused gates are appended to it.
+    # @return Returns a list of operation records as tuples.
+    ##
+    def compileColumn(self, column, position, matrices):
+        operations = []
+        controls = [lane for lane in range(len(column)) if column[lane] == "Control"]
+        swaps = [lane for lane in range(len(column)) if column[lane] == "Swap Gate"]
+        cnotCounter = 0
+
+        for lane in range(len(column)):
+            gate = column[lane]
+
+            if gate in singleQubitOpcodes:
+                operations.append((singleQubitOpcodes[gate], position, (lane, -1), (-1, -1), singleQubitOpcodes[gate]))
+            elif gate == "Fused Gate":
+                matrices.append(gate.matrix)
+                operations.append((FUSED, position, (lane, -1), (-1, -1), len(matrices)-1))
+            elif gate == "CNot Gate":
+                if cnotCounter >= len(controls):
+                    raise ValueError("The CNot Gate on q" + str(lane) + " position " + str(position) + " has no control qubit.")
+                operations.append((CNOT, position, (lane, -1), (controls[cnotCounter], -1), CNOT))
+                cnotCounter += 1
+            elif gate == "Swap Gate":
+                #a swap gate is spread over two lanes, the first lane of each pair carries the operation
+                index = swaps.index(lane)
+                if index % 2 == 0:
+                    if index + 1 >= len(swaps):
+                        raise ValueError("The Swap Gate on q" + str(lane) + " position " + str(position) + " has no partner.")
+                    operations.append((SWAP, position, (lane, swaps[index+1]), (-1, -1), SWAP))
+            elif gate == "Toffoli Gate":
+                operations.append((TOFFOLI, position, (lane, -1), (self.findMarker(column, "Toffoli1", position), self.findMarker(column, "Toffoli2", position)), TOFFOLI))
+            elif gate == "Fredkin Gate":
+                operations.append((FREDKIN, position, (self.findMarker(column, "Fredkin1", position), self.findMarker(column, "Fredkin2", position)), (lane, -1), FREDKIN))
+            elif gate == "Deutsch Oracle":
+                operations.append((DEUTSCH_ORACLE, position, (lane, -1), (self.findMarker(column, "Deutsch OracleC", position), -1), DEUTSCH_ORACLE))
+            elif gate in markerCells:
+                pass
+            else:
+                raise ValueError("An unknown gate was found. Circuit cant be simulated.")
+
+        return operations
+
+    ## Finds the lane of a marker cell belonging to a multi qubit gate.
+    # @param column
+    # A list containing the gate of every lane in one position/cycle.
+    # @param marker
+    # The name of the marker cell.
+    # @param position
+    # The number of the cycle, used for the error message.
+    # @return Returns the lane of the marker.
+    ##
+    def findMarker(self, column, marker, position):
+        if marker not in column:
+            raise ValueError("The multi qubit gate at position " + str(position) + " is missing its " + marker + " qubit.")
+        return column.index(marker)
+
+    ## Translates a circuit into a program of operations. The gate names are only parsed here, the simulators execute the resulting opcodes.
+    # @param circuit
+    # A list representing the quantum circuit as generated from the GUI, gaps may be "0" or "Identity".
+    # @return Returns the CompiledCircuit.
+    ##
+    def compileCircuit(self, circuit):
+        numberOfPositions = len(circuit[0])
+        matrices = list(gateMatrices)
+        records = []
+
+        for position in range(numberOfPositions):
+            column = [circuit[lane][position] for lane in range(len(circuit))]
+            records += self.compileColumn(column, position, matrices)
+
+        operations = np.array(records, dtype=operationType)
+
+        return CompiledCircuit(len(circuit), numberOfPositions, operations, matrices)
+
+    ## Translates a SparseCircuit into a program of operations without building its grid. Columns without any gate are left out, 
+    # so the cost only depends on the number of gates.
+    # @param sparseCircuit
+    # The SparseCircuit.
+    # @return Returns the CompiledCircuit.
+    ##
+    def compileSparseCircuit(self, sparseCircuit):
+        operations = sparseCircuit.sortedOperations()
+        matrices = list(gateMatrices)
+        records = []
+        numberOfPositions = 0
+        lastPosition = None
+
+        for operation in operations:
+            if operation.position != lastPosition:
+                numberOfPositions += 1
+                lastPosition = operation.position
+            targets = operation.targets + (-1,) * (2 - len(operation.targets))
+            controls = operation.controls + (-1,) * (2 - len(operation.controls))
+            if operation.gate == "Fused Gate":
+                matrices.append(operation.gate.matrix)
+                records.append((FUSED, numberOfPositions - 1, targets, controls, len(matrices)-1))
+            else:
+                opcode = singleQubitOpcodes[operation.gate] if operation.gate in singleQubitOpcodes else multiQubitOpcodes[operation.gate]
+                records.append((opcode, numberOfPositions - 1, targets, controls, opcode))
+
+        compiledOperations = np.array(records, dtype=operationType)
+
+        return CompiledCircuit(sparseCircuit.numberOfQubits, max(numberOfPositions, 1), compiledOperations, matrices)
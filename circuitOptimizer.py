@@ -0,0 +1,231 @@
+##
+# @file circuitOptimizer.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing optimisation passes that reduce the number of gates and cycles of a circuit before it is simulated.
+#
+##
+
+import numpy as np
+
+from gates import gateX, gateY, gateZ, gateH, gateS, gateT, identityMatrixTwo
+from sparseCircuit import SparseCircuit
+
+## single qubit gates that can be fused and their matrix representation.
+singleQubitGates = {"Pauli-X-Gate": gateX, "Pauli-Y-Gate": gateY, "Pauli-Z-Gate": gateZ, "Hadamard Gate": gateH, "S Gate": gateS, "T Gate": gateT}
+
+## gates that are their own inverse, two of them on the same qubits cancel.
+selfInverseGates = ("Pauli-X-Gate", "Pauli-Y-Gate", "Hadamard Gate", "CNot Gate", "Swap Gate", "Toffoli Gate", "Fredkin Gate")
+
+## diagonal single qubit gates as powers of the T Gate, their product only depends on the sum of the powers modulo 8.
+phasePowers = {"Pauli-Z-Gate": 4, "S Gate": 2, "T Gate": 1}
+
+## gates whose control qubits a diagonal gate commutes with. A measurement in the computational basis commutes with it on its target.
+controlledGates = ("CNot Gate", "Toffoli Gate", "Fredkin Gate", "Deutsch Oracle")
+
+##
+# @class FusedGate
+# @brief A single qubit gate that replaces a sequence of single qubit gates on one lane.
+# It is stored in the circuit list like any other gate name and carries the product of the fused gates as its matrix.
+##
+class FusedGate(str):
+
+    ##
+    # Creates the circuit entry "Fused Gate" for a 2x2 matrix.
+    # @param matrix
+    # The matrix representation of the fused gate.
+    ##
+    def __new__(cls, matrix):
+        fusedGate = str.__new__(cls, "Fused Gate")
+        fusedGate.matrix = np.asarray(matrix, dtype=complex)
+        return fusedGate
+
+    ##
+    # Makes sure the matrix survives pickling, e.g. when a circuit is sent to another process.
+    ##
+    def __reduce__(self):
+        return (FusedGate, (self.matrix,))
+
+##
+# @class CircuitOptimizer
+# @brief Rewrite a circuit into an equivalent circuit that is cheaper to simulate.
+##
+class CircuitOptimizer(object):
+
+    ## Finds the named gate a matrix corresponds to. The matrices have to be equal, a global phase would change the amplitudes of single lane simulations.
+    # @param matrix
+    # A 2x2 matrix.
+    # @return Returns the name of the gate, "Identity" or a FusedGate if no named gate matches.
+    ##
+    def nameSingleQubitMatrix(self, matrix):
+        candidates = [("Identity", identityMatrixTwo)] + list(singleQubitGates.items())
+
+        for name, gate in candidates:
+            if np.allclose(gate, matrix):
+                return name
+
+        return FusedGate(matrix)
+
+    ## Multiplies consecutive single qubit gates on every lane into one gate. A run of single qubit gates ends at a multi qubit gate or a measurement,
+    # the fused gate is placed in the last cycle before that gate so the fused gates of different lanes line up. Cycles which only contain identities
+    # afterwards are removed.
+    # @param circuit
+    # A list representing the quantum circuit with all gaps filled.
+    # @return Returns the optimised circuit.
+    ##
+    def fuseSingleQubitGates(self, circuit):
+        numberOfPositions = len(circuit[0])
+        newCircuit = [["Identity"] * numberOfPositions for _ in range(len(circuit))]
+
+        for lane in range(len(circuit)):
+            runMatrix = np.asarray(identityMatrixTwo, dtype=complex)
+            runStarted = False
+
+            for position in range(numberOfPositions + 1):
+                if position < numberOfPositions:
+                    gate = circuit[lane][position]
+                else:
+                    gate = None
+
+                if gate in singleQubitGates:
+                    runMatrix = np.matmul(singleQubitGates[gate], runMatrix)
+                    runStarted = True
+                elif gate == "Fused Gate":
+                    runMatrix = np.matmul(gate.matrix, runMatrix)
+                    runStarted = True
+                elif gate == "Identity" or gate == "0":
+                    pass
+                else:
+                    #end of a run, place the fused gate in the cycle before the gate ending the run
+                    if runStarted:
+                        newCircuit[lane][position-1] = self.nameSingleQubitMatrix(runMatrix)
+                    if gate is not None:
+                        newCircuit[lane][position] = gate
+                    runMatrix = np.asarray(identityMatrixTwo, dtype=complex)
+                    runStarted = False
+
+        #remove all cycles without any gate
+        positions = [position for position in range(numberOfPositions) if any(newCircuit[lane][position] != "Identity" for lane in range(len(newCircuit)))]
+        if positions == []:
+            positions = [0]
+
+        return [[newCircuit[lane][position] for position in positions] for lane in range(len(newCircuit))]
+
+    ## Multiplies consecutive single qubit gates on every lane of a SparseCircuit into one gate, like fuseSingleQubitGates. The fused gate is placed 
+    # in the column of the last gate of its run. Only the gates are visited, empty cells cost nothing.
+    # @param sparseCircuit
+    # The SparseCircuit.
+    # @return Returns the optimised SparseCircuit.
+    ##
+    def fuseSparseSingleQubitGates(self, sparseCircuit):
+        newCircuit = SparseCircuit(sparseCircuit.numberOfQubits)
+        #matrix and column of the last gate of the current run of every lane
+        runs = {}
+
+        def endRun(lane):
+            if lane in runs:
+                runMatrix, position = runs.pop(lane)
+                gate = self.nameSingleQubitMatrix(runMatrix)
+                if gate != "Identity":
+                    newCircuit.addGate(gate, (lane,), (), position)
+
+        for operation in sparseCircuit.sortedOperations():
+            gate = operation.gate
+            if gate in singleQubitGates or gate == "Fused Gate":
+                lane = operation.targets[0]
+                matrix = gate.matrix if gate == "Fused Gate" else singleQubitGates[gate]
+                runMatrix = runs[lane][0] if lane in runs else np.asarray(identityMatrixTwo, dtype=complex)
+                runs[lane] = (np.matmul(matrix, runMatrix), operation.position)
+            else:
+                for lane in operation.lanes:
+                    endRun(lane)
+                newCircuit.addGate(gate, operation.targets, operation.controls, operation.position)
+
+        for lane in list(runs):
+            endRun(lane)
+
+        return newCircuit
+
+    ## Checks whether two gates act as the same gate on the same qubits. The order of interchangeable qubits, e.g. the controls of a Toffoli Gate, does not matter.
+    # @param first
+    # A tuple (gate, targets, controls).
+    # @param second
+    # A tuple (gate, targets, controls).
+    # @return Returns True if the gates are equal.
+    ##
+    def isSameGate(self, first, second):
+        return first[0] == second[0] and sorted(first[1]) == sorted(second[1]) and sorted(first[2]) == sorted(second[2])
+
+    ## Removes gates of a SparseCircuit that have no effect. Adjacent pairs of self inverse gates cancel, and diagonal gates merge into at most one
+    # Z, S and T Gate per lane: S S becomes Z and T^8 disappears. Diagonal gates are moved past the controls of multi qubit gates and measurements,
+    # which exposes further cancellations, e.g. of the CNot Gates in CNot T CNot when the T Gate is on the control. The remaining gates are placed
+    # in the first column in which they fit, which compacts the columns.
+    # @param sparseCircuit
+    # The SparseCircuit.
+    # @param numberOfPositions
+    # The number of columns of the circuit the SparseCircuit was built from, e.g. the width of a grid whose empty columns buildSparseCircuit dropped.
+    # None to count the used columns of the SparseCircuit.
+    # @return Returns a tuple of the optimised SparseCircuit and a dictionary with the number of removed gates and the number of columns the circuit
+    # lost, counted from numberOfPositions.
+    ##
+    def optimizeCircuit(self, sparseCircuit, numberOfPositions=None):
+        #the kept gates as (gate, targets, controls), removed gates are replaced with None
+        operations = []
+        #indices of the kept gates acting on every lane, the last one is the gate a new gate on the lane is adjacent to
+        laneHistory = {}
+        #power of T of the diagonal gates of every lane that were not placed yet
+        phases = {}
+
+        def place(operation):
+            operations.append(operation)
+            for lane in operation[1] + operation[2]:
+                laneHistory.setdefault(lane, []).append(len(operations) - 1)
+
+        def lastOperation(lane):
+            history = laneHistory.get(lane)
+            return history[-1] if history else None
+
+        def placePhases(lane):
+            power = phases.pop(lane, 0)
+            for gate in ("Pauli-Z-Gate", "S Gate", "T Gate"):
+                if power & phasePowers[gate]:
+                    place((gate, (lane,), ()))
+
+        for operation in sparseCircuit.sortedOperations():
+            gate, targets, controls = operation.gate, operation.targets, operation.controls
+            if gate in phasePowers:
+                phases[targets[0]] = (phases.get(targets[0], 0) + phasePowers[gate]) % 8
+                continue
+
+            #diagonal gates stay pending on lanes they commute with, on all other lanes they are placed in front of the gate
+            commutingLanes = controls if gate in controlledGates else targets if gate == "Measurement" else ()
+            for lane in targets + controls:
+                if lane not in commutingLanes:
+                    placePhases(lane)
+
+            lanes = targets + controls
+            previous = lastOperation(lanes[0])
+            if gate in selfInverseGates and previous is not None and all(lastOperation(lane) == previous for lane in lanes) and \
+                    self.isSameGate(operations[previous], (gate, targets, controls)):
+                operations[previous] = None
+                for lane in lanes:
+                    laneHistory[lane].pop()
+            else:
+                place((gate, targets, controls))
+
+        for lane in list(phases):
+            placePhases(lane)
+
+        optimizedCircuit = SparseCircuit(sparseCircuit.numberOfQubits)
+        for operation in operations:
+            if operation is not None:
+                optimizedCircuit.addGate(*operation)
+
+        if numberOfPositions is None:
+            numberOfPositions = len(sparseCircuit.columns)
+        report = {"removedGates": len(sparseCircuit.operations) - len(optimizedCircuit.operations),
+                  "removedColumns": numberOfPositions - len(optimizedCircuit.columns)}
+        return optimizedCircuit, report
@@ -10,9 +10,13 @@
 ##
 
 import cirq
-from random import randint
+import numpy as np
 
-DEBUG = True
+from circuitCompiler import CircuitCompiler, PAULI_X, PAULI_Y, PAULI_Z, HADAMARD, S_GATE, T_GATE, MEASUREMENT, CNOT, SWAP, TOFFOLI, FREDKIN, DEUTSCH_ORACLE, FUSED
+from tracing import tracer
+
+## number of shots Cirq takes if no number of repetitions is requested.
+CIRQ_REPETITIONS = 50
 
 ##
 # @class CirqSim
@@ -20,66 +24,59 @@ DEBUG = True
 ##	
 class CirqSim(object):
 
-    ## Create a Cirq circuit out of the quasim circuit
+    ##
+    # init method setting the random number generator.
+    # @param rng
+    # A numpy Generator for Deutsch Oracles. None to create one with a random seed.
+    ##
+    def __init__(self, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        self.rng = rng
+
+    ## Create a Cirq circuit out of the compiled quasim circuit
     # @param qubits
     # A list of all qubits
-    # @param circuit
-    # A list containing the quantum circuit as generated in the gui.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit as generated in the gui.
     # @return The cirqCircuit corresponding to the quantum circuit
     ##
-    def buildCirqCircuit(self, qubits, circuit):
+    def buildCirqCircuit(self, qubits, compiledCircuit):
         cirqCircuit = cirq.Circuit()
         ## Instantiate a CNot Gate
         cNotGate = cirq.CNotGate()
         ## Instantiate a Swap Gate
         swapGate = cirq.SwapGate()
-        control = 0
-        controlFirst = False
-
-        for j in range(len(circuit[0])):
-            for i in range(len(circuit)):
-                if circuit[i][j] == "Pauli-X-Gate":
-                    cirqCircuit.append(cirq.X(qubits[i]))
-                elif circuit[i][j] == "Pauli-Y-Gate":
-                    cirqCircuit.append(cirq.Y(qubits[i]))
-                elif circuit[i][j] == "Pauli-Z-Gate":
-                    cirqCircuit.append(cirq.Z(qubits[i]))
-                elif circuit[i][j] == "Hadamard Gate":
-                    cirqCircuit.append(cirq.H(qubits[i]))
-                elif circuit[i][j] == "S Gate":
-                    cirqCircuit.append(cirq.S(qubits[i]))
-                elif circuit[i][j] == "T Gate":
-                    cirqCircuit.append(cirq.T(qubits[i]))
-                elif circuit[i][j] == "Identity":
-                    pass
-                elif circuit[i][j] == "CNot Gate":
-                    if controlFirst:
-                        cirqCircuit.append(cNotGate(control, qubits[i]))
-                    else:
-                        cirqCircuit.append(cNotGate(qubits[i+1], qubits[i]))
-                elif circuit[i][j] == "Swap Gate":
-                    cirqCircuit.append(cirq.swapGate(control, qubits[i]))
-                elif circuit[i][j] == "Deutsch OracleC":
-                    pass
-                elif circuit[i][j] == "Deutsch Oracle":
-                    if randint(0,1) == 1:
-                        cirqCircuit.append(cNotGate(qubits[i-1], qubits[i]))
-                    else:
-                        pass
-                elif circuit[i][j] == "Fredkin Gate":
-                    cirqCircuit.append(cirq.CSWAP(qubits[i], qubits[i+1], qubits[i+2]))
-                elif circuit[i][j] == "Toffoli Gate":
-                    cirqCircuit.append(cirq.TOFFOLI(qubits[i-2], qubits[i-1], qubits[i]))
-                elif "Control" in circuit[i][j]:
-                    if not controlFirst:
-                        control = qubits[i]
-                        controlFirst = True
-                elif "Measurement" in circuit[i][j] :
-                    cirqCircuit.append(cirq.measure(qubits[i], key = str(i) + " " + str(j)))
-
-        if DEBUG:
-            print("Class: cirqSim Function: buildCirqCircuit Line: 42 Output: cirqCircuit after being completely build")
-            print(cirqCircuit)
+
+        for position in range(compiledCircuit.numberOfPositions):
+            for opcode, lanes, matrix in compiledCircuit.positionInstructions(position):
+                if opcode == PAULI_X:
+                    cirqCircuit.append(cirq.X(qubits[lanes[0]]))
+                elif opcode == PAULI_Y:
+                    cirqCircuit.append(cirq.Y(qubits[lanes[0]]))
+                elif opcode == PAULI_Z:
+                    cirqCircuit.append(cirq.Z(qubits[lanes[0]]))
+                elif opcode == HADAMARD:
+                    cirqCircuit.append(cirq.H(qubits[lanes[0]]))
+                elif opcode == S_GATE:
+                    cirqCircuit.append(cirq.S(qubits[lanes[0]]))
+                elif opcode == T_GATE:
+                    cirqCircuit.append(cirq.T(qubits[lanes[0]]))
+                elif opcode == FUSED:
+                    cirqCircuit.append(cirq.SingleQubitMatrixGate(matrix)(qubits[lanes[0]]))
+                elif opcode == CNOT:
+                    cirqCircuit.append(cNotGate(qubits[lanes[0]], qubits[lanes[1]]))
+                elif opcode == SWAP:
+                    cirqCircuit.append(swapGate(qubits[lanes[0]], qubits[lanes[1]]))
+                elif opcode == DEUTSCH_ORACLE:
+                    if self.rng.integers(2) == 1:
+                        cirqCircuit.append(cNotGate(qubits[lanes[0]], qubits[lanes[1]]))
+                elif opcode == FREDKIN:
+                    cirqCircuit.append(cirq.CSWAP(qubits[lanes[0]], qubits[lanes[1]], qubits[lanes[2]]))
+                elif opcode == TOFFOLI:
+                    cirqCircuit.append(cirq.TOFFOLI(qubits[lanes[0]], qubits[lanes[1]], qubits[lanes[2]]))
+                elif opcode == MEASUREMENT:
+                    cirqCircuit.append(cirq.measure(qubits[lanes[0]], key = str(lanes[0]) + " " + str(position)))
 
         return cirqCircuit
 
@@ -91,19 +88,47 @@ class CirqSim(object):
     # @return The result of the simulation.
     ##
     def simulateCircuit(self, numberOfQubits, circuit):
+        return self.simulateCompiledCircuit(CircuitCompiler().compileCircuit(circuit))
+
+    ## Generate the qubits and simulate a compiled circuit
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit as generated in the gui.
+    # @param repetitions
+    # The number of times the circuit is simulated.
+    # @return The result of the simulation.
+    ##
+    def simulateCompiledCircuit(self, compiledCircuit, repetitions=CIRQ_REPETITIONS):
         qubits = []
 
-        for i in range(numberOfQubits):
+        for i in range(compiledCircuit.numberOfQubits):
             qubits.append(cirq.GridQubit(0, i))
 
-        cirqCircuit = self.buildCirqCircuit(qubits, circuit)
+        with tracer.span("build cirq circuit"):
+            cirqCircuit = self.buildCirqCircuit(qubits, compiledCircuit)
 
         ## Simulate the circuit n times.
-        simulator = cirq.google.XmonSimulator()
-        result = simulator.run(cirqCircuit, repetitions = 50)
-
-        if DEBUG:
-            print("Class: cirqSim Function: simulateCircuit Line: 42 Output: result of simulation")
-            print(result)
+        with tracer.span("run cirq", repetitions=repetitions):
+            simulator = cirq.google.XmonSimulator()
+            result = simulator.run(cirqCircuit, repetitions = repetitions)
 
         return result
+
+    ## Simulate a compiled circuit with Cirq and measure all qubits at its end.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit as generated in the gui.
+    # @param repetitions
+    # The number of shots.
+    # @return Returns a numpy bool array of shape (repetitions, numberOfQubits) with the final measurement of every qubit, q0 first.
+    ##
+    def sampleCompiledCircuit(self, compiledCircuit, repetitions):
+        qubits = [cirq.GridQubit(0, i) for i in range(compiledCircuit.numberOfQubits)]
+
+        with tracer.span("build cirq circuit"):
+            cirqCircuit = self.buildCirqCircuit(qubits, compiledCircuit)
+            cirqCircuit.append(cirq.measure(*qubits, key="shots"))
+
+        with tracer.span("run cirq", repetitions=repetitions):
+            simulator = cirq.google.XmonSimulator()
+            result = simulator.run(cirqCircuit, repetitions = repetitions)
+
+        return result.measurements["shots"]
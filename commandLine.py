@@ -0,0 +1,250 @@
+##
+# @file commandLine.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the command line interface to simulate circuits stored as JSON without the GUI.
+#
+##
+
+import sys
+import json
+import argparse
+
+## errors of a run that are printed as JSON instead of a traceback, e.g. a missing circuit file, a missing key in it or a simulator that is not installed.
+RUN_ERRORS = (ValueError, OSError, KeyError, ImportError)
+
+##
+# Builds the parser of the command line arguments.
+# @return the argparse.ArgumentParser.
+##
+def buildParser():
+    parser = argparse.ArgumentParser(prog="quasim", description="Simulate quantum circuits without the graphical user interface.")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="simulate a circuit stored as JSON and print the result as JSON")
+    run.add_argument("circuit", help="a JSON file containing a list of lanes, an object with the list of lanes as \"circuit\" or an object with a list of \"operations\", each with a \"gate\", \"targets\", \"controls\" and an optional \"position\". - reads from stdin. A .qasm file is imported as OpenQASM 2.0 program.")
+    run.add_argument("--backend", default="matrix", help="the simulator, e.g. matrix, statevector, stabilizer, mps, cirq, \"truth table\" for single lane simulation or auto to choose the cheapest exact state vector one")
+    run.add_argument("--shots", type=int, default=None, help="measure all qubits this many times instead of returning probabilities")
+    run.add_argument("--seed", type=int, default=None, help="seed of the random numbers of shots and oracles")
+    run.add_argument("--single-lane", action="store_true", help="simulate every lane on its own")
+    run.add_argument("--no-fusion", action="store_true", help="do not fuse consecutive single qubit gates")
+    run.add_argument("--no-optimization", action="store_true", help="do not remove cancelling gates and merge diagonal gates")
+    run.add_argument("--threads", type=int, default=None, help="number of threads applying gates in the statevector simulator, used from 16 qubits on")
+    run.add_argument("--processes", type=int, default=None, help="number of worker processes of the shared memory simulator, rounded down to a power of two")
+    run.add_argument("--ram-budget", type=int, default=None, help="bytes of RAM the disk simulator may use for the chunks of the state vector")
+    run.add_argument("--state-file", default=None, help="keep the state vector of the disk simulator in this file, an interrupted simulation of the same circuit is resumed from it")
+    run.add_argument("--precision", default=None, choices=("complex64", "complex128"), help="precision of the matrix and statevector simulators, complex64 halves their memory")
+    run.add_argument("--renormalize", action="store_true", help="divide the state by its norm when rounding errors changed it, mainly useful with complex64")
+    run.add_argument("--trace", default=None, help="write the time of every stage of the simulation to this file in the Chrome trace format")
+    run.add_argument("--trace-memory", action="store_true", help="also record allocated bytes and the peak memory in the trace, this slows down the simulation")
+
+    benchmark = commands.add_parser("benchmark", help="time every simulator on generated circuits and write the timings as JSON")
+    benchmark.add_argument("--output", default="-", help="the JSON file the timings are written to, - for stdout")
+    benchmark.add_argument("--backend", action="append", default=None, help="benchmark only this simulator, can be given several times")
+    benchmark.add_argument("--widths", type=int, nargs="+", default=None, help="the numbers of qubits of the generated circuits")
+    benchmark.add_argument("--depth", type=int, default=None, help="the number of cycles of the random circuits")
+    benchmark.add_argument("--repeats", type=int, default=None, help="the number of timed runs of every circuit, the fastest one is recorded")
+    benchmark.add_argument("--quick", action="store_true", help="only generate small circuits")
+    benchmark.add_argument("--seed", type=int, default=0, help="seed of the random circuits")
+
+    compare = commands.add_parser("compare", help="compare timings with a baseline and fail on regressions")
+    compare.add_argument("baseline", help="the JSON file written by the benchmark command for the baseline")
+    compare.add_argument("current", nargs="?", default=None, help="the JSON file written by the benchmark command for the current code. Without it the benchmark is run with the settings of the baseline.")
+    compare.add_argument("--tolerance", type=float, default=None, help="the allowed relative slowdown and memory growth, e.g. 0.25")
+
+    return parser
+
+##
+# Reads a circuit from a JSON file.
+# @param path
+# The path of the file, - for stdin.
+# @return the circuit as a list of lanes, or a SparseCircuit if the file lists operations or is an OpenQASM 2.0 program.
+##
+def loadCircuit(path):
+    if path.endswith(".qasm"):
+        from qasmImport import importQasmFile
+
+        return importQasmFile(path)
+    if path == "-":
+        data = json.load(sys.stdin)
+    else:
+        with open(path) as circuitFile:
+            data = json.load(circuitFile)
+
+    if isinstance(data, dict) and "operations" in data:
+        from sparseCircuit import SparseCircuit
+
+        circuit = SparseCircuit(data.get("numberOfQubits", 0))
+        for operation in data["operations"]:
+            circuit.addGate(str(operation["gate"]), operation["targets"], operation.get("controls", ()), operation.get("position"))
+        return circuit
+    if isinstance(data, dict):
+        data = data["circuit"]
+    return [[str(gate) for gate in lane] for lane in data]
+
+##
+# Converts the result of a simulation into values JSON can store.
+# @param result
+# The result returned by the Simulator.
+# @return the converted result.
+##
+def convertResult(result):
+    if hasattr(result, "histogram"):
+        return {"repetitions": result.repetitions, "histogram": result.histogram}
+    elif hasattr(result, "tolist"):
+        return convertResult(result.tolist())
+    elif isinstance(result, (list, tuple)):
+        return [convertResult(item) for item in result]
+    elif isinstance(result, complex):
+        return [result.real, result.imag]
+    elif isinstance(result, (str, int, float)) or result is None:
+        return result
+    else:
+        return str(result)
+
+##
+# Prints an error of a run as JSON.
+# @param error
+# The exception, one of RUN_ERRORS.
+##
+def printError(error):
+    message = str(error)
+    if isinstance(error, KeyError):
+        message = "The key " + str(error) + " is missing in the circuit file."
+    json.dump({"error": message}, sys.stdout)
+    sys.stdout.write("\n")
+
+##
+# Simulates the circuit given on the command line and prints the result as JSON.
+# @param arguments
+# The parsed arguments of the run command.
+# @return the exit code.
+##
+def runCommand(arguments):
+    #only the simulator is imported, the GUI and unused simulators are never loaded
+    from simulator import Simulator
+    from tracing import tracer
+
+    try:
+        circuit = loadCircuit(arguments.circuit)
+    except RUN_ERRORS as error:
+        printError(error)
+        return 1
+    simulator = Simulator(seed=arguments.seed)
+    simulator.fuseGates = not arguments.no_fusion
+    simulator.optimizeCircuits = not arguments.no_optimization
+    if arguments.threads is not None:
+        simulator.matSim.workers = arguments.threads
+    if arguments.precision is not None:
+        simulator.matSim.setPrecision(arguments.precision)
+    simulator.matSim.renormalize = arguments.renormalize
+    if arguments.processes is not None:
+        simulator.sharedSim.workers = arguments.processes
+    if arguments.ram_budget is not None:
+        simulator.diskSim.ramBudget = arguments.ram_budget
+    if arguments.state_file is not None:
+        simulator.diskSim.statePath = arguments.state_file
+
+    if arguments.trace is not None:
+        tracer.enable(arguments.trace_memory)
+
+    try:
+        if arguments.single_lane:
+            result = simulator.singleLaneSimulation(arguments.backend, len(circuit), circuit)
+        else:
+            result = simulator.circuitSimulation(arguments.backend, len(circuit), circuit, arguments.shots)
+    except RUN_ERRORS as error:
+        printError(error)
+        return 1
+    finally:
+        if arguments.trace is not None:
+            tracer.disable()
+            tracer.exportChromeTrace(arguments.trace)
+
+    output = {"backend": arguments.backend, "numberOfQubits": len(circuit), "result": convertResult(result)}
+    if simulator.optimizationReport is not None:
+        output["optimization"] = simulator.optimizationReport
+    if arguments.precision is not None or arguments.renormalize:
+        output["normDrift"] = simulator.matSim.normDrift
+    json.dump(output, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
+
+##
+# Builds the suite of a benchmark run from the parsed arguments.
+# @param settings
+# A dictionary with the widths, depth and seed of the workloads.
+# @return the suite as returned by Workloads.buildSuite.
+##
+def buildSuite(settings):
+    from benchmark import Workloads
+
+    return Workloads(settings["seed"]).buildSuite(settings["widths"], settings["depth"])
+
+##
+# Times every simulator on the generated circuits and writes the timings as JSON.
+# @param arguments
+# The parsed arguments of the benchmark command.
+# @return the exit code.
+##
+def benchmarkCommand(arguments):
+    from benchmark import Benchmark, writeResults, DEFAULT_WIDTHS, QUICK_WIDTHS, DEFAULT_DEPTH, DEFAULT_REPEATS
+
+    widths = arguments.widths or (QUICK_WIDTHS if arguments.quick else DEFAULT_WIDTHS)
+    settings = {"widths": list(widths), "depth": arguments.depth or DEFAULT_DEPTH, "seed": arguments.seed, "backends": arguments.backend}
+
+    results = Benchmark(arguments.repeats or DEFAULT_REPEATS, arguments.backend).run(buildSuite(settings), sys.stderr)
+    results["settings"] = settings
+    writeResults(results, arguments.output)
+    return 0
+
+##
+# Compares timings with a baseline and prints the comparison.
+# @param arguments
+# The parsed arguments of the compare command.
+# @return the exit code, 1 if a measurement regressed.
+##
+def compareCommand(arguments):
+    from benchmark import Benchmark, loadResults, DEFAULT_TOLERANCE
+
+    baseline = loadResults(arguments.baseline)
+    benchmark = Benchmark(baseline["repeats"], baseline["settings"]["backends"])
+    if arguments.current is None:
+        current = benchmark.run(buildSuite(baseline["settings"]), sys.stderr)
+    else:
+        current = loadResults(arguments.current)
+
+    regressions, report = benchmark.compare(baseline, current, arguments.tolerance if arguments.tolerance is not None else DEFAULT_TOLERANCE)
+    for line in report:
+        print(line)
+    if regressions:
+        print(str(len(regressions)) + " regressions:")
+        for line in regressions:
+            print(line)
+        return 1
+
+    print("No regressions.")
+    return 0
+
+##
+# Parses the command line and runs the selected command.
+# @param args
+# The command line arguments without the program name.
+# @return the exit code.
+##
+def main(args):
+    parser = buildParser()
+    arguments = parser.parse_args(args)
+
+    if arguments.command == "run":
+        return runCommand(arguments)
+    elif arguments.command == "benchmark":
+        return benchmarkCommand(arguments)
+    elif arguments.command == "compare":
+        return compareCommand(arguments)
+
+    parser.print_help()
+    return 2
@@ -0,0 +1,603 @@
+##
+# @file diskSim.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing an out of core statevector simulator keeping the amplitudes in a memory mapped file, for registers that do not fit into RAM.
+#
+##
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+
+from circuitCompiler import CircuitCompiler, MEASUREMENT, DEUTSCH_ORACLE
+from matSim import MatSim
+
+## default number of bytes of RAM the chunks of the state vector may use.
+RAM_BUDGET = 1024**3
+## number of chunk sized arrays alive while a chunk is processed: the chunk, the result of a gate, its temporary copy and the partner chunk of a swap.
+ARRAYS_PER_CHUNK = 4
+## smallest number of qubits of a chunk, so every gate of the selection can be applied to one chunk.
+MIN_LOCAL_QUBITS = 3
+## largest number of Qubits for which the probabilities of all basis states are listed in the result.
+PROBABILITY_LIMIT = 10
+## number of the most likely basis states listed in the result of larger registers.
+MOST_LIKELY_STATES = 16
+
+##
+# @class DiskStatevector
+# @brief The state vector of a register stored in a numpy memmap. The file is processed in chunks of 2^localQubits amplitudes: the qubits on the
+# localQubits least significant axes of the file are local to every chunk, the others select the chunk. layout maps every qubit to its axis,
+# qubits are moved between axes to make the qubits of a gate local.
+##
+class DiskStatevector(object):
+
+    ##
+    # init method opening the file of the state vector.
+    # @param path
+    # The path of the file.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @param localQubits
+    # The number of qubits of a chunk.
+    # @param create
+    # True to create the file with the state |0...0>, False to open an existing file.
+    ##
+    def __init__(self, path, numberOfQubits, localQubits, create=True):
+        self.path = path
+        self.numberOfQubits = numberOfQubits
+        self.localQubits = localQubits
+        self.globalQubits = numberOfQubits - localQubits
+        self.chunkSize = 2**localQubits
+        self.numberOfChunks = 2**self.globalQubits
+        #a new memmap file is filled with zeros
+        self.amplitudes = np.memmap(path, dtype=complex, mode="w+" if create else "r+", shape=(2**numberOfQubits,))
+        if create:
+            self.amplitudes[0] = 1
+        ## axis of every qubit in the file, axis 0 is the most significant bit of the index
+        self.layout = list(range(numberOfQubits))
+
+    ## Reads a chunk into RAM.
+    # @param chunk
+    # The number of the chunk.
+    # @return Returns a copy of the chunk as a numpy array of shape (2, 2, ..., 2) with one axis per local qubit.
+    ##
+    def readChunk(self, chunk):
+        return np.reshape(np.array(self.amplitudes[chunk*self.chunkSize:(chunk+1)*self.chunkSize]), (2,) * self.localQubits)
+
+    ## Writes a chunk back to the file.
+    # @param chunk
+    # The number of the chunk.
+    # @param data
+    # The amplitudes of the chunk.
+    ##
+    def writeChunk(self, chunk, data):
+        self.amplitudes[chunk*self.chunkSize:(chunk+1)*self.chunkSize] = np.reshape(data, -1)
+
+    ## Returns the bit a chunk has on a global axis.
+    # @param chunk
+    # The number of the chunk.
+    # @param axis
+    # A global axis, smaller than globalQubits.
+    # @return Returns 0 or 1.
+    ##
+    def chunkBit(self, chunk, axis):
+        return (chunk >> (self.globalQubits - 1 - axis)) & 1
+
+    ## Writes all changed amplitudes to the file.
+    ##
+    def flush(self):
+        self.amplitudes.flush()
+
+    ## Flushes and unmaps the file.
+    ##
+    def close(self):
+        if self.amplitudes is not None:
+            self.amplitudes.flush()
+            self.amplitudes = None
+
+    ## Converts indices of the file into basis states of the register, undoing the layout.
+    # @param indices
+    # A numpy array of indices into the file.
+    # @return Returns the basis states as a numpy uint64 array, q0 is the most significant bit.
+    ##
+    def logicalIndices(self, indices):
+        indices = np.asarray(indices, dtype=np.uint64)
+        basisStates = np.zeros(len(indices), dtype=np.uint64)
+
+        for qubit, axis in enumerate(self.layout):
+            bits = (indices >> np.uint64(self.numberOfQubits - 1 - axis)) & np.uint64(1)
+            basisStates |= bits << np.uint64(self.numberOfQubits - 1 - qubit)
+
+        return basisStates
+
+    ## Reads the whole state vector in the order of the qubits. Only feasible if it fits into RAM.
+    # @return Returns the state vector as a numpy array of length 2^numberOfQubits, q0 is the most significant bit.
+    ##
+    def stateVector(self):
+        state = np.reshape(np.array(self.amplitudes), (2,) * self.numberOfQubits)
+
+        #axis i of the result is the axis of qubit i
+        return np.reshape(np.transpose(state, self.layout), -1)
+
+    ## Calculates the probability of every chunk.
+    # @return Returns a numpy array with the summed up probabilities of the amplitudes of every chunk.
+    ##
+    def chunkProbabilities(self):
+        return np.array([np.sum(np.abs(self.readChunk(chunk))**2) for chunk in range(self.numberOfChunks)])
+
+    ## Finds the most likely basis states, one chunk after the other.
+    # @param numberOfStates
+    # The number of basis states.
+    # @return Returns a list of tuples (basis state, probability) sorted by descending probability.
+    ##
+    def mostLikelyStates(self, numberOfStates):
+        candidates = []
+
+        for chunk in range(self.numberOfChunks):
+            probabilities = np.reshape(np.abs(self.readChunk(chunk))**2, -1)
+            best = np.argsort(probabilities)[::-1][:numberOfStates]
+            candidates += [(chunk * self.chunkSize + int(index), float(probabilities[index])) for index in best]
+            candidates = sorted(candidates, key=lambda candidate: -candidate[1])[:numberOfStates]
+
+        candidates = [(index, probability) for index, probability in candidates if probability > 1e-12]
+        basisStates = self.logicalIndices([index for index, probability in candidates])
+        return [(int(basisState), probability) for basisState, (index, probability) in zip(basisStates, candidates)]
+
+    ## Samples measurements of all qubits. The number of shots of every chunk is drawn first, then every chunk is read once to draw its basis states.
+    # @param repetitions
+    # The number of shots.
+    # @param rng
+    # The numpy Generator drawing the outcomes.
+    # @return Returns the measured basis states as a numpy uint64 array, q0 is the most significant bit.
+    ##
+    def sample(self, repetitions, rng):
+        if self.numberOfQubits > 64:
+            raise ValueError("Shots of more than 64 Qubits can not be sampled.")
+        chunkProbabilities = self.chunkProbabilities()
+        chunkCounts = rng.multinomial(repetitions, chunkProbabilities / np.sum(chunkProbabilities))
+        indices = []
+
+        for chunk in np.flatnonzero(chunkCounts):
+            probabilities = np.reshape(np.abs(self.readChunk(chunk))**2, -1)
+            counts = rng.multinomial(chunkCounts[chunk], probabilities / np.sum(probabilities))
+            outcomes = np.flatnonzero(counts)
+            indices.append(chunk * self.chunkSize + np.repeat(outcomes, counts[outcomes]))
+
+        return self.logicalIndices(rng.permutation(np.concatenate(indices)))
+
+##
+# @class DiskSim
+# @brief Simulate a whole circuit on a DiskStatevector. The gates are applied in passes over the file: a pass applies a run of consecutive gates
+# whose qubits are local to every chunk, or moves a qubit from a global to a local axis by exchanging half of two chunks. With checkpoints every
+# finished chunk is recorded next to the file, so an interrupted simulation can be resumed.
+##
+class DiskSim(object):
+
+    ##
+    # init method setting the RAM budget and the directory of the state files.
+    # @param rng
+    # A numpy Generator for shots and Deutsch Oracles. None to create one with a random seed.
+    # @param ramBudget
+    # The number of bytes of RAM the chunks may use, it decides the size of the chunks.
+    # @param directory
+    # The directory temporary state files are created in. None for the temporary directory of the system.
+    # @param matSim
+    # The MatSim applying gates to the chunks. None to create one.
+    ##
+    def __init__(self, rng=None, ramBudget=RAM_BUDGET, directory=None, matSim=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        if matSim is None:
+            matSim = MatSim(rng=rng)
+        self.rng = rng
+        self.ramBudget = ramBudget
+        self.directory = directory
+        self.matSim = matSim
+        ## path of a state file kept after the simulation and resumed if it belongs to the simulated circuit. None to use temporary files.
+        self.statePath = None
+
+    ## Calculates the number of qubits of a chunk, so the chunks being processed stay within the RAM budget.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @return Returns the number of local qubits.
+    ##
+    def chooseLocalQubits(self, numberOfQubits):
+        localQubits = min(numberOfQubits, (self.ramBudget // (ARRAYS_PER_CHUNK * np.dtype(complex).itemsize)).bit_length() - 1)
+        if localQubits < min(numberOfQubits, MIN_LOCAL_QUBITS):
+            raise ValueError("A RAM budget of " + str(self.ramBudget) + " bytes is too small, chunks of at least " + str(MIN_LOCAL_QUBITS) + " qubits are needed.")
+
+        return localQubits
+
+    ## Checks whether the directory of a state file has room for it.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @param path
+    # The path of the state file.
+    # @return Returns True if the file fits.
+    ##
+    def fitsOnDisk(self, numberOfQubits, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        return shutil.disk_usage(directory).free >= 2**numberOfQubits * np.dtype(complex).itemsize
+
+    ## Builds a key identifying a compiled circuit, so a state file is only resumed with the circuit it was created for.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @return Returns a hex string.
+    ##
+    def circuitKey(self, compiledCircuit):
+        digest = hashlib.sha256(str(compiledCircuit.numberOfQubits).encode())
+        for opcode, qubits, matrix in compiledCircuit.instructions:
+            digest.update(repr((opcode, qubits)).encode())
+            digest.update(np.ascontiguousarray(matrix).tobytes())
+
+        return digest.hexdigest()
+
+    ## Collects the operations changing the state. Measurements are left out and it is decided which Deutsch Oracles are applied.
+    # @param compiledCircuit
+    # The CompiledCircuit.
+    # @param oracleChoices
+    # The decisions of an earlier run as a list of booleans, or an empty list to draw them.
+    # @return Returns a list of tuples (opcode, qubits, matrix). oracleChoices is extended by the drawn decisions.
+    ##
+    def buildOperations(self, compiledCircuit, oracleChoices):
+        operations = []
+        oracles = 0
+
+        for opcode, qubits, matrix in compiledCircuit.instructions:
+            if opcode == MEASUREMENT:
+                continue
+            if opcode == DEUTSCH_ORACLE:
+                if oracles == len(oracleChoices):
+                    oracleChoices.append(bool(self.rng.integers(2)))
+                oracles += 1
+                if not oracleChoices[oracles-1]:
+                    continue
+            operations.append((opcode, qubits, matrix))
+
+        return operations
+
+    ## Checks whether an operation can be applied to every chunk on its own. Diagonal gates always can, their global qubits only select a phase per chunk.
+    # @param state
+    # The DiskStatevector.
+    # @param operation
+    # A tuple (opcode, qubits, matrix).
+    # @return Returns True if the operation is local.
+    ##
+    def isLocal(self, state, operation):
+        return self.matSim.isDiagonal(operation) or all(state.layout[qubit] >= state.globalQubits for qubit in operation[1])
+
+    ## Decides what the next pass over the file does.
+    # @param state
+    # The DiskStatevector.
+    # @param operations
+    # The operations of the circuit.
+    # @param start
+    # The index of the first operation not applied yet.
+    # @return Returns ("gates", end) to apply the operations from start to end, or ("swap", globalAxis, localAxis) to exchange the qubits of two axes.
+    ##
+    def planPass(self, state, operations, start):
+        end = start
+        while end < len(operations) and self.isLocal(state, operations[end]):
+            end += 1
+        if end > start:
+            return ("gates", end)
+
+        axes = [state.layout[qubit] for qubit in operations[start][1]]
+        globalAxis = min(axis for axis in axes if axis < state.globalQubits)
+
+        #the qubit moved out of the chunks is the one needed again latest
+        def nextUse(axis):
+            qubit = state.layout.index(axis)
+            for index in range(start, len(operations)):
+                if qubit in operations[index][1] and not self.matSim.isDiagonal(operations[index]):
+                    return index
+            return len(operations)
+
+        localAxis = max((axis for axis in range(state.globalQubits, state.numberOfQubits) if axis not in axes), key=nextUse)
+
+        return ("swap", globalAxis, localAxis)
+
+    ## Returns the number of steps of a pass. A gate pass processes one chunk per step, a swap pass two.
+    # @param state
+    # The DiskStatevector.
+    # @param plan
+    # The pass as returned by planPass.
+    # @return Returns the number of steps.
+    ##
+    def numberOfSteps(self, state, plan):
+        if plan[0] == "swap":
+            return state.numberOfChunks // 2
+        return state.numberOfChunks
+
+    ## Applies an operation to a chunk.
+    # @param state
+    # The DiskStatevector.
+    # @param chunk
+    # The number of the chunk.
+    # @param data
+    # The amplitudes of the chunk as returned by readChunk.
+    # @param operation
+    # A local tuple (opcode, qubits, matrix).
+    # @return Returns the amplitudes after the operation.
+    ##
+    def applyOperation(self, state, chunk, data, operation):
+        opcode, qubits, matrix = operation
+        axes = [state.layout[qubit] for qubit in qubits]
+        localAxes = [axis - state.globalQubits for axis in axes if axis >= state.globalQubits]
+
+        if self.matSim.isDiagonal(operation):
+            #global qubits pick the part of the diagonal belonging to the chunk
+            diagonal = np.reshape(np.diag(matrix), (2,) * len(qubits))
+            diagonal = diagonal[tuple(state.chunkBit(chunk, axis) if axis < state.globalQubits else slice(None) for axis in axes)]
+            shape = [1] * state.localQubits
+            for axis in localAxes:
+                shape[axis] = 2
+            data *= np.reshape(np.transpose(diagonal, np.argsort(localAxes)), shape)
+            return data
+        elif opcode in self.matSim.permutationMoves:
+            return self.matSim.applyPermutation(data, self.matSim.permutationMoves[opcode], localAxes)
+
+        return self.matSim.applyGate(data, matrix, localAxes)
+
+    ## Executes one step of a pass in RAM.
+    # @param state
+    # The DiskStatevector.
+    # @param plan
+    # The pass as returned by planPass.
+    # @param operations
+    # The operations of the circuit.
+    # @param start
+    # The index of the first operation of the pass.
+    # @param step
+    # The number of the step.
+    # @return Returns a list of tuples (chunk, data) that have to be written to the file.
+    ##
+    def runStep(self, state, plan, operations, start, step):
+        if plan[0] == "gates":
+            data = state.readChunk(step)
+            for operation in operations[start:plan[1]]:
+                data = self.applyOperation(state, step, data, operation)
+            return [(step, data)]
+
+        kind, globalAxis, localAxis = plan
+        #the step-th chunk with a 0 on the global axis is paired with the chunk with a 1
+        mask = 1 << (state.globalQubits - 1 - globalAxis)
+        low = step & (mask - 1)
+        chunkZero = ((step - low) << 1) | low
+        chunkOne = chunkZero | mask
+        dataZero = state.readChunk(chunkZero)
+        dataOne = state.readChunk(chunkOne)
+
+        #the half of the first chunk with a 1 on the local axis is exchanged with the half of the second chunk with a 0
+        localIndex = localAxis - state.globalQubits
+        viewZero = np.moveaxis(dataZero, localIndex, 0)
+        viewOne = np.moveaxis(dataOne, localIndex, 0)
+        exchanged = viewZero[1].copy()
+        viewZero[1] = viewOne[0]
+        viewOne[0] = exchanged
+
+        return [(chunkZero, dataZero), (chunkOne, dataOne)]
+
+    ## Writes the progress of a simulation next to the state file.
+    # @param state
+    # The DiskStatevector.
+    # @param metadata
+    # A dictionary describing the progress.
+    ##
+    def writeMetadata(self, state, metadata):
+        metadata["layout"] = list(state.layout)
+        temporaryPath = state.path + ".json.tmp"
+        with open(temporaryPath, "w") as metadataFile:
+            json.dump(metadata, metadataFile)
+        os.replace(temporaryPath, state.path + ".json")
+
+    ## Writes the result of a step to the journal before it is written to the state file, so a step interrupted while writing can be repeated.
+    # @param state
+    # The DiskStatevector.
+    # @param metadata
+    # A dictionary describing the progress.
+    # @param writes
+    # The list of tuples (chunk, data) returned by runStep.
+    ##
+    def writeJournal(self, state, metadata, writes):
+        temporaryPath = state.path + ".journal.tmp"
+        with open(temporaryPath, "wb") as journalFile:
+            np.savez(journalFile, position=np.array([metadata["pass"], metadata["step"]]), chunks=np.array([chunk for chunk, data in writes]),
+                     data=np.stack([data for chunk, data in writes]))
+            journalFile.flush()
+            os.fsync(journalFile.fileno())
+        os.replace(temporaryPath, state.path + ".journal")
+
+    ## Applies all operations that are not applied yet, pass after pass.
+    # @param state
+    # The DiskStatevector.
+    # @param operations
+    # The operations of the circuit.
+    # @param metadata
+    # A dictionary with the index of the next operation, the number of finished passes and the number of finished steps of the current pass.
+    # @param checkpoint
+    # True to record every finished step next to the state file.
+    ##
+    def execute(self, state, operations, metadata, checkpoint):
+        while metadata["operation"] < len(operations):
+            start = metadata["operation"]
+            plan = self.planPass(state, operations, start)
+
+            for step in range(metadata["step"], self.numberOfSteps(state, plan)):
+                writes = self.runStep(state, plan, operations, start, step)
+                if checkpoint:
+                    self.writeJournal(state, metadata, writes)
+                for chunk, data in writes:
+                    state.writeChunk(chunk, data)
+                if checkpoint:
+                    state.flush()
+                    metadata["step"] = step + 1
+                    self.writeMetadata(state, metadata)
+
+            if plan[0] == "swap":
+                kind, globalAxis, localAxis = plan
+                globalQubit = state.layout.index(globalAxis)
+                localQubit = state.layout.index(localAxis)
+                state.layout[globalQubit], state.layout[localQubit] = localAxis, globalAxis
+            else:
+                metadata["operation"] = plan[1]
+            metadata["pass"] += 1
+            metadata["step"] = 0
+            if checkpoint:
+                self.writeMetadata(state, metadata)
+
+        #the journal of the last step is not needed once the circuit is finished
+        if checkpoint and os.path.exists(state.path + ".journal"):
+            os.remove(state.path + ".journal")
+
+    ## Runs a compiled circuit on a new state file. Measurements are skipped like in the matrix simulator.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @param path
+    # The path of the state file.
+    # @param checkpoint
+    # True to record the progress next to the state file, so resume can continue an interrupted simulation.
+    # @return Returns the DiskStatevector of the final state.
+    ##
+    def runCompiledCircuit(self, compiledCircuit, path, checkpoint=False):
+        numberOfQubits = compiledCircuit.numberOfQubits
+        if not self.fitsOnDisk(numberOfQubits, path):
+            raise ValueError("The state vector of " + str(numberOfQubits) + " Qubits does not fit into the free space next to " + path + ".")
+
+        state = DiskStatevector(path, numberOfQubits, self.chooseLocalQubits(numberOfQubits))
+        oracleChoices = []
+        operations = self.buildOperations(compiledCircuit, oracleChoices)
+        metadata = {"numberOfQubits": numberOfQubits, "localQubits": state.localQubits, "circuit": self.circuitKey(compiledCircuit),
+                    "oracleChoices": oracleChoices, "operation": 0, "pass": 0, "step": 0}
+        if checkpoint:
+            self.writeMetadata(state, metadata)
+
+        self.execute(state, operations, metadata, checkpoint)
+        state.flush()
+
+        return state
+
+    ## Continues a simulation from the progress recorded next to its state file. A step interrupted while writing is repeated from the journal.
+    # @param compiledCircuit
+    # The CompiledCircuit the state file was created for.
+    # @param path
+    # The path of the state file.
+    # @return Returns the DiskStatevector of the final state.
+    ##
+    def resume(self, compiledCircuit, path):
+        with open(path + ".json") as metadataFile:
+            metadata = json.load(metadataFile)
+        if metadata["circuit"] != self.circuitKey(compiledCircuit):
+            raise ValueError("The state file " + path + " belongs to another circuit.")
+
+        state = DiskStatevector(path, metadata["numberOfQubits"], metadata["localQubits"], create=False)
+        state.layout = list(metadata["layout"])
+
+        if os.path.exists(path + ".journal"):
+            with np.load(path + ".journal") as journal:
+                if list(journal["position"]) == [metadata["pass"], metadata["step"]]:
+                    for chunk, data in zip(journal["chunks"], journal["data"]):
+                        state.writeChunk(int(chunk), data)
+                    state.flush()
+                    metadata["step"] += 1
+                    self.writeMetadata(state, metadata)
+
+        operations = self.buildOperations(compiledCircuit, metadata["oracleChoices"])
+        self.execute(state, operations, metadata, True)
+        state.flush()
+
+        return state
+
+    ## Removes a state file and the files recording its progress.
+    # @param path
+    # The path of the state file.
+    ##
+    def removeStateFile(self, path):
+        for suffix in ("", ".json", ".journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    ## Runs a compiled circuit and passes its final state to a function. Without statePath the state lives in a temporary file removed afterwards,
+    # with statePath the state file is kept and resumed if it belongs to the circuit.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @param function
+    # A function taking the DiskStatevector.
+    # @return Returns the return value of the function.
+    ##
+    def withFinalState(self, compiledCircuit, function):
+        if self.statePath is not None:
+            if os.path.exists(self.statePath + ".json"):
+                state = self.resume(compiledCircuit, self.statePath)
+            else:
+                state = self.runCompiledCircuit(compiledCircuit, self.statePath, True)
+            try:
+                return function(state)
+            finally:
+                state.close()
+
+        fileDescriptor, path = tempfile.mkstemp(suffix=".state", prefix="quasim-", dir=self.directory)
+        os.close(fileDescriptor)
+        try:
+            state = self.runCompiledCircuit(compiledCircuit, path)
+            try:
+                return function(state)
+            finally:
+                state.close()
+        finally:
+            self.removeStateFile(path)
+
+    ## Describes a simulated state by the probabilities of all basis states, or of the most likely ones for larger registers.
+    # @param state
+    # The DiskStatevector.
+    # @return Returns a list of strings.
+    ##
+    def buildResult(self, state):
+        numberOfQubits = state.numberOfQubits
+
+        if numberOfQubits <= PROBABILITY_LIMIT:
+            probabilities = np.abs(state.stateVector())**2
+            basisStates = enumerate(probabilities)
+        else:
+            basisStates = state.mostLikelyStates(MOST_LIKELY_STATES)
+
+        return ["Probability of |" + format(basisState, "0" + str(numberOfQubits) + "b") + "> :  " + str(round(probability, 2)) for basisState, probability in basisStates]
+
+    ## Simulate a compiled circuit.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @return Returns the result as returned by buildResult.
+    ##
+    def simulateCompiledCircuit(self, compiledCircuit):
+        return self.withFinalState(compiledCircuit, self.buildResult)
+
+    ## Simulate a circuit.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param circuit
+    # A list containing the quantum circuit as generated in the gui, without gaps.
+    # @return Returns the result as returned by buildResult.
+    ##
+    def simulateCircuit(self, numberOfQubits, circuit):
+        return self.simulateCompiledCircuit(CircuitCompiler().compileCircuit(circuit))
+
+    ## Simulate a compiled circuit and measure all qubits at its end.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @param repetitions
+    # The number of shots.
+    # @return Returns a numpy uint8 array of shape (repetitions, numberOfQubits) with the outcome of every qubit.
+    ##
+    def sampleCompiledCircuit(self, compiledCircuit, repetitions):
+        basisStates = self.withFinalState(compiledCircuit, lambda state: state.sample(repetitions, self.rng))
+        shifts = np.arange(compiledCircuit.numberOfQubits - 1, -1, -1, dtype=np.uint64)
+
+        return ((basisStates[:, np.newaxis] >> shifts) & np.uint64(1)).astype(np.uint8)
@@ -0,0 +1,41 @@
+##
+# @file gates.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the matrix representation of all quantum gates used by the simulators.
+#
+##
+
+import math
+
+## base representation of quantum gates as matrix
+#one quibt gates
+## base matrix representation of a Pauli-X-Gate as a python list.
+gateX = [[0, 1], [1, 0]]
+## base matrix representation of a Pauli-Y-Gate as a python list.
+gateY = [[0, -1j], [1j, 0]]
+## base matrix representation of a Pauli-Z-Gate as a python list.
+gateZ = [[1, 0], [0, -1]]
+## base matrix representation of a H Gate as a python list.
+gateH = [[1 / math.sqrt(2), 1 / math.sqrt(2)], [1 / math.sqrt(2), -(1 / math.sqrt(2))]]
+## base matrix representation of a S Gate as a python list.
+gateS = [[1, 0],    [0, 1j]]
+## base matrix representation of a T Gate as a python list.
+gateT = [[1, 0], [0, ((1+1j) / (math.sqrt(2)))]]
+#two qubit gates
+gateCnotCFirst = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]
+gateCnotCSecond = [[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]]
+gateSwap = [[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]]
+#three qubit gates
+gateFredkin = [[1, 0, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 0, 1, 0, 0, 0], 
+                [0, 0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 0, 0, 1]]
+gateToffoli = [[1, 0, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 0, 1, 0, 0, 0],
+                [0, 0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 0, 0, 1], [0, 0, 0, 0, 0, 0, 1, 0]]
+
+## identity Matrices
+identityMatrixOne = [[1]]
+identityMatrixTwo = [[1, 0], [0, 1]]
+identityMatrixFour = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]
@@ -61,7 +61,7 @@ class Gui(object):
         self.valueSimulator = tk.StringVar()
         self.valueSimulator.trace('w', self.callbackFunc)
         self.comboSimulator = ttk.Combobox(self.frameOptions, textvar = self.valueSimulator)
-        self.comboSimulator['values']= ("truth table", "matrix", "cirq")
+        self.comboSimulator['values']= ("truth table", "matrix", "statevector", "stabilizer", "mps", "cirq")
         self.comboSimulator.current(1)
         lblSimulator.grid(column=0, row=0)
         self.comboSimulator.grid(column=1, row=0)
@@ -78,6 +78,10 @@ class Gui(object):
             self.comboMode['values']= ("single lane",)
         elif self.comboSimulator.get() == "matrix":
             self.comboMode['values']= ("single lane", "whole circuit")
+        elif self.comboSimulator.get() == "statevector":
+            self.comboMode['values']= ("whole circuit",)
+        elif self.comboSimulator.get() == "stabilizer" or self.comboSimulator.get() == "mps":
+            self.comboMode['values']= ("whole circuit",)
         elif self.comboSimulator.get() == "cirq":
             self.comboMode['values']= ("whole circuit",)
         self.comboMode.current(0)
@@ -90,8 +94,12 @@ class Gui(object):
         #label and spinbox for number of Qubits
         lblNumberOfQubits = tk.Label(self.frameOptions, text="Number of Qubits: ")
         lblNumberOfQubits.grid(column=4, row=0)
-        if self.comboSimulator.get() == "cirq":
+        if self.comboSimulator.get() == "cirq" or self.comboSimulator.get() == "stabilizer" or self.comboSimulator.get() == "mps":
             self.spinNumberOfQubits = tk.Spinbox(self.frameOptions, from_=1, to=50, width=5)
+        elif self.comboSimulator.get() == "statevector":
+            self.spinNumberOfQubits = tk.Spinbox(self.frameOptions, from_=1, to=25, width=5)
+        elif self.comboSimulator.get() == "matrix":
+            self.spinNumberOfQubits = tk.Spinbox(self.frameOptions, from_=1, to=12, width=5)
         else:
             self.spinNumberOfQubits = tk.Spinbox(self.frameOptions, from_=1, to=7, width=5)
         self.spinNumberOfQubits.grid(column=5,row=0)
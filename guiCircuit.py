@@ -11,10 +11,26 @@
 
 import tkinter as tk
 import tkinter.ttk as ttk
-import time
 from simulator import Simulator
 from functools import partial
-from random import randint
+from algorithms import Algorithms, NUMBER_OF_POSITIONS
+
+## images of the cells of the circuits built by Algorithms, the controls of their multi qubit gates are always above the target.
+algorithmImages = {"Pauli-X-Gate": "XGate.gif",
+                   "Pauli-Y-Gate": "YGate.gif",
+                   "Pauli-Z-Gate": "ZGate.gif",
+                   "Hadamard Gate": "HGate.gif",
+                   "S Gate": "SGate.gif",
+                   "T Gate": "TGate.gif",
+                   "Identity": "Identity.gif",
+                   "Measurement": "Measurement.gif",
+                   "Control": "ControlDown.gif",
+                   "CNot Gate": "CnotGateUp.gif",
+                   "Toffoli1": "ControlDown.gif",
+                   "Toffoli2": "ControlMid.gif",
+                   "Toffoli Gate": "CnotGateUp.gif",
+                   "Deutsch OracleC": "ControlDown.gif",
+                   "Deutsch Oracle": "OracleUp.gif"}
 
 ##
 # @class GuiCircuit 
@@ -34,6 +50,7 @@ class GuiCircuit(object):
         self.circuit = []
         self.numberOfQubits = " "
         self.simulatorApp =  Simulator()
+        self.algorithms = Algorithms()
         
         self.frameCircuit = tk.Frame(self.parent)
         self.frameCircuit.config(bg="white")
@@ -52,10 +69,7 @@ class GuiCircuit(object):
     def startSimulation(self):
         self.simulationCounter += 1
         if self.mode == "whole circuit": ##simulate the whole circuit
-            start = time.time()
             simulationResult = self.simulatorApp.circuitSimulation(self.simulator, self.numberOfQubits, self.circuit)
-            ende = time.time()
-            print('{:5.3f}s'.format(ende-start))
         else: ##simulate the circuit lane by lane
             simulationResult = self.simulatorApp.singleLaneSimulation(self.simulator, self.numberOfQubits, self.circuit)
             
@@ -84,6 +98,7 @@ class GuiCircuit(object):
     # An integer variable containing the number of the qubit lane the gate will be inserted.
     ##   
     def insertNewGateIntoCircuit(self, gate, position, qubit):
+        self.extendCircuit(position)
         if self.circuit[qubit][position] == "0":
             self.circuit[qubit][position] = gate
             return True
@@ -107,7 +122,7 @@ class GuiCircuit(object):
 
         for i in range(numberOfQubits):
             gateList = []
-            for j in range(15):
+            for j in range(NUMBER_OF_POSITIONS):
                 gateList.append("0")
             self.circuit.append(gateList)
 
@@ -127,7 +142,7 @@ class GuiCircuit(object):
         
         lblNumberOfSimulation = tk.Label(self.ResultWindow, text = "Simulation Number: " + str(self.simulationCounter))
         lblNumberOfSimulation.grid(column = self.simulationCounter, row = 0)
-        if self.simulator == "matrix":
+        if self.simulator == "matrix" or self.simulator == "statevector" or self.simulator == "stabilizer" or self.simulator == "mps":
             for i in range(len(simulationResult)):
                 lblResult = tk.Label(self.ResultWindow, text = simulationResult[i], wraplength = 210)
                 lblResult.grid(column = self.simulationCounter, row = i+1)
@@ -145,18 +160,40 @@ class GuiCircuit(object):
         for i in range(int(self.numberOfQubits)):
             lblQubit = tk.Label(self.frameCircuit, text = "q" + str(i), bg="white", pady=34)
             lblQubit.grid(column = 0, row = i+1)
-            for j in range(15):
-                if j < 10:
-                    lblPosition = tk.Label(self.frameCircuit, text = str(j), bg="white", padx=52)
-                else:
-                    lblPosition = tk.Label(self.frameCircuit, text = str(j), bg="white", padx=48)
-                    
-                lblPosition.grid(column = j+1, row = 0)
-                
-                imageWire = tk.PhotoImage(file="./pics/Wire.gif")
-                lblWire = tk.Label(self.frameCircuit, image=imageWire, highlightthickness=0, borderwidth=0)
-                lblWire.image = imageWire
-                lblWire.grid(column = j+1, row = i+1)
+        for j in range(len(self.circuit[0])):
+            self.printColumn(j)
+
+    ## Prints the number and the empty wires of one position.
+    # @param position
+    # An integer variable containing the position.
+    ##
+    def printColumn(self, position):
+        if position < 10:
+            lblPosition = tk.Label(self.frameCircuit, text = str(position), bg="white", padx=52)
+        else:
+            lblPosition = tk.Label(self.frameCircuit, text = str(position), bg="white", padx=48)
+        lblPosition.grid(column = position+1, row = 0)
+
+        for i in range(int(self.numberOfQubits)):
+            imageWire = tk.PhotoImage(file="./pics/Wire.gif")
+            lblWire = tk.Label(self.frameCircuit, image=imageWire, highlightthickness=0, borderwidth=0)
+            lblWire.image = imageWire
+            lblWire.grid(column = position+1, row = i+1)
+
+    ## Adds empty positions to the circuit list and the window until the given position exists, so the depth of a circuit is not limited.
+    # @param position
+    # An integer variable containing the position that is needed.
+    ##
+    def extendCircuit(self, position):
+        while len(self.circuit[0]) <= position:
+            for lane in self.circuit:
+                lane.append("0")
+            self.printColumn(len(self.circuit[0]) - 1)
+        ## one empty position after the circuit can be selected to make it deeper
+        try:
+            self.comboGateSelectionPosition['values'] = tuple(str(j) for j in range(len(self.circuit[0]) + 1))
+        except (AttributeError, tk.TclError):
+            pass
             
     ## Opens a new window to select a gate to add to the quantum circuit or delete it and start a simulation. The selection of gates depends on the number of Qubits and simulation modes are counted and placed side-by-side in one window.
     # @param[in] numberOfQubits
@@ -203,7 +240,7 @@ class GuiCircuit(object):
         self.comboGateSelectionQubit.current(0)
 
         self.comboGateSelectionPosition = ttk.Combobox(self.gateSelectionWindow)
-        self.comboGateSelectionPosition['values']= ("0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13", "14")
+        self.comboGateSelectionPosition['values']= tuple(str(j) for j in range(len(self.circuit[0]) + 1))
         self.comboGateSelectionPosition.current(0)
 
         btnAddGate = tk.Button(self.gateSelectionWindow, text="Add", command = self.addGate)
@@ -299,7 +336,9 @@ class GuiCircuit(object):
         qubit = int(self.comboGateSelectionQubit.get())
         position = int(self.comboGateSelectionPosition.get())
         imageGate = tk.PhotoImage(file="./pics/Wire.gif")
-        if self.circuit[qubit][position] == "CNot Gate":
+        if position >= len(self.circuit[qubit]):
+            return
+        elif self.circuit[qubit][position] == "CNot Gate":
             self.circuit[qubit][position] = "0"
             self.printNewGate(imageGate, position, qubit)
             try:
@@ -438,52 +477,34 @@ class GuiCircuit(object):
         self.numberOfQubits = 0
         self.circuit = []
      
-    ## Prints and inserts the Algorithm of Deutsch as a quantum circuit.
-    # Circuit: <br>
-    # q0: ----H---*---H---M <br>
-    # q1: X---H---f---H---M <br>
+    ## Prints and inserts a circuit built by Algorithms into a new circuit of the matrix simulator.
+    # @param circuit
+    # The circuit list, one lane for every Qubit.
     ##
-    def algorithmDeutsch(self):
+    def printAlgorithm(self, circuit):
         self.simulator = "matrix"
         self.mode = "whole circuit"
-        self.numberOfQubits = 2
+        self.numberOfQubits = len(circuit)
         self.circuit = []
-        
-        self.buildCircuit(self.simulator, self.mode, self.numberOfQubits)
-        
-        self.insertNewGateIntoCircuit("Pauli-X-Gate", 0, 1)
-        imageGate = tk.PhotoImage(file="./pics/XGate.gif")
-        self.printNewGate(imageGate, 0, 1)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 1, 0)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 1, 0)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 1, 1)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 1, 1)
 
-        imageGate = tk.PhotoImage(file="./pics/ControlDown.gif")
-        self.insertNewGateIntoCircuit("Deutsch OracleC", 2, 0)
-        self.printNewGate(imageGate, 2, 0)
-        imageGate = tk.PhotoImage(file="./pics/OracleUp.gif")
-        self.insertNewGateIntoCircuit("Deutsch Oracle", 2, 1)
-        self.printNewGate(imageGate, 2, 1)
+        self.buildCircuit(self.simulator, self.mode, self.numberOfQubits)
 
-        self.insertNewGateIntoCircuit("Hadamard Gate", 3, 0)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 3, 0)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 3, 1)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 3, 1)
+        for qubit in range(len(circuit)):
+            for position in range(len(circuit[qubit])):
+                gate = circuit[qubit][position]
+                if gate != "0" and self.insertNewGateIntoCircuit(gate, position, qubit):
+                    imageGate = tk.PhotoImage(file="./pics/" + algorithmImages[gate])
+                    self.printNewGate(imageGate, position, qubit)
 
-        self.insertNewGateIntoCircuit("Measurement", 4, 0)
-        imageGate = tk.PhotoImage(file="./pics/Measurement.gif")
-        self.printNewGate(imageGate, 4, 0)
+    ## Prints and inserts the Algorithm of Deutsch as a quantum circuit.
+    # Circuit: <br>
+    # q0: ----H---*---H---M <br>
+    # q1: X---H---f---H---M <br>
+    ##
+    def algorithmDeutsch(self):
+        self.printAlgorithm(self.algorithms.buildDeutschCircuit())
 
-        self.insertNewGateIntoCircuit("Measurement", 4, 1)
-        imageGate = tk.PhotoImage(file="./pics/Measurement.gif")
-        self.printNewGate(imageGate, 4, 1)
-        
-    ## Prints and inserts the Algorithm of Grover as a quantum circuit. There are four different possible circuit depending on the randomly generated bit sequence. <br>
+    ## Prints and inserts the Algorithm of Grover as a quantum circuit. There are four different possible circuit depending on the bit sequence drawn with the random numbers of the Simulator, so setSeed of simulatorApp makes it reproducible. <br>
     # Circuit for [0, 0]: <br>
     # q0: ----H---X---*---X---H---X-------*-------X---H <br>
     # q1: ----H---X---*---X---H---X---H---C---H---X---H <br>
@@ -502,98 +523,5 @@ class GuiCircuit(object):
     # q2: X---H------T------------------------------- <br>
     ##        
     def algorithmGrover(self):
-        self.simulator = "matrix"
-        self.mode = "whole circuit"
-        # three qubits are needed q0: x1, q1: x2, q3: q
-        self.numberOfQubits = 3
-        self.circuit = []
-            
-        self.buildCircuit(self.simulator, self.mode, self.numberOfQubits)
-        
-        #randomly generate a bit sequence [x1, x2]
-        bitSequence = []
-        for _ in range(2):
-            bitSequence.append(randint(0,1))
-        
-        self.insertNewGateIntoCircuit("Pauli-X-Gate", 0, 2)
-        imageGate = tk.PhotoImage(file="./pics/XGate.gif")
-        self.printNewGate(imageGate, 0, 2)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 1, 0)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 1, 0)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 1, 1)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 1, 1)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 1, 2)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 1, 2)
-        
-        #generate the oracle with information about the bit sequence
-        if bitSequence[0] == 1:
-            pass
-        elif bitSequence[0] == 0:
-            self.insertNewGateIntoCircuit("Pauli-X-Gate", 2, 0)
-            imageGate = tk.PhotoImage(file="./pics/XGate.gif")
-            self.printNewGate(imageGate, 2, 0)
-            self.insertNewGateIntoCircuit("Pauli-X-Gate", 4, 0)
-            self.printNewGate(imageGate, 4, 0)
-            
-        if bitSequence[1] == 1:
-             pass
-        elif bitSequence[1] == 0:
-            self.insertNewGateIntoCircuit("Pauli-X-Gate", 2, 1)
-            imageGate = tk.PhotoImage(file="./pics/XGate.gif")
-            self.printNewGate(imageGate, 2, 1)
-            self.insertNewGateIntoCircuit("Pauli-X-Gate", 4, 1)
-            self.printNewGate(imageGate, 4, 1)
-        
-        #Toffoli
-        imageGate = tk.PhotoImage(file="./pics/ControlDown.gif")
-        if self.insertNewGateIntoCircuit("Toffoli1", 3, 0):
-            self.printNewGate(imageGate, 3, 0)
-            imageGate = tk.PhotoImage(file="./pics/ControlMid.gif")
-        if self.insertNewGateIntoCircuit("Toffoli2", 3, 1):
-            self.printNewGate(imageGate, 3, 1)
-            imageGate = tk.PhotoImage(file="./pics/CnotGateUp.gif")
-        if self.insertNewGateIntoCircuit("Toffoli Gate", 3, 2):
-            self.printNewGate(imageGate, 3, 2)
-            
-            
-        self.insertNewGateIntoCircuit("Hadamard Gate", 5, 0)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 5, 0)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 5, 1)
-        self.printNewGate(imageGate, 5, 1)
-        
-        self.insertNewGateIntoCircuit("Pauli-X-Gate", 6, 0)
-        imageGate = tk.PhotoImage(file="./pics/XGate.gif")
-        self.printNewGate(imageGate, 6, 0)
-        self.insertNewGateIntoCircuit("Pauli-X-Gate", 6, 1)
-        self.printNewGate(imageGate, 6, 1)
-            
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.insertNewGateIntoCircuit("Hadamard Gate", 7, 1)
-        self.printNewGate(imageGate, 7, 1)
-        
-        imageGate = tk.PhotoImage(file="./pics/CnotGateUp.gif")
-        self.insertNewGateIntoCircuit("CNot Gate", 8, 1)
-        self.printNewGate(imageGate, 8, 1)
-        imageGate = tk.PhotoImage(file="./pics/ControlDown.gif")
-        self.insertNewGateIntoCircuit("Control", 8, 0)
-        self.printNewGate(imageGate, 8, 0)
-        
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.insertNewGateIntoCircuit("Hadamard Gate", 9, 1)
-        self.printNewGate(imageGate, 9, 1)
-        
-        self.insertNewGateIntoCircuit("Pauli-X-Gate", 10, 0)
-        imageGate = tk.PhotoImage(file="./pics/XGate.gif")
-        self.printNewGate(imageGate, 10, 0)
-        self.insertNewGateIntoCircuit("Pauli-X-Gate", 10, 1)
-        self.printNewGate(imageGate, 10, 1)
-        
-        self.insertNewGateIntoCircuit("Hadamard Gate", 11, 0)
-        imageGate = tk.PhotoImage(file="./pics/HGate.gif")
-        self.printNewGate(imageGate, 11, 0)
-        self.insertNewGateIntoCircuit("Hadamard Gate", 11, 1)
-        self.printNewGate(imageGate, 11, 1)
+        bitSequence = self.algorithms.randomBitSequence(self.simulatorApp.shotSampler.rng)
+        self.printAlgorithm(self.algorithms.buildGroverCircuit(bitSequence))
@@ -9,41 +9,37 @@
 #
 ##
 
-import math
+import itertools
 import numpy as np
-from random import randint
-from itertools import cycle
+from concurrent.futures import ThreadPoolExecutor
 
-DEBUG = True
+from gates import identityMatrixOne, identityMatrixTwo
+from circuitCompiler import CircuitCompiler, MEASUREMENT, DEUTSCH_ORACLE, FUSED, gateMatrices, permutationOpcodes, diagonalOpcodes
+from cache import LruCache
+from tracing import tracer
 
-## base representation of quantum gates as matrix
-#one quibt gates
-## base matrix representation of a Pauli-X-Gate as a python list.
-gateX = [[0, 1], [1, 0]]
-## base matrix representation of a Pauli-Y-Gate as a python list.
-gateY = [[0, -1j], [1j, 0]]
-## base matrix representation of a Pauli-Z-Gate as a python list.
-gateZ = [[1, 0], [0, -1]]
-## base matrix representation of a H Gate as a python list.
-gateH = [[1 / math.sqrt(2), 1 / math.sqrt(2)], [1 / math.sqrt(2), -(1 / math.sqrt(2))]]
-## base matrix representation of a S Gate as a python list.
-gateS = [[1, 0],    [0, 1j]]
-## base matrix representation of a T Gate as a python list.
-gateT = [[1, 0], [0, ((1+1j) / (math.sqrt(2)))]]
-#two qubit gates
-gateCnotCFirst = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]]
-gateCnotCSecond = [[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]]
-gateSwap = [[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]]
-#three qubit gates
-gateFredkin = [[1, 0, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 0, 1, 0, 0, 0], 
-                [0, 0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 0, 0, 1]]
-gateToffoli = [[1, 0, 0, 0, 0, 0, 0, 0], [0, 1, 0, 0, 0, 0, 0, 0], [0, 0, 1, 0, 0, 0, 0, 0], [0, 0, 0, 1, 0, 0, 0, 0], [0, 0, 0, 0, 1, 0, 0, 0],
-                [0, 0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 0, 0, 1], [0, 0, 0, 0, 0, 0, 1, 0]]
-
-## identity Matrices
-identityMatrixOne = [[1]]
-identityMatrixTwo = [[1, 0], [0, 1]]
-identityMatrixFour = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]
+## default number of bytes a single simulation may allocate for its state vector or manipulation matrices.
+MEMORY_LIMIT = 8 * 1024**3
+## number of 4^n arrays alive at the same time in the matrix simulation: the running product, the matrix of the current cycle and their product.
+MATRIX_ARRAYS = 3
+## number of 2^n arrays alive at the same time in the statevector simulation: the state vector and the result of one gate application.
+STATEVECTOR_ARRAYS = 2
+## default number of bytes the cache of one cycle manipulation matrices may use.
+COLUMN_CACHE_LIMIT = 256 * 1024**2
+## default number of threads applying a gate to the state vector.
+WORKERS = 1
+## smallest number of Qubits for which gates are applied by several threads, below the state vector is too small to pay for the scheduling.
+PARALLEL_QUBITS = 16
+## number of blocks of the state vector every thread gets on average, more blocks balance the load better.
+BLOCKS_PER_WORKER = 4
+## default precision of the state vector and all matrices.
+PRECISION = "complex128"
+## supported precisions, complex64 halves the memory and memory bandwidth of a simulation.
+PRECISIONS = ("complex64", "complex128")
+## largest deviation of the norm of the state from 1 that is not corrected when renormalising.
+NORM_TOLERANCE = 1e-6
+## number of cycles of the statevector simulation after which the norm of the state is checked.
+NORM_CHECK_INTERVAL = 32
 
 ##
 # @class MatSim
@@ -51,37 +47,100 @@ identityMatrixFour = [[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]]
 ##	
 class MatSim(object):
     
+    ##
+    # init method setting the amount of memory a simulation is allowed to allocate.
+    # @param memoryLimit
+    # The maximum number of bytes the state vector or manipulation matrices of one simulation may use.
+    # @param columnCacheLimit
+    # The maximum number of bytes of cached one cycle manipulation matrices.
+    # @param precision
+    # The numpy dtype of the state vector and all matrices, "complex64" or "complex128".
+    # @param rng
+    # A numpy Generator for Deutsch Oracles. None to create one with a random seed.
+    ##
+    def __init__(self, memoryLimit=MEMORY_LIMIT, columnCacheLimit=COLUMN_CACHE_LIMIT, precision=PRECISION, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        self.rng = rng
+        self.memoryLimit = memoryLimit
+        self.setPrecision(precision)
+        ## divide the state by its norm when it drifted further than normTolerance from 1.
+        self.renormalize = False
+        self.normTolerance = NORM_TOLERANCE
+        self.normCheckInterval = NORM_CHECK_INTERVAL
+        ## largest deviation of the norm of the state from 1 seen by the last simulation.
+        self.normDrift = 0.0
+        ## one cycle manipulation matrices of all simulations keyed by the signature of their cycle.
+        self.columnCache = LruCache(columnCacheLimit)
+        ## number of threads applying a gate to the state vector of the statevector simulation.
+        self.workers = WORKERS
+        self.threadPool = None
+        ## number of threads the thread pool was created with, it is created again when workers changes.
+        self.threadPoolWorkers = None
+        ## amplitude moves of all gates that only permute basis states, keyed by their opcode.
+        self.permutationMoves = {}
+        for opcode in permutationOpcodes:
+            self.permutationMoves[opcode] = self.buildPermutationMoves(gateMatrices[opcode])
+    
+    ## Sets the precision of the state vector and all matrices. Cached matrices of the other precision are kept, they are keyed by their precision.
+    # @param precision
+    # "complex64" or "complex128".
+    ##
+    def setPrecision(self, precision):
+        if str(precision) not in PRECISIONS:
+            raise ValueError("Precision must be one of " + ", ".join(PRECISIONS) + " but is " + str(precision) + ".")
+        self.dtype = np.dtype(str(precision))
+    
+    ## Calculates how far the norm of a state drifted from 1 due to rounding errors and records the largest drift in normDrift. 
+    # If renormalize is set and the drift exceeds normTolerance, the state is divided by its norm in place.
+    # @param stateVector
+    # The state of all qubits as a numpy array of any shape.
+    # @return Returns the state vector.
+    ##
+    def checkNorm(self, stateVector):
+        #the squares are summed up in double precision, otherwise the sum itself drifts for large single precision states
+        norm = np.sqrt(np.sum(np.square(stateVector.real), dtype=np.float64) + np.sum(np.square(stateVector.imag), dtype=np.float64))
+        drift = abs(norm - 1)
+        self.normDrift = max(self.normDrift, drift)
+        tracer.count("normChecks")
+        
+        if self.renormalize and drift > self.normTolerance:
+            stateVector /= norm
+            tracer.count("renormalisations")
+            
+        return stateVector
+    
+    ## Checks whether the arrays of a simulation fit into the memory limit with the current precision.
+    # @param numberOfAmplitudes
+    # The number of complex values in the largest array of the simulation, 2^n for a state vector and 4^n for a manipulation matrix.
+    # @param numberOfArrays
+    # The number of arrays of this size that are alive at the same time.
+    # @return Returns True if the arrays fit.
+    ##
+    def fitsIntoMemory(self, numberOfAmplitudes, numberOfArrays):
+        return numberOfAmplitudes * numberOfArrays * self.dtype.itemsize <= self.memoryLimit
+
+    ## Checks before a simulation is started whether the arrays it needs fit into the memory limit.
+    # @param numberOfAmplitudes
+    # The number of complex values in the largest array of the simulation, 2^n for a state vector and 4^n for a manipulation matrix.
+    # @param numberOfArrays
+    # The number of arrays of this size that are alive at the same time.
+    ##
+    def checkMemoryRequirement(self, numberOfAmplitudes, numberOfArrays):
+        if not self.fitsIntoMemory(numberOfAmplitudes, numberOfArrays):
+            requiredMemory = numberOfAmplitudes * numberOfArrays * self.dtype.itemsize
+            raise ValueError("Simulation needs " + str(requiredMemory) + " bytes but the memory limit is " + str(self.memoryLimit) + " bytes.")
+    
     ## Build a vector to represent the state of all qubits in one circuit depending on the number of qubits selected in the GUI.
     # @param numberOfQubits
     # Integer value representing the number of Qubits selected by the user in the GUI.
-    # @return Returns the State vector as a list of lists. For example for one qubit: [[1], [0]]
+    # @return Returns the State vector as a column vector. For example for one qubit: [[1], [0]]
     def buildQubitStateVector(self, numberOfQubits):
-        qubitStateVector = []
-        if numberOfQubits == 1:
-            qubitStateVector = [[1], [0]]
-        elif numberOfQubits == 2:
-            qubitStateVector = [[1], [0], [0], [0]]
-        elif numberOfQubits == 3:
-            qubitStateVector = [[1], [0], [0], [0], [0], [0], [0], [0]]
-        elif numberOfQubits == 4:
-            qubitStateVector = [[1], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]]
-        elif numberOfQubits == 5:
-            qubitStateVector = [[1], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]]
-        elif numberOfQubits == 6:
-            qubitStateVector = [[1], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]]
-        elif numberOfQubits == 7:
-            qubitStateVector = [[1], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0], [0]
-                                , [0], [0], [0], [0], [0], [0], [0]]
-        else:
-            raise ValueError("Number of Qubits must be between 1 and 7 (inclusive).")
+        if numberOfQubits < 1:
+            raise ValueError("Number of Qubits must be at least 1.")
+        
+        qubitStateVector = np.zeros((2**numberOfQubits, 1), dtype=self.dtype)
+        qubitStateVector[0][0] = 1
             
         return qubitStateVector
     
@@ -95,10 +154,6 @@ class MatSim(object):
         newCircuit = [[] for _ in range(len(circuit))]
         lastGate = 0
         
-        if DEBUG:
-            print("Class: matSim Func: fillGapsInCircuit Variable: circuit")
-            print(circuit)        
-        
         #reduce size of circuit with deleting or replacing all zeros
         for k in range(len(circuit)):
             for l in range(len(circuit[k])):
@@ -113,10 +168,6 @@ class MatSim(object):
                 else:
                     newCircuit[m].append(circuit[m][n])
         
-        if DEBUG:
-            print("Class: matSim Func: fillGapsInCircuit Variable: newCircuit (return)")
-            print(newCircuit)
-        
         return newCircuit
     
     ## Generates a single manipulation matrix corresponding to the gates of one cycle using the tensor product.
@@ -124,265 +175,225 @@ class MatSim(object):
     # A list containing all the gates in one position/cycle.
     # @return Returns the manipulation matrix for one cycle.
     def buildOneCycleManipulationMatrix(self, gateMatrix):
-        print("Gate Matrix: ")
-        print(gateMatrix)
-        
-        firstMatrix = []
-        secondMatrix = []
-        thirdMatrix = []
-        fourthMatrix = []
-        fifthMatrix = []
-        sixthMatrix = []
-        seventhMatrix = []
-        eigthMatrix = []
-        i = 0
-        
-        numberOfGates = len(gateMatrix)
-        print(len(gateMatrix))
+        oneCycleManipulationMatrix = np.asarray(gateMatrix[0], dtype=self.dtype)
+        
+        for matrix in gateMatrix[1:]:
+            oneCycleManipulationMatrix = np.kron(oneCycleManipulationMatrix, np.asarray(matrix, dtype=self.dtype))
+        
+        return oneCycleManipulationMatrix
+        
+    ## Collects the operations of one cycle that change the state. Measurements are left out and it is decided whether a Deutsch Oracle is applied.
+    # @param compiledCircuit
+    # The CompiledCircuit containing the cycle.
+    # @param position
+    # The number of the cycle.
+    # @return Returns a list of tuples (opcode, qubits, matrix).
+    ##
+    def buildOneCycleOperations(self, compiledCircuit, position):
+        operations = []
+        
+        for opcode, qubits, matrix in compiledCircuit.positionInstructions(position):
+            if opcode == MEASUREMENT or (opcode == DEUTSCH_ORACLE and self.rng.integers(2) == 0):
+                continue
+            operations.append((opcode, qubits, matrix))
             
-        while numberOfGates > 0:
-            j = 0
-            k = len(gateMatrix[i])
+        return operations
+    
+    ## Builds a key identifying the manipulation matrix of a cycle. Named gates are identified by their opcode, fused gates by their matrix.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param operations
+    # The operations of the cycle as returned by buildOneCycleOperations.
+    # @return Returns a hashable key. It contains the precision, so matrices of both precisions can be cached at the same time.
+    ##
+    def buildOneCycleSignature(self, numberOfQubits, operations):
+        signature = []
+        
+        for opcode, qubits, matrix in operations:
+            if opcode == FUSED:
+                signature.append((opcode, qubits, matrix.tobytes()))
+            else:
+                signature.append((opcode, qubits))
                 
-            while k > 0:
-                print(gateMatrix[i][j])
-                    
-                if i == 0:
-                    firstMatrix.append(gateMatrix[i][j])
-                elif i == 1:
-                    secondMatrix.append(gateMatrix[i][j])          
-                elif i == 2:
-                    thirdMatrix.append(gateMatrix[i][j])   
-                elif i == 3:
-                    fourthMatrix.append(gateMatrix[i][j])   
-                elif i == 4:
-                    fifthMatrix.append(gateMatrix[i][j])
-                elif i == 5:
-                    sixthMatrix.append(gateMatrix[i][j]) 
-                elif i == 6:
-                    seventhMatrix.append(gateMatrix[i][j])
-                elif i == 7:
-                    eigthMatrix.append(gateMatrix[i][j])
-                    
-                j += 1
-                k -= 1
+        return (numberOfQubits, self.dtype.name, tuple(signature))
+    
+    ## Collects the matrices of all gates of one cycle in the order of the lanes, so their tensor product is the manipulation matrix of the cycle.
+    # Gates acting on several lanes are combined into one block matrix spanning all lanes from their lowest to their highest qubit, 
+    # the other lanes of the block contribute a 1x1 identity to the tensor product.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param operations
+    # The operations of the cycle as returned by buildOneCycleOperations.
+    # @return Returns a list of matrices, one for every lane or block of lanes.
+    ##
+    def buildOneCycleGateMatrix(self, numberOfQubits, operations):
+        blocks = []
+        
+        for opcode, qubits, matrix in operations:
+            newBlock = [min(qubits), max(qubits), [(qubits, matrix)]]
+            #merge the gate with all blocks it overlaps, gates of one cycle act on different lanes so their order does not matter
+            for block in blocks[:]:
+                if block[0] <= newBlock[1] and newBlock[0] <= block[1]:
+                    newBlock = [min(block[0], newBlock[0]), max(block[1], newBlock[1]), block[2] + newBlock[2]]
+                    blocks.remove(block)
+            blocks.append(newBlock)
+        
+        gateMatrix = [identityMatrixTwo] * numberOfQubits
+        for lowestLane, highestLane, gates in blocks:
+            numberOfLanes = highestLane - lowestLane + 1
+            qubits, matrix = gates[0]
+            if len(gates) == 1 and list(qubits) == list(range(lowestLane, highestLane + 1)):
+                blockMatrix = matrix
+            else:
+                #apply the gates of the block to the identity to get the block matrix
+                blockMatrix = np.reshape(np.eye(2**numberOfLanes, dtype=self.dtype), (2,) * numberOfLanes + (2**numberOfLanes,))
+                for qubits, matrix in gates:
+                    blockMatrix = self.applyGate(blockMatrix, matrix, [qubit - lowestLane for qubit in qubits])
+                blockMatrix = np.reshape(blockMatrix, (2**numberOfLanes, 2**numberOfLanes))
+            gateMatrix[lowestLane] = blockMatrix
+            for lane in range(lowestLane + 1, highestLane + 1):
+                gateMatrix[lane] = identityMatrixOne
                 
-            i += 1
-            numberOfGates -= 1
-        
-        if secondMatrix == []:
-            oneCycleManipulationMatrix = firstMatrix        
-        elif thirdMatrix == []:
-            oneCycleManipulationMatrix = np.kron(firstMatrix, secondMatrix)
-        elif fourthMatrix == []:
-            firstKronMatrix = []
-            firstKronMatrix = np.kron(firstMatrix, secondMatrix)
-            oneCycleManipulationMatrix = np.kron(firstKronMatrix, thirdMatrix)
-        elif fifthMatrix == []:
-            firstKronMatrix = []
-            secondKronMatrix = []
-            firstKronMatrix = np.kron(firstMatrix, secondMatrix)
-            secondKronMatrix = np.kron(firstKronMatrix, thirdMatrix)
-            oneCycleManipulationMatrix = np.kron(secondKronMatrix, fourthMatrix)
-        elif sixthMatrix == []:
-            firstKronMatrix = []
-            secondKronMatrix = []
-            thirdKronMatrix = []
-            firstKronMatrix = np.kron(firstMatrix, secondMatrix)
-            secondKronMatrix = np.kron(firstKronMatrix, thirdMatrix)
-            thirdKronMatrix = np.kron(secondKronMatrix, fourthMatrix)
-            oneCycleManipulationMatrix = np.kron(thirdKronMatrix, fifthMatrix)
-        elif seventhMatrix == []:
-            firstKronMatrix = []
-            secondKronMatrix = []
-            thirdKronMatrix = []
-            fourthKronMatrix = []
-            firstKronMatrix = np.kron(firstMatrix, secondMatrix)
-            secondKronMatrix = np.kron(firstKronMatrix, thirdMatrix)
-            thirdKronMatrix = np.kron(secondKronMatrix, fourthMatrix)
-            fourthKronMatrix = np.kron(thirdKronMatrix, fifthMatrix)
-            oneCycleManipulationMatrix = np.kron(fourthKronMatrix, sixthMatrix)
-        elif eigthMatrix == []:
-            firstKronMatrix = []
-            secondKronMatrix = []
-            thirdKronMatrix = []
-            fourthKronMatrix = []
-            fifthKronmatrix = []
-            firstKronMatrix = np.kron(firstMatrix, secondMatrix)
-            secondKronMatrix = np.kron(firstKronMatrix, thirdMatrix)
-            thirdKronMatrix = np.kron(secondKronMatrix, fourthMatrix)
-            fourthKronMatrix = np.kron(thirdKronMatrix, fifthMatrix)
-            fifthKronMatrix = np.kron(fourthKronMatrix, sixthMatrix)
-            oneCycleManipulationMatrix = np.kron(fifthKronMatrix, seventhMatrix)
+        return gateMatrix
             
-        if DEBUG:
-            print("oneCycleManipulationMatrix:")
-            print(oneCycleManipulationMatrix)        
-        
-        return oneCycleManipulationMatrix
+    ## Checks whether an operation only changes the phase of basis states. Besides Z, S and T Gates this is true for fused gates with a diagonal matrix.
+    # @param operation
+    # A tuple (opcode, qubits, matrix).
+    # @return Returns True if the matrix of the operation is diagonal.
+    ##
+    def isDiagonal(self, operation):
+        opcode, qubits, matrix = operation
+        if opcode in diagonalOpcodes:
+            return True
+        elif opcode == FUSED:
+            return not np.any(matrix - np.diag(np.diag(matrix)))
+        return False
+    
+    ## Combines the diagonals of all diagonal gates of one cycle into one tensor of phases. It only has an axis of length two for the lanes of the gates 
+    # and broadcasts over all other lanes, so multiplying it with the state vector applies all gates at once.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param operations
+    # The diagonal operations of the cycle.
+    # @return Returns the phases as a numpy array with numberOfQubits axes.
+    ##
+    def buildOneCyclePhases(self, numberOfQubits, operations):
+        phases = np.ones((1,) * numberOfQubits, dtype=self.dtype)
         
-    ## Multiplies all one cycle manipulation matrices to calculate the manipulation matrix of the whole quantum circut.
-    # @param allOneCycleManipulationMatrices
-    # A list representing all matrices for ever single cycle in the circuit.
-    # @return Returns the manipulation matrix of the whole circuit.
-    ##    
-    def multiplyOneCycleManipulationMatrices(self, allOneCycleManipulationMatrices):
-        manipulationMatrix = []
-        helpMatrix = []
-        a = []
-        i = 0
-        
-        if DEBUG:
-            print("Func: multiplyOneCycleManipulationMatrices Variable: len(allOneCycleManipulationMatrices): ")
-            print(len(allOneCycleManipulationMatrices))
+        for opcode, qubits, matrix in operations:
+            #bring the axes of the diagonal into the order of the lanes
+            diagonal = np.transpose(np.reshape(np.diag(matrix).astype(self.dtype), (2,) * len(qubits)), np.argsort(qubits))
+            shape = [1] * numberOfQubits
+            for qubit in qubits:
+                shape[qubit] = 2
+            phases = phases * np.reshape(diagonal, shape)
             
-        if len(allOneCycleManipulationMatrices) == 1:
-            helpMatrix = allOneCycleManipulationMatrices
-        else:
-            while i < len(allOneCycleManipulationMatrices)-1:
-                if len(helpMatrix) > 0:
-                    helpMatrix = np.matmul(helpMatrix, allOneCycleManipulationMatrices[i+1])
-                else:
-                    helpMatrix = np.matmul(allOneCycleManipulationMatrices[i], allOneCycleManipulationMatrices[i+1])
-                                       
-                print(helpMatrix)
-                i += 1
+        return phases
+    
+    ## Returns the phases of the diagonal gates of one cycle, either from the cache or by building them.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param operations
+    # The diagonal operations of the cycle.
+    # @return Returns the phases as returned by buildOneCyclePhases.
+    ##
+    def getOneCyclePhases(self, numberOfQubits, operations):
+        signature = ("phases",) + self.buildOneCycleSignature(numberOfQubits, operations)
+        phases = self.columnCache.get(signature)
+        
+        if phases is None:
+            phases = self.buildOneCyclePhases(numberOfQubits, operations)
+            phases.setflags(write=False)
+            self.columnCache.put(signature, phases)
             
-        manipulationMatrix = helpMatrix
-        print("Func: multiplyOneCycleManipulationMatrices Variable: manipulationMatrix: ")
-        print(manipulationMatrix)
-        return manipulationMatrix        
+        return phases
+    
+    ## Calculates for every basis state of the register which basis state is moved to it by a cycle made up of permutation gates only.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param operations
+    # The operations of the cycle as returned by buildOneCycleOperations.
+    # @return Returns an index array. Row j of the manipulation matrix of the cycle has its 1 in column source[j].
+    ##
+    def buildOneCyclePermutation(self, numberOfQubits, operations):
+        source = np.reshape(np.arange(2**numberOfQubits), (2,) * numberOfQubits)
+        
+        for opcode, qubits, matrix in operations:
+            source = self.applyPermutation(source, self.permutationMoves[opcode], qubits)
             
-    ## Go through the quantum circuit and generate the manipulation matrix for the whole circuit.
-    # @param circuit
-    # A list representing the circuit as generated from the GUI.
+        return np.reshape(source, -1)
+    
+    ## Go through the compiled quantum circuit and generate the manipulation matrix for the whole circuit. The matrix of every cycle is multiplied from the left, 
+    # cycles only containing permutation gates just reorder the rows of the matrix and cycles only containing diagonal gates scale them.
+    # @param compiledCircuit
+    # The CompiledCircuit of the circuit as generated from the GUI.
     # @return Returns the manipulation matrix.
     ##
-    def buildManipulationMatrix(self, circuit):
-        manipulationMatrix = []
-        allOneCycleManipulationMatrices = []
-        controlQubitFirst = False
-        multiQubitGateFirst = False
-        firstSwap = True
-        
-        numberOfGates = 0        
-        numberOfLanes = len(circuit)
-        numberOfQubits = numberOfLanes
-        
-        #calculate how many gates the whole circuit has
-        i = numberOfLanes-1
-        
-        while i >= 0:
-            numberOfGates += len(circuit[i])
-            i -= 1
-            print(numberOfGates)
-         
-        numberOfGatesOnLane = len(circuit[0])
-        
-        #if only one lane we need the number of gates on this lane for l
-        l = numberOfGatesOnLane
-        
-        #crawl through circuit, scale gate matrix up and build manipulation matrix
-        while l > 0:
-            print("Func: buildManipulationMatrix Variable: l: ")
-            print(l)
-            j = numberOfLanes
-            k = 0
-            
-            oneCycleGateMatrix = []
+    def buildManipulationMatrix(self, compiledCircuit):
+        manipulationMatrix = None
+        
+        for position in range(compiledCircuit.numberOfPositions):
+            operations = self.buildOneCycleOperations(compiledCircuit, position)
+            if operations == []:
+                continue
+            signature = self.buildOneCycleSignature(compiledCircuit.numberOfQubits, operations)
+            isPermutation = all(opcode in self.permutationMoves for opcode, qubits, matrix in operations)
+            isDiagonal = all(self.isDiagonal(operation) for operation in operations)
             
-            while j > 0:
-                
-                print("Func: buildManipulationMatrix Variable: j:")
-                print(j)
-                print("Func: buildManipulationMatrix Variable: k:")
-                print(k)
-                print("Func: buildManipulationMatrix Variable: numberOfGatesOnLane: ")
-                print(numberOfGatesOnLane)
-                print("Func: buildManipulationMatrix Variable: circuit[k][numberOfGatesOnLane-1] ")
-                print(circuit[k][numberOfGatesOnLane-1])
-                #check wich gate is in the circuit and append the corresponding matrix to the matrix for one cycle
-                if circuit[k][numberOfGatesOnLane-1] == "Pauli-X-Gate":
-                   oneCycleGateMatrix.append(gateX)
-                elif circuit[k][numberOfGatesOnLane-1] == "Pauli-Y-Gate":
-                   oneCycleGateMatrix.append(gateY)
-                elif circuit[k][numberOfGatesOnLane-1] == "Pauli-Z-Gate":
-                   oneCycleGateMatrix.append(gateZ)
-                elif circuit[k][numberOfGatesOnLane-1] == "Hadamard Gate":
-                   oneCycleGateMatrix.append(gateH)
-                elif circuit[k][numberOfGatesOnLane-1] == "S Gate":
-                   oneCycleGateMatrix.append(gateS)
-                elif circuit[k][numberOfGatesOnLane-1] == "T Gate":
-                   oneCycleGateMatrix.append(gateT)
-                elif circuit[k][numberOfGatesOnLane-1] == "Measurement":
-                   oneCycleGateMatrix.append(identityMatrixTwo)
-                elif circuit[k][numberOfGatesOnLane-1] == "Identity":
-                    oneCycleGateMatrix.append(identityMatrixTwo)
-                elif "Control" in circuit[k][numberOfGatesOnLane-1]:
-                    if multiQubitGateFirst:
-                        controlQubitFirst = False
+            #identical cycles, e.g. a layer of H Gates, only have to be built once
+            oneCycleManipulationMatrix = self.columnCache.get(signature)
+            if oneCycleManipulationMatrix is None:
+                with tracer.span("build column", position=position):
+                    if isPermutation:
+                        oneCycleManipulationMatrix = self.buildOneCyclePermutation(compiledCircuit.numberOfQubits, operations)
+                    elif isDiagonal:
+                        #only the diagonal of the manipulation matrix is stored
+                        phases = self.buildOneCyclePhases(compiledCircuit.numberOfQubits, operations)
+                        oneCycleManipulationMatrix = np.reshape(np.broadcast_to(phases, (2,) * compiledCircuit.numberOfQubits), -1)
                     else:
-                        controlQubitFirst = True
-                    oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "CNot Gate":
-                    if controlQubitFirst:
-                        multiQubitGateFirstmultiQubitGateFirst = False
-                        oneCycleGateMatrix.append(gateCnotCFirst)
-                    else:
-                        multiQubitGateFirst = True
-                        oneCycleGateMatrix.append(gateCnotCSecond)
-                elif circuit[k][numberOfGatesOnLane-1] == "Swap Gate":
-                    if firstSwap:
-                        oneCycleGateMatrix.append(gateSwap)
-                        firstSwap = False
-                    else:
-                        oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "Toffoli Gate":
-                    oneCycleGateMatrix.append(gateToffoli)
-                elif circuit[k][numberOfGatesOnLane-1] == "Toffoli1":
-                    oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "Toffoli2":
-                    oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "Fredkin Gate":
-                    oneCycleGateMatrix.append(gateFredkin)
-                elif circuit[k][numberOfGatesOnLane-1] == "Fredkin1":
-                    oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "Fredkin2":
-                    oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "Deutsch OracleC":
-                    oneCycleGateMatrix.append(identityMatrixOne)
-                elif circuit[k][numberOfGatesOnLane-1] == "Deutsch Oracle":
-                    if randint(0,1) == 1:
-                        oneCycleGateMatrix.append(gateCnotCFirst)
-                    else:
-                        oneCycleGateMatrix.append(identityMatrixFour)
-                    
-                    
-                print("Func: buildManipulationMatrix Variable: oneCycleGateMatrix:")
-                print(oneCycleGateMatrix)
-                
-                #update auxiliary variables   
-                j -= 1
-                k += 1
+                        oneCycleGateMatrix = self.buildOneCycleGateMatrix(compiledCircuit.numberOfQubits, operations)
+                        oneCycleManipulationMatrix = self.buildOneCycleManipulationMatrix(oneCycleGateMatrix)
+                    #the matrix is shared by all simulations using the cache, make sure nobody changes it
+                    oneCycleManipulationMatrix.setflags(write=False)
+                    self.columnCache.put(signature, oneCycleManipulationMatrix)
+                tracer.count("matricesBuilt")
             
-            controlQubitFirst = False
-            multiQubitGateFirst = False
-            l -= 1
-            numberOfGatesOnLane -= 1
-            allOneCycleManipulationMatrices.append(self.buildOneCycleManipulationMatrix(oneCycleGateMatrix))
-            if DEBUG:
-                print("Func: buildManipulationMatrix Variable: oneCycleManipulationMatrix:")
-                print(allOneCycleManipulationMatrices)
-        
-        #build manipulation matrix and return it
-        manipulationMatrix = self.multiplyOneCycleManipulationMatrices(allOneCycleManipulationMatrices)
-        
-        if DEBUG:
-            print("Manipulation Matrix:")
-            print(manipulationMatrix)
+            if manipulationMatrix is None:
+                manipulationMatrix = np.eye(2**compiledCircuit.numberOfQubits, dtype=self.dtype)
+            with tracer.span("multiply", position=position):
+                dimension = 2**compiledCircuit.numberOfQubits
+                if isPermutation:
+                    manipulationMatrix = manipulationMatrix[oneCycleManipulationMatrix]
+                elif isDiagonal:
+                    #a diagonal matrix scales the rows of the product
+                    manipulationMatrix = oneCycleManipulationMatrix[:, np.newaxis] * manipulationMatrix
+                    tracer.count("flops", 6 * dimension**2)
+                else:
+                    manipulationMatrix = np.matmul(oneCycleManipulationMatrix, manipulationMatrix)
+                    tracer.count("flops", 8 * dimension**3)
+        
+        if manipulationMatrix is None:
+            manipulationMatrix = np.eye(2**compiledCircuit.numberOfQubits, dtype=self.dtype)
             
         return manipulationMatrix
        
+    ## Labels the amplitudes of a result vector with their basis states and calculates the probability of measuring each of them.
+    # @param numberOfQubits
+    # The number of Qubits of the simulated circuit.
+    # @param resultVector
+    # The state of all qubits after the simulation as a column vector.
+    # @return Returns a tuple of strings containing the probability of every basis state.
+    ##
+    def buildResult(self, numberOfQubits, resultVector):
+        result = []
+        
+        with tracer.span("format", numberOfQubits=numberOfQubits):
+            probabilities = np.abs(np.reshape(resultVector, -1))**2
+            for i in range(2**numberOfQubits):
+                result.append("Probability of |" + format(i, "0" + str(numberOfQubits) + "b") + "> :  " + str(round(probabilities[i], 2)))
+            
+        return result
+
     ## Simulates a whole circuit based on the matrix representation of quantum gates and qubits.
     # @param numberOFQubits
     # The number of Qubits of the circuit that is going to be simulated.
@@ -391,78 +402,262 @@ class MatSim(object):
     # @return Returns the result of the simulation.
     ##
     def simulateCircuit(self, numberOfQubits, circuit):
-        result = []
-        if DEBUG:
-            print("Class: matSim Func: simulateCircuit Variable: numberOfQubits:")
-            print(numberOfQubits)
+        if len(circuit) != numberOfQubits:
+            raise ValueError("The circuit has " + str(len(circuit)) + " lanes but " + str(numberOfQubits) + " Qubits were selected.")
+        
+        return self.simulateCompiledCircuit(self.compileCircuit(circuit))
+    
+    ## Fills the gaps of a circuit and compiles it.
+    # @param circuit
+    # The circuit as generated from the GUI.
+    # @return Returns the CompiledCircuit.
+    ##
+    def compileCircuit(self, circuit):
+        with tracer.span("fill gaps"):
+            circuit = self.fillGapsInCircuit(circuit)
+        with tracer.span("parse"):
+            return CircuitCompiler().compileCircuit(circuit)
+    
+    ## Simulates a compiled circuit based on the matrix representation of quantum gates and qubits.
+    # @param compiledCircuit
+    # The CompiledCircuit that will be simulated.
+    # @return Returns the result of the simulation.
+    ##
+    def simulateCompiledCircuit(self, compiledCircuit):
+        manipulationMatrix, resultVector = self.runCompiledCircuit(compiledCircuit)
+            
+        return self.buildResult(compiledCircuit.numberOfQubits, resultVector)
+    
+    ## Calculates the manipulation matrix of a compiled circuit and the state of all qubits after the circuit.
+    # @param compiledCircuit
+    # The CompiledCircuit that will be simulated.
+    # @return Returns a tuple of the manipulation matrix and the result vector.
+    ##
+    def runCompiledCircuit(self, compiledCircuit):
+        numberOfQubits = compiledCircuit.numberOfQubits
         
+        self.checkMemoryRequirement(4**numberOfQubits, MATRIX_ARRAYS)
         qubitStateVector = self.buildQubitStateVector(numberOfQubits)
         
-        if DEBUG:
-            print("Class: matSim Func: simulateCircuit Variable: qubitStateVector:")
-            print(qubitStateVector)
+        manipulationMatrix = self.buildManipulationMatrix(compiledCircuit)
         
-        circuit = self.fillGapsInCircuit(circuit)
-        if DEBUG:
-            print("Class: matSim Func: simulateCircuit Variable: circuit:")
-            print(circuit)
+        #multiply manipulation matrix and qubit state vector to calculate a result
+        with tracer.span("multiply"):
+            resultVector= np.matmul(manipulationMatrix, qubitStateVector)
+        tracer.count("flops", 8 * 4**numberOfQubits)
         
-        manipulationMatrix = self.buildManipulationMatrix(circuit)
+        #the rounding errors of all products show up in the norm of the first column
+        self.normDrift = 0.0
+        resultVector = self.checkNorm(resultVector)
+            
+        return manipulationMatrix, resultVector
+    
+    ## Applies a gate to a state vector without building the manipulation matrix of the whole cycle. The state vector is stored as a tensor with one axis 
+    # of length two per qubit, so the gate only has to be contracted with the axes of its target qubits.
+    # @param stateVector
+    # The state of all qubits as a numpy array of shape (2, 2, ..., 2).
+    # @param gate
+    # The matrix representation of a 1, 2 or 3 qubit gate.
+    # @param targets
+    # A list of the lanes the gate acts on in the order of its basis.
+    # @return Returns the state vector after applying the gate.
+    ##
+    def applyGate(self, stateVector, gate, targets):
+        numberOfTargets = len(targets)
+        gate = np.reshape(np.asarray(gate, dtype=stateVector.dtype), (2,) * (2 * numberOfTargets))
         
-        #multiply manipulation matrix and qubit state vector to calculate a result
-        resultVector= np.matmul(manipulationMatrix, qubitStateVector)
+        stateVector = np.tensordot(gate, stateVector, axes=(list(range(numberOfTargets, 2 * numberOfTargets)), list(targets)))
         
-        if DEBUG:
-            print("Class: matSim Func: simulateCircuit Variable: resultVector:")
-            print(resultVector)
+        #tensordot puts the target axes in front, move them back to the position of their lanes
+        return np.moveaxis(stateVector, list(range(numberOfTargets)), list(targets))
+    
+    ## Calculates which basis states a permutation gate exchanges, so it can be applied by moving amplitudes instead of multiplying.
+    # @param gate
+    # The matrix representation of a gate with exactly one 1 in every row.
+    # @return Returns a list of tuples (destination, source). Both are tuples of the bits of a basis state of the gate.
+    ##
+    def buildPermutationMoves(self, gate):
+        numberOfTargets = int(np.log2(len(gate)))
+        source = np.argmax(np.abs(gate), axis=1)
+        moves = []
         
-        cycleOneQubit = cycle([" |0> :  ", " |1> :  "])
-        cycleTwoQubits = cycle([" |00> :  ", " |01> :  ", " |10> :  ", " |11> :  "])
-        cycleThreeQubits = cycle([" |000> :  ", " |001> :  ", " |010> :  ", " |011> :  ", " |100> :  ", " |101> :  ", " |110> :  ", " |111> :  "])
-        cycleFourQubits = cycle([" |0000> :  ", " |0001> :  ", " |0010> :  ", " |0011> :  ", " |0100> :  ", " |0101> :  ", " |0110> :  ", " |0111> :  ", " |1000> :  ",
-                                " |1001> :  ", " |1010> :  ", " |1011> :  ", " |1100> :  ", " |1101> :  ", " |1110> :  ", " |1111> :  "])
-        cycleFiveQubits = cycle([" |000> :  ", " |001> :  ", " |010> :  ", " |011> :  ", " |100> :  ", " |101> :  ", " |110> :  ", " |111> :  "])
-        cycleSixQubits = cycle([" |000> :  ", " |001> :  ", " |010> :  ", " |011> :  ", " |100> :  ", " |101> :  ", " |110> :  ", " |111> :  "])
+        for destination in range(len(gate)):
+            if source[destination] != destination:
+                moves.append((tuple(int(bit) for bit in format(destination, "0" + str(numberOfTargets) + "b")),
+                              tuple(int(bit) for bit in format(source[destination], "0" + str(numberOfTargets) + "b"))))
+                
+        return moves
+    
+    ## Applies a permutation gate in place by copying the affected slices of the state vector to their new position. No floating point multiplication is done, 
+    # e.g. a CNot Gate only exchanges the two quarters of the state vector in which the control qubit is 1.
+    # @param stateVector
+    # The state of all qubits as a numpy array of shape (2, 2, ..., 2).
+    # @param moves
+    # The moves of the gate as returned by buildPermutationMoves.
+    # @param targets
+    # A list of the lanes the gate acts on in the order of its basis.
+    # @return Returns the state vector after applying the gate.
+    ##
+    def applyPermutation(self, stateVector, moves, targets):
+        view = np.moveaxis(stateVector, list(targets), list(range(len(targets))))
+        sources = [view[source].copy() for destination, source in moves]
         
-        if len(resultVector[0]) == 1:
-            for i in range(2**numberOfQubits):
-                if(numberOfQubits == 1):
-                    result += ("Probability of" + next(cycleOneQubit) + str(round(((resultVector[i][0])**2), 2)), )
-                elif(numberOfQubits == 2):
-                    result += ("Probability of" + next(cycleTwoQubits) + str(round(((resultVector[i][0])**2), 2)), )
-                elif(numberOfQubits == 3):
-                    result += ("Probability of |" + next(cycleThreeQubits) + str(round(((resultVector[i][0])**2), 2)), )
-                elif(numberOfQubits == 4):
-                    result += ("Probability of |" + next(cycleFourQubits) + str(round(((resultVector[i][0])**2), 2)), )
-                elif(numberOfQubits == 5):
-                    result += ("Probability of |" + next(cycleThreeQubits) + str(round(((resultVector[i][0])**2), 2)), )
-                elif(numberOfQubits == 6):
-                    result += ("Probability of |" + next(cycleThreeQubits) + str(round(((resultVector[i][0])**2), 2)), )
-                elif(numberOfQubits == 7):
-                    result += ("Probability of |" + next(cycleThreeQubits) + str(round(((resultVector[i][0])**2), 2)), )
-        else:
-            for i in range(2**numberOfQubits):
-                if(numberOfQubits == 1):
-                    result += ("Probability of" + next(cycleOneQubit) + str(round(((resultVector[0][i][0])**2), 2)), )
-                elif(numberOfQubits == 2):
-                    result += ("Probability of" + next(cycleTwoQubits) + str(round(((resultVector[0][i][0])**2), 2)), )
-                elif(numberOfQubits == 3):
-                    result += ("Probability of" + next(cycleThreeQubits) + str(round(((resultVector[0][i][0])**2), 2)), )
-                elif(numberOfQubits == 4):
-                    result += ("Probability of" + next(cycleFourQubits) + str(round(((resultVector[0][i][0])**2), 2)), )
-                elif(numberOfQubits == 5):
-                    result += ("Probability of" + next(cycleThreeQubits) + str(round(((resultVector[0][i][0])**2), 2)), )
-                elif(numberOfQubits == 6):
-                    result += ("Probability of" + next(cycleThreeQubits) + str(round(((resultVector[0][i][0])**2), 2)), )
-                elif(numberOfQubits == 7):
-                    result += ("Probability of" + next(cycleThreeQubits) + str(round(((resultVector[0][i][0])**2), 2)), )
+        for (destination, source), values in zip(moves, sources):
+            view[destination] = values
             
-        if DEBUG:
-            print("Class: matSim Func: simulateCircuit Variable: result:")
-            print(result)
+        return stateVector
+    
+    ## Returns the thread pool of the statevector simulation. It is created on first use and again if the number of workers changed.
+    # @return Returns a ThreadPoolExecutor with workers threads.
+    ##
+    def getThreadPool(self):
+        if self.threadPool is None or self.threadPoolWorkers != self.workers:
+            if self.threadPool is not None:
+                self.threadPool.shutdown()
+            self.threadPool = ThreadPoolExecutor(max_workers=self.workers)
+            self.threadPoolWorkers = self.workers
+        return self.threadPool
+    
+    ## Splits the state vector into independent blocks along axes a gate does not act on and calls a function for every block in the thread pool.
+    # Every block is a view into the state vector, so the blocks are changed in place. Numpy releases the GIL while it works on a block.
+    # @param stateVector
+    # The state of all qubits as a numpy array of shape (2, 2, ..., 2).
+    # @param targets
+    # The lanes the gate acts on.
+    # @param function
+    # A function taking a block, the targets as axes of the block and the index selecting the block in the state vector.
+    ##
+    def runBlocks(self, stateVector, targets, function):
+        numberOfBlocks = self.workers * BLOCKS_PER_WORKER
+        splitAxes = [axis for axis in range(stateVector.ndim) if axis not in targets][:(numberOfBlocks - 1).bit_length()]
+        #removing the split axes moves the targets behind them to the front
+        blockTargets = [target - sum(1 for axis in splitAxes if axis < target) for target in targets]
+        tasks = []
+        
+        for bits in itertools.product((0, 1), repeat=len(splitAxes)):
+            index = [slice(None)] * stateVector.ndim
+            for axis, bit in zip(splitAxes, bits):
+                index[axis] = bit
+            tasks.append(self.getThreadPool().submit(function, stateVector[tuple(index)], blockTargets, tuple(index)))
             
-        return result
-     
+        for task in tasks:
+            task.result()
+    
+    ## Applies a gate to the state vector with several threads, each working on its own blocks.
+    # @param stateVector
+    # The state of all qubits as a numpy array of shape (2, 2, ..., 2).
+    # @param gate
+    # The matrix representation of a 1, 2 or 3 qubit gate.
+    # @param targets
+    # A list of the lanes the gate acts on in the order of its basis.
+    # @return Returns the state vector after applying the gate.
+    ##
+    def applyGateInBlocks(self, stateVector, gate, targets):
+        def applyToBlock(block, blockTargets, index):
+            block[...] = self.applyGate(block, gate, blockTargets)
+        
+        self.runBlocks(stateVector, targets, applyToBlock)
+        return stateVector
+    
+    ## Applies a permutation gate to the state vector with several threads, each working on its own blocks.
+    # @param stateVector
+    # The state of all qubits as a numpy array of shape (2, 2, ..., 2).
+    # @param moves
+    # The moves of the gate as returned by buildPermutationMoves.
+    # @param targets
+    # A list of the lanes the gate acts on in the order of its basis.
+    # @return Returns the state vector after applying the gate.
+    ##
+    def applyPermutationInBlocks(self, stateVector, moves, targets):
+        def applyToBlock(block, blockTargets, index):
+            self.applyPermutation(block, moves, blockTargets)
+        
+        self.runBlocks(stateVector, targets, applyToBlock)
+        return stateVector
+    
+    ## Multiplies the state vector with the phases of the diagonal gates of a cycle with several threads, each working on its own blocks.
+    # @param stateVector
+    # The state of all qubits as a numpy array of shape (2, 2, ..., 2).
+    # @param phases
+    # The phases as returned by buildOneCyclePhases.
+    # @param qubits
+    # The lanes of the diagonal gates.
+    ##
+    def multiplyPhasesInBlocks(self, stateVector, phases, qubits):
+        def multiplyBlock(block, blockTargets, index):
+            #the phases have length one on the split axes
+            block *= phases[tuple(0 if type(part) is int else part for part in index)]
+        
+        self.runBlocks(stateVector, qubits, multiplyBlock)
+    
+    ## Simulates a whole circuit by applying every gate directly to the state vector. Only the 2^n amplitudes are kept in memory, 
+    # so every gate costs O(2^n) instead of building and multiplying 2^n x 2^n manipulation matrices.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit that is going to be simulated.
+    # @param circuit
+    # The circuit that will be simulated.
+    # @return Returns the result of the simulation.
+    ##
+    def simulateCircuitStatevector(self, numberOfQubits, circuit):
+        if len(circuit) != numberOfQubits:
+            raise ValueError("The circuit has " + str(len(circuit)) + " lanes but " + str(numberOfQubits) + " Qubits were selected.")
+        
+        return self.simulateCompiledCircuitStatevector(self.compileCircuit(circuit))
+    
+    ## Simulates a compiled circuit by applying every operation directly to the state vector.
+    # @param compiledCircuit
+    # The CompiledCircuit that will be simulated.
+    # @return Returns the result of the simulation.
+    ##
+    def simulateCompiledCircuitStatevector(self, compiledCircuit):
+        return self.buildResult(compiledCircuit.numberOfQubits, self.runCompiledCircuitStatevector(compiledCircuit))
+    
+    ## Calculates the state of all qubits after a compiled circuit by applying every operation directly to the state vector.
+    # @param compiledCircuit
+    # The CompiledCircuit that will be simulated.
+    # @return Returns the result vector as a column vector.
+    ##
+    def runCompiledCircuitStatevector(self, compiledCircuit):
+        numberOfQubits = compiledCircuit.numberOfQubits
+        
+        self.checkMemoryRequirement(2**numberOfQubits, STATEVECTOR_ARRAYS)
+        stateVector = np.reshape(self.buildQubitStateVector(numberOfQubits), (2,) * numberOfQubits)
+        parallel = self.workers > 1 and numberOfQubits >= PARALLEL_QUBITS
+        self.normDrift = 0.0
+        
+        for position in range(compiledCircuit.numberOfPositions):
+            if position > 0 and position % self.normCheckInterval == 0:
+                stateVector = self.checkNorm(stateVector)
+            operations = self.buildOneCycleOperations(compiledCircuit, position)
+            
+            with tracer.span("multiply", position=position):
+                #all diagonal gates of a cycle are applied with one multiplication, the gates of a cycle act on different lanes so the order does not matter
+                diagonalOperations = [operation for operation in operations if self.isDiagonal(operation)]
+                if diagonalOperations != []:
+                    phases = self.getOneCyclePhases(numberOfQubits, diagonalOperations)
+                    if parallel:
+                        self.multiplyPhasesInBlocks(stateVector, phases, [qubit for opcode, qubits, matrix in diagonalOperations for qubit in qubits])
+                    else:
+                        stateVector *= phases
+                    tracer.count("flops", 6 * 2**numberOfQubits)
+                
+                for opcode, qubits, matrix in operations:
+                    if self.isDiagonal((opcode, qubits, matrix)):
+                        continue
+                    elif opcode in self.permutationMoves and parallel:
+                        stateVector = self.applyPermutationInBlocks(stateVector, self.permutationMoves[opcode], qubits)
+                    elif opcode in self.permutationMoves:
+                        stateVector = self.applyPermutation(stateVector, self.permutationMoves[opcode], qubits)
+                    elif parallel:
+                        stateVector = self.applyGateInBlocks(stateVector, matrix, qubits)
+                        tracer.count("flops", 8 * 2**numberOfQubits * 2**len(qubits))
+                    else:
+                        stateVector = self.applyGate(stateVector, matrix, qubits)
+                        tracer.count("flops", 8 * 2**numberOfQubits * 2**len(qubits))
+        
+        stateVector = self.checkNorm(stateVector)
+        return np.reshape(stateVector, (2**numberOfQubits, 1))
+        
     ## Simulate a single gate. Multiplies a Matrix with the state of the qubit.
     # @param gate
     # The matrix representation of a quantum gate
@@ -481,33 +676,49 @@ class MatSim(object):
     # @return Returns the state of the qubit after the simulation.
     ##
     def simulateLane(self, lane):
-        qubitState = []
-        counter = 0
+        return self.simulateCompiledLane(CircuitCompiler().compileCircuit([lane]), 0)
+    
+    ## Simulate one lane of a compiled circuit indepently from other qubits.
+    # @param compiledCircuit
+    # The CompiledCircuit containing the lane.
+    # @param lane
+    # The number of the lane that is simulated.
+    # @return Returns the state of the qubit after the simulation.
+    ##
+    def simulateCompiledLane(self, compiledCircuit, lane):
         #alpha, beta
-        qubitState = [[1], [0]]
-        numberOfGates = len(lane)
-
-        while numberOfGates > 0:
-            if lane[counter] == "Pauli-X-Gate":
-                qubitState = np.matmul(gateX, qubitState)
-            elif lane[counter] == "Pauli-Y-Gate":
-                qubitState = np.matmul(gateY, qubitState)
-            elif lane[counter] == "Pauli-Z-Gate":
-                qubitState = np.matmul(gateZ, qubitState)
-            elif lane[counter] == "Hadamard Gate":
-                qubitState = np.matmul(gateH, qubitState)
-            elif lane[counter] == "S Gate":
-                qubitState = np.matmul(gateS, qubitState)
-            elif lane[counter] == "T Gate":
-                qubitState = np.matmul(gateT, qubitState)
-            elif lane[counter] == "Identity":
-                qubitState = np.matmul(identityMatrixTwo, qubitState)
-            elif lane[counter] == "Measurement":
-                qubitState = np.matmul(identityMatrixTwo, qubitState)
-            else:
-                print(lane[counter])
-                raise ValueError("An unknown gate was found. Lane cant be simulated.")
-            counter += 1
-            numberOfGates -= 1
+        qubitState = np.asarray([[1], [0]], dtype=self.dtype)
+        
+        for opcode, qubits, matrix in compiledCircuit.laneInstructions(lane):
+            if len(qubits) > 1:
+                raise ValueError("A multi qubit gate was found. Lane cant be simulated.")
+            qubitState = np.matmul(np.asarray(matrix, dtype=self.dtype), qubitState)
 
         return qubitState
+    
+    ## Simulate all lanes of a compiled circuit indepently from each other at once. The states of all qubits are held in one (lanes, 2) array and every cycle
+    # is applied with one batched multiplication, each lane picking its gate out of a stack of all 2x2 matrices of the circuit.
+    # @param compiledCircuit
+    # The CompiledCircuit containing the lanes.
+    # @return Returns a numpy array of shape (lanes, 2) containing the state of every qubit after the simulation.
+    ##
+    def simulateCompiledLanes(self, compiledCircuit):
+        operations = compiledCircuit.operations
+        if np.any(operations["controls"] >= 0) or np.any(operations["targets"][:, 1] >= 0):
+            raise ValueError("A multi qubit gate was found. Lane cant be simulated.")
+        
+        #matrices of multi qubit gates are never picked, they are replaced to get a stack of equally shaped matrices
+        identity = np.asarray(identityMatrixTwo, dtype=self.dtype)
+        gateStack = np.stack([matrix if np.shape(matrix) == (2, 2) else identity for matrix in compiledCircuit.matrices]).astype(self.dtype)
+        
+        #index of the matrix every lane applies in every cycle, index 0 is the identity
+        gateIndices = np.zeros((compiledCircuit.numberOfPositions, compiledCircuit.numberOfQubits), dtype=np.int32)
+        gateIndices[operations["position"], operations["targets"][:, 0]] = operations["matrix"]
+        
+        qubitStates = np.zeros((compiledCircuit.numberOfQubits, 2), dtype=self.dtype)
+        qubitStates[:, 0] = 1
+        
+        for position in range(compiledCircuit.numberOfPositions):
+            qubitStates = np.einsum("lij,lj->li", gateStack[gateIndices[position]], qubitStates)
+        
+        return qubitStates
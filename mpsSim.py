@@ -0,0 +1,279 @@
+##
+# @file mpsSim.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing a matrix product state simulator for circuits with little entanglement.
+#
+##
+
+import numpy as np
+
+from gates import gateSwap
+from circuitCompiler import CircuitCompiler, MEASUREMENT, DEUTSCH_ORACLE
+
+## default maximum bond dimension kept after a gate.
+MAX_BOND_DIMENSION = 64
+## default maximum relative weight of the singular values discarded after a gate.
+TRUNCATION_ERROR = 1e-10
+## largest number of Qubits for which the probabilities of all basis states are listed in the result.
+PROBABILITY_LIMIT = 10
+
+##
+# @class MatrixProductState
+# @brief The state of a register as a chain of tensors of shape (left bond, 2, right bond), one for every lane. The tensors left of the centre
+# are left canonical and the tensors right of it right canonical, so singular values at the centre are the Schmidt values of the state.
+##
+class MatrixProductState(object):
+
+    ##
+    # init method building the state |0...0>.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @param maxBondDimension
+    # The maximum bond dimension kept after a gate.
+    # @param truncationError
+    # The maximum relative weight of the singular values discarded after a gate.
+    ##
+    def __init__(self, numberOfQubits, maxBondDimension=MAX_BOND_DIMENSION, truncationError=TRUNCATION_ERROR):
+        self.numberOfQubits = numberOfQubits
+        self.maxBondDimension = maxBondDimension
+        self.truncationError = truncationError
+        self.tensors = []
+        for _ in range(numberOfQubits):
+            tensor = np.zeros((1, 2, 1), dtype=complex)
+            tensor[0, 0, 0] = 1
+            self.tensors.append(tensor)
+        ## the lane whose tensor is not canonical
+        self.centre = 0
+        ## sum of the discarded weights of all truncations
+        self.discardedWeight = 0.0
+        ## product of the kept weights of all truncations, an estimate of the fidelity with the exact state
+        self.fidelity = 1.0
+
+    ## Returns the largest bond dimension of the chain.
+    # @return Returns the bond dimension.
+    ##
+    def bondDimension(self):
+        return max(tensor.shape[2] for tensor in self.tensors)
+
+    ## Moves the centre of the chain with QR decompositions.
+    # @param site
+    # The lane that becomes the centre.
+    ##
+    def moveCentre(self, site):
+        while self.centre < site:
+            tensor = self.tensors[self.centre]
+            left, physical, right = tensor.shape
+            q, r = np.linalg.qr(np.reshape(tensor, (left * physical, right)))
+            self.tensors[self.centre] = np.reshape(q, (left, physical, q.shape[1]))
+            self.tensors[self.centre+1] = np.tensordot(r, self.tensors[self.centre+1], axes=(1, 0))
+            self.centre += 1
+
+        while self.centre > site:
+            tensor = self.tensors[self.centre]
+            left, physical, right = tensor.shape
+            q, r = np.linalg.qr(np.transpose(np.reshape(tensor, (left, physical * right))))
+            self.tensors[self.centre] = np.reshape(np.transpose(q), (q.shape[1], physical, right))
+            self.tensors[self.centre-1] = np.tensordot(self.tensors[self.centre-1], np.transpose(r), axes=(2, 0))
+            self.centre -= 1
+
+    ## Truncates the singular values of a decomposition to the bond dimension and truncation error and records the discarded weight.
+    # @param singularValues
+    # The singular values in descending order.
+    # @return Returns the number of kept singular values.
+    ##
+    def truncate(self, singularValues):
+        weights = singularValues**2 / np.sum(singularValues**2)
+        #discarded[k] is the weight of all singular values from k on
+        discarded = np.append(np.cumsum(weights[::-1])[::-1], 0.0)
+        kept = int(np.argmax(discarded <= self.truncationError))
+        kept = max(1, min(kept, self.maxBondDimension))
+
+        self.discardedWeight += discarded[kept]
+        self.fidelity *= 1 - discarded[kept]
+
+        return kept
+
+    ## Applies a single qubit gate. The canonical form is not changed by a unitary on the physical index.
+    # @param gate
+    # The 2x2 matrix of the gate.
+    # @param site
+    # The lane of the gate.
+    ##
+    def applySingleQubitGate(self, gate, site):
+        self.tensors[site] = np.einsum("ij,ajb->aib", gate, self.tensors[site])
+
+    ## Applies a gate to neighbouring lanes. The tensors are contracted, multiplied with the gate and split again with truncated singular value decompositions.
+    # @param gate
+    # The matrix of the gate acting on the lanes in ascending order.
+    # @param site
+    # The first lane of the gate.
+    # @param numberOfSites
+    # The number of lanes of the gate.
+    ##
+    def applyContiguousGate(self, gate, site, numberOfSites):
+        self.moveCentre(site)
+
+        theta = self.tensors[site]
+        for offset in range(1, numberOfSites):
+            theta = np.tensordot(theta, self.tensors[site+offset], axes=(theta.ndim - 1, 0))
+        gateTensor = np.reshape(gate, (2,) * (2 * numberOfSites))
+        theta = np.tensordot(gateTensor, theta, axes=(list(range(numberOfSites, 2 * numberOfSites)), list(range(1, numberOfSites + 1))))
+        theta = np.moveaxis(theta, numberOfSites, 0)
+
+        for offset in range(numberOfSites - 1):
+            left = theta.shape[0]
+            rest = theta.shape[2:]
+            u, singularValues, vh = np.linalg.svd(np.reshape(theta, (left * 2, -1)), full_matrices=False)
+            kept = self.truncate(singularValues)
+            singularValues = singularValues[:kept] / np.linalg.norm(singularValues[:kept])
+            self.tensors[site+offset] = np.reshape(u[:, :kept], (left, 2, kept))
+            theta = np.reshape(singularValues[:, np.newaxis] * vh[:kept], (kept,) + rest)
+
+        self.tensors[site+numberOfSites-1] = theta
+        self.centre = site + numberOfSites - 1
+
+    ## Applies a gate to any lanes. The lanes are moved next to each other in the order of the gate with Swap Gates, which are undone afterwards.
+    # @param gate
+    # The matrix of the gate.
+    # @param qubits
+    # The lanes of the gate in the order of the basis of the matrix.
+    ##
+    def applyGate(self, gate, qubits):
+        if len(qubits) == 1:
+            self.applySingleQubitGate(gate, qubits[0])
+            return
+
+        layout = list(range(self.numberOfQubits))
+        start = min(qubits)
+        swaps = []
+        for offset, qubit in enumerate(qubits):
+            site = layout.index(qubit)
+            while site > start + offset:
+                self.applyContiguousGate(gateSwap, site - 1, 2)
+                layout[site-1], layout[site] = layout[site], layout[site-1]
+                swaps.append(site - 1)
+                site -= 1
+
+        self.applyContiguousGate(gate, start, len(qubits))
+
+        for site in reversed(swaps):
+            self.applyContiguousGate(gateSwap, site, 2)
+
+    ## Contracts the chain into a state vector. Only feasible for few Qubits.
+    # @return Returns the state vector as a numpy array of length 2^numberOfQubits, q0 is the most significant bit.
+    ##
+    def stateVector(self):
+        state = self.tensors[0]
+        for tensor in self.tensors[1:]:
+            state = np.tensordot(state, tensor, axes=(state.ndim - 1, 0))
+
+        return np.reshape(state, -1)
+
+    ## Samples measurements of all qubits. With the centre on q0 every lane is sampled conditioned on the outcomes of the lanes before it, for all shots at once.
+    # @param repetitions
+    # The number of shots.
+    # @param rng
+    # The numpy Generator drawing the outcomes.
+    # @return Returns a numpy uint8 array of shape (repetitions, numberOfQubits) with the outcome of every qubit.
+    ##
+    def sample(self, repetitions, rng):
+        self.moveCentre(0)
+        bits = np.zeros((repetitions, self.numberOfQubits), dtype=np.uint8)
+        environment = np.ones((repetitions, 1), dtype=complex)
+
+        for site in range(self.numberOfQubits):
+            amplitudes = np.einsum("sa,aib->sib", environment, self.tensors[site])
+            probabilities = np.sum(np.abs(amplitudes)**2, axis=2)
+            probabilityOne = probabilities[:, 1] / np.sum(probabilities, axis=1)
+            outcomes = (rng.random(repetitions) < probabilityOne).astype(np.uint8)
+            bits[:, site] = outcomes
+            environment = amplitudes[np.arange(repetitions), outcomes]
+            environment /= np.linalg.norm(environment, axis=1)[:, np.newaxis]
+
+        return bits
+
+##
+# @class MpsSim
+# @brief Simulate a whole circuit as a MatrixProductState. Memory grows with the entanglement of the state instead of exponentially with the number of Qubits.
+##
+class MpsSim(object):
+
+    ##
+    # init method setting the truncation of the state and the random number generator.
+    # @param rng
+    # A numpy Generator for shots and Deutsch Oracles. None to create one with a random seed.
+    # @param maxBondDimension
+    # The maximum bond dimension kept after a gate.
+    # @param truncationError
+    # The maximum relative weight of the singular values discarded after a gate.
+    ##
+    def __init__(self, rng=None, maxBondDimension=MAX_BOND_DIMENSION, truncationError=TRUNCATION_ERROR):
+        if rng is None:
+            rng = np.random.default_rng()
+        self.rng = rng
+        self.maxBondDimension = maxBondDimension
+        self.truncationError = truncationError
+
+    ## Runs a compiled circuit. Measurements are skipped like in the matrix simulator.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @return Returns the MatrixProductState of the final state.
+    ##
+    def runCompiledCircuit(self, compiledCircuit):
+        state = MatrixProductState(compiledCircuit.numberOfQubits, self.maxBondDimension, self.truncationError)
+
+        for opcode, qubits, matrix in compiledCircuit.instructions:
+            if opcode == MEASUREMENT or (opcode == DEUTSCH_ORACLE and self.rng.integers(2) == 0):
+                continue
+            state.applyGate(matrix, qubits)
+
+        return state
+
+    ## Describes a simulated state by its bond dimension, truncation and, for few Qubits, the probabilities of all basis states.
+    # @param state
+    # The MatrixProductState.
+    # @return Returns a list of strings.
+    ##
+    def buildResult(self, state):
+        result = []
+
+        if state.numberOfQubits <= PROBABILITY_LIMIT:
+            for index, amplitude in enumerate(state.stateVector()):
+                result.append("Probability of |" + format(index, "0" + str(state.numberOfQubits) + "b") + "> :  " + str(round(abs(amplitude)**2, 2)))
+        result.append("Bond dimension :  " + str(state.bondDimension()))
+        result.append("Truncation error :  " + str(state.discardedWeight))
+        result.append("Fidelity estimate :  " + str(state.fidelity))
+
+        return result
+
+    ## Simulate a compiled circuit.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @return Returns the result as returned by buildResult.
+    ##
+    def simulateCompiledCircuit(self, compiledCircuit):
+        return self.buildResult(self.runCompiledCircuit(compiledCircuit))
+
+    ## Simulate a circuit.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param circuit
+    # A list containing the quantum circuit as generated in the gui, without gaps.
+    # @return Returns the result as returned by buildResult.
+    ##
+    def simulateCircuit(self, numberOfQubits, circuit):
+        return self.simulateCompiledCircuit(CircuitCompiler().compileCircuit(circuit))
+
+    ## Simulate a compiled circuit and measure all qubits at its end.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @param repetitions
+    # The number of shots.
+    # @return Returns a numpy uint8 array of shape (repetitions, numberOfQubits) with the outcome of every qubit.
+    ##
+    def sampleCompiledCircuit(self, compiledCircuit, repetitions):
+        return self.runCompiledCircuit(compiledCircuit).sample(repetitions, self.rng)
@@ -0,0 +1,202 @@
+##
+# @file qasmImport.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing a streaming importer translating OpenQASM 2.0 programs into circuits of Quasim.
+#
+##
+
+import re
+
+from sparseCircuit import SparseCircuit
+
+## Quasim gates of every supported OpenQASM gate as (gate, qubits of the OpenQASM gate used as targets, qubits used as controls).
+## Gates without a counterpart in Quasim are built from several gates, e.g. sdg = S Z.
+qasmGates = {"x": [("Pauli-X-Gate", (0,), ())],
+             "y": [("Pauli-Y-Gate", (0,), ())],
+             "z": [("Pauli-Z-Gate", (0,), ())],
+             "h": [("Hadamard Gate", (0,), ())],
+             "s": [("S Gate", (0,), ())],
+             "t": [("T Gate", (0,), ())],
+             "sdg": [("Pauli-Z-Gate", (0,), ()), ("S Gate", (0,), ())],
+             "tdg": [("Pauli-Z-Gate", (0,), ()), ("S Gate", (0,), ()), ("T Gate", (0,), ())],
+             "cx": [("CNot Gate", (1,), (0,))],
+             "CX": [("CNot Gate", (1,), (0,))],
+             "swap": [("Swap Gate", (0, 1), ())],
+             "ccx": [("Toffoli Gate", (2,), (0, 1))],
+             "cswap": [("Fredkin Gate", (1, 2), (0,))],
+             "measure": [("Measurement", (0,), ())],
+             "id": [],
+             "barrier": []}
+
+## a statement applying a gate: its name, optional parameters and its arguments.
+gatePattern = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(\(.*\))?\s*(.*)$", re.S)
+## an argument of a gate, a register with an optional index.
+argumentPattern = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(?:\[\s*(\d+)\s*\])?$")
+## the declaration of a register.
+registerPattern = re.compile(r"^([qc])reg\s+([A-Za-z_][A-Za-z0-9_]*)\s*\[\s*(\d+)\s*\]$")
+
+##
+# @class QasmImporter
+# @brief Read an OpenQASM 2.0 program statement by statement and translate it into gates of Quasim. The file is never loaded as a whole, so programs with
+# millions of gates only need the memory of the resulting circuit. The quantum registers are placed on the lanes in the order of their declaration,
+# qubit q[i] of the first register is lane i.
+##
+class QasmImporter(object):
+
+    ##
+    # init method creating an importer without registers.
+    ##
+    def __init__(self):
+        ## first lane and size of every quantum register keyed by its name.
+        self.quantumRegisters = {}
+        self.classicalRegisters = {}
+        self.numberOfQubits = 0
+
+    ## Splits a program into statements while reading it line by line. Comments are removed, a statement may span several lines.
+    # A gate definition is one statement including its body in braces.
+    # @param handle
+    # A file or any other iterable of lines.
+    # @return Returns a generator of tuples (line number, statement).
+    ##
+    def readStatements(self, handle):
+        buffer = ""
+        lineNumber = 0
+
+        for lineNumber, line in enumerate(handle, 1):
+            buffer += " " + line.split("//", 1)[0]
+            while True:
+                end = buffer.find(";")
+                blockStart = buffer.find("{")
+                if blockStart != -1 and (end == -1 or blockStart < end):
+                    #the body of a gate definition contains semicolons, the definition ends with its closing brace
+                    blockEnd = buffer.find("}", blockStart)
+                    if blockEnd == -1:
+                        break
+                    statement, buffer = buffer[:blockEnd+1], buffer[blockEnd+1:]
+                elif end != -1:
+                    statement, buffer = buffer[:end], buffer[end+1:]
+                else:
+                    break
+                statement = statement.strip()
+                if statement != "":
+                    yield lineNumber, statement
+
+        if "{" in buffer:
+            raise ValueError("Line " + str(lineNumber) + ": the gate definition \"" + buffer.strip() + "\" is not closed by a brace.")
+        elif buffer.strip() != "":
+            raise ValueError("Line " + str(lineNumber) + ": the statement \"" + buffer.strip() + "\" is not terminated by a semicolon.")
+
+    ## Resolves an argument of a gate into lanes.
+    # @param argument
+    # The argument, e.g. "q[3]" or "q" for all qubits of the register.
+    # @param lineNumber
+    # The number of the line, used for error messages.
+    # @return Returns a list of lanes.
+    ##
+    def resolveArgument(self, argument, lineNumber):
+        match = argumentPattern.match(argument.strip())
+        if match is None:
+            raise ValueError("Line " + str(lineNumber) + ": \"" + argument.strip() + "\" is not a qubit.")
+        name, index = match.groups()
+        if name not in self.quantumRegisters:
+            raise ValueError("Line " + str(lineNumber) + ": the quantum register " + name + " is not declared.")
+
+        start, size = self.quantumRegisters[name]
+        if index is None:
+            return list(range(start, start + size))
+        elif int(index) >= size:
+            raise ValueError("Line " + str(lineNumber) + ": " + name + "[" + index + "] is outside of the register of size " + str(size) + ".")
+        return [start + int(index)]
+
+    ## Translates one statement. Declarations are recorded, gates are translated and applied to every qubit of register arguments.
+    # @param statement
+    # The statement without its semicolon.
+    # @param lineNumber
+    # The number of the line, used for error messages.
+    # @return Returns a list of tuples (gate, targets, controls) in the format of SparseCircuit.addGate.
+    ##
+    def translateStatement(self, statement, lineNumber):
+        if statement.startswith("OPENQASM"):
+            if statement.split()[-1] != "2.0":
+                raise ValueError("Line " + str(lineNumber) + ": only OpenQASM 2.0 is supported.")
+            return []
+        elif statement.startswith("include"):
+            return []
+        elif statement.split()[0] in ("gate", "opaque"):
+            #definitions of own gates are skipped, applying such a gate is reported as not supported
+            return []
+
+        registerMatch = registerPattern.match(statement)
+        if registerMatch is not None:
+            kind, name, size = registerMatch.groups()
+            if kind == "q":
+                self.quantumRegisters[name] = (self.numberOfQubits, int(size))
+                self.numberOfQubits += int(size)
+            else:
+                self.classicalRegisters[name] = int(size)
+            return []
+
+        gateMatch = gatePattern.match(statement)
+        if gateMatch is None:
+            raise ValueError("Line " + str(lineNumber) + ": \"" + statement + "\" is not a statement of OpenQASM 2.0.")
+        name, parameters, arguments = gateMatch.groups()
+        if name not in qasmGates or parameters is not None:
+            raise ValueError("Line " + str(lineNumber) + ": \"" + statement + "\" is not supported, only " + ", ".join(sorted(qasmGates)) + " without parameters can be imported.")
+        if name == "measure":
+            #the classical bit is not needed, Quasim measures into the probabilities of the result
+            arguments = arguments.split("->")[0]
+
+        lanes = [self.resolveArgument(argument, lineNumber) for argument in arguments.split(",")]
+        #registers are applied qubit by qubit, single qubits are repeated for every qubit of the registers
+        repetitions = max(len(argumentLanes) for argumentLanes in lanes)
+        if any(len(argumentLanes) not in (1, repetitions) for argumentLanes in lanes):
+            raise ValueError("Line " + str(lineNumber) + ": the registers of \"" + statement + "\" have different sizes.")
+
+        operations = []
+        for repetition in range(repetitions):
+            qubits = [argumentLanes[repetition] if len(argumentLanes) > 1 else argumentLanes[0] for argumentLanes in lanes]
+            for gate, targets, controls in qasmGates[name]:
+                if max(targets + controls) >= len(qubits):
+                    raise ValueError("Line " + str(lineNumber) + ": " + name + " needs " + str(max(targets + controls) + 1) + " qubits.")
+                operations.append((gate, tuple(qubits[index] for index in targets), tuple(qubits[index] for index in controls)))
+
+        return operations
+
+    ## Reads a program and yields its gates one by one while the file is read.
+    # @param handle
+    # A file or any other iterable of lines.
+    # @return Returns a generator of tuples (gate, targets, controls) in the format of SparseCircuit.addGate.
+    ##
+    def readOperations(self, handle):
+        for lineNumber, statement in self.readStatements(handle):
+            for operation in self.translateStatement(statement, lineNumber):
+                yield operation
+
+    ## Reads a program into a SparseCircuit. Every gate is placed in the first column after the last gate on its lanes, so the circuit is as shallow as possible.
+    # @param handle
+    # A file or any other iterable of lines.
+    # @return Returns the SparseCircuit with a lane for every declared qubit.
+    ##
+    def importCircuit(self, handle):
+        circuit = SparseCircuit()
+
+        for gate, targets, controls in self.readOperations(handle):
+            circuit.addGate(gate, targets, controls)
+        circuit.numberOfQubits = max(circuit.numberOfQubits, self.numberOfQubits)
+
+        if circuit.numberOfQubits == 0:
+            raise ValueError("The program does not declare any qubits.")
+        return circuit
+
+## Reads an OpenQASM 2.0 file into a SparseCircuit.
+# @param path
+# The path of the file.
+# @return Returns the SparseCircuit.
+##
+def importQasmFile(path):
+    with open(path) as qasmFile:
+        return QasmImporter().importCircuit(qasmFile)
@@ -17,16 +17,20 @@
 #
 ##
 
-import tkinter as tk
-
-from gui import Gui
-
 ##
 #
-# @brief main method instancing the main window and starting the main loop
+# @brief main method instancing the main window and starting the main loop. With command line arguments Quasim runs without the GUI, see commandLine.py.
 #
 ##
 def main(args):
+    if len(args) > 1:
+        import commandLine
+        return commandLine.main(args[1:])
+
+    #tkinter is only needed for the GUI
+    import tkinter as tk
+    from gui import Gui
+
 	#Create a main window and give it a title
     root = tk.Tk()
     root.title("Quasim")
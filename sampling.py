@@ -0,0 +1,127 @@
+##
+# @file sampling.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the sampling of measurement shots from the final probabilities of a simulation.
+#
+##
+
+import numpy as np
+
+from tracing import tracer
+
+##
+# @class ShotResult
+# @brief The outcome of measuring all qubits of a circuit several times. The shots are stored bit-packed, every shot uses one bit per qubit.
+##
+class ShotResult(object):
+
+    ##
+    # init method storing the shots and their histogram.
+    # @param numberOfQubits
+    # The number of Qubits measured in every shot.
+    # @param shots
+    # A numpy uint8 array of shape (repetitions, ceil(numberOfQubits / 8)) as returned by np.packbits. The first bit of a shot is q0.
+    # @param histogram
+    # A dictionary mapping the measured bit strings, q0 first, to the number of shots with this outcome.
+    ##
+    def __init__(self, numberOfQubits, shots, histogram):
+        self.numberOfQubits = numberOfQubits
+        self.repetitions = len(shots)
+        self.shots = shots
+        self.histogram = histogram
+
+    ## Unpacks the shots into one entry per qubit.
+    # @return Returns a numpy uint8 array of shape (repetitions, numberOfQubits) containing 0 or 1.
+    ##
+    def unpackShots(self):
+        return np.unpackbits(self.shots, axis=1, count=self.numberOfQubits)
+
+    ## Lists the histogram in the format of the probabilities returned by MatSim.buildResult.
+    # @return Returns a list of strings, one for every measured basis state.
+    ##
+    def buildResult(self):
+        return ["Count of |" + bits + "> :  " + str(count) for bits, count in sorted(self.histogram.items())]
+
+##
+# @class ShotSampler
+# @brief Draw measurement shots from a probability distribution over the basis states of a register.
+##
+class ShotSampler(object):
+
+    ##
+    # init method creating the random number generator.
+    # @param seed
+    # A seed to make the shots reproducible. None for a random seed.
+    ##
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    ## Packs basis state indices into shots. Index bits are written most significant bit first, so q0 ends up in the first bit of a shot.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @param indices
+    # A numpy array of basis state indices.
+    # @return Returns the shots as a numpy uint8 array of shape (len(indices), ceil(numberOfQubits / 8)).
+    ##
+    def packIndices(self, numberOfQubits, indices):
+        if numberOfQubits > 64:
+            raise ValueError("Shots of more than 64 Qubits can not be packed.")
+        bytesPerShot = (numberOfQubits + 7) // 8
+        #align the most significant bit of the index with the first bit of the first byte
+        aligned = np.asarray(indices, dtype=np.uint64) << np.uint64(8 * bytesPerShot - numberOfQubits)
+        bigEndian = aligned.astype(">u8").view(np.uint8).reshape(-1, 8)
+
+        return np.ascontiguousarray(bigEndian[:, 8 - bytesPerShot:])
+
+    ## Samples measurements of all qubits from the probabilities of the final state. The number of shots per basis state is drawn in one multinomial sample,
+    # so the cost does not grow with the number of repetitions but only with the number of basis states.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @param probabilities
+    # A numpy array with the probability of every basis state, q0 is the most significant bit of the index.
+    # @param repetitions
+    # The number of shots.
+    # @return Returns a ShotResult.
+    ##
+    def sampleProbabilities(self, numberOfQubits, probabilities, repetitions):
+        if repetitions < 1:
+            raise ValueError("At least one repetition is needed, " + str(repetitions) + " were requested.")
+        with tracer.span("sample", repetitions=repetitions):
+            probabilities = np.reshape(np.asarray(probabilities, dtype=float), -1)
+            #rounding errors of the simulation make the probabilities sum up to almost 1
+            counts = self.rng.multinomial(repetitions, probabilities / np.sum(probabilities))
+
+            outcomes = np.flatnonzero(counts)
+            indices = self.rng.permutation(np.repeat(outcomes, counts[outcomes]))
+            histogram = {format(int(index), "0" + str(numberOfQubits) + "b"): int(counts[index]) for index in outcomes}
+
+            return ShotResult(numberOfQubits, self.packIndices(numberOfQubits, indices), histogram)
+
+    ## Builds a ShotResult from shots that were already measured, e.g. by Cirq.
+    # @param bits
+    # A numpy array of shape (repetitions, numberOfQubits) containing the measured bit of every qubit, q0 first.
+    # @return Returns a ShotResult.
+    ##
+    def collectShots(self, bits):
+        bits = np.asarray(bits, dtype=np.uint8)
+
+        return self.collectPackedShots(bits.shape[1], np.packbits(bits, axis=1))
+
+    ## Builds a ShotResult from bit-packed shots, counting the outcomes on the packed bytes.
+    # @param numberOfQubits
+    # The number of Qubits measured in every shot.
+    # @param shots
+    # A numpy uint8 array of shape (repetitions, ceil(numberOfQubits / 8)) as returned by np.packbits.
+    # @return Returns a ShotResult.
+    ##
+    def collectPackedShots(self, numberOfQubits, shots):
+        outcomes, counts = np.unique(shots, axis=0, return_counts=True)
+        histogram = {}
+        for outcome, count in zip(outcomes, counts):
+            histogram["".join(str(bit) for bit in np.unpackbits(outcome, count=numberOfQubits))] = int(count)
+
+        return ShotResult(numberOfQubits, shots, histogram)
@@ -0,0 +1,295 @@
+##
+# @file sharedSim.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing a statevector simulator distributing the amplitudes over several processes in shared memory.
+#
+##
+
+import os
+import shutil
+import weakref
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from matSim import MatSim
+from diskSim import DiskSim, MIN_LOCAL_QUBITS
+
+## default number of worker processes, rounded down to a power of two.
+WORKERS = os.cpu_count() or 1
+
+##
+# @class PartitionedStatevector
+# @brief The layout of a state vector split into 2^partitionQubits partitions. The qubits on the partitionQubits most significant axes select
+# the partition, every partition belongs to one worker process. It offers the attributes DiskSim uses to plan passes and apply gates, a partition
+# plays the role of a chunk.
+##
+class PartitionedStatevector(object):
+
+    ##
+    # init method setting the sizes of the partitions.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @param partitionQubits
+    # The number of qubits selecting the partition.
+    # @param layout
+    # The axis of every qubit, None to start with qubit i on axis i.
+    ##
+    def __init__(self, numberOfQubits, partitionQubits, layout=None):
+        self.numberOfQubits = numberOfQubits
+        self.globalQubits = partitionQubits
+        self.localQubits = numberOfQubits - partitionQubits
+        self.partitionSize = 2**self.localQubits
+        self.numberOfPartitions = 2**partitionQubits
+        self.layout = list(range(numberOfQubits)) if layout is None else list(layout)
+
+    ## Returns the bit a partition has on a partition axis.
+    # @param partition
+    # The number of the partition.
+    # @param axis
+    # A partition axis, smaller than globalQubits.
+    # @return Returns 0 or 1.
+    ##
+    def chunkBit(self, partition, axis):
+        return (partition >> (self.globalQubits - 1 - axis)) & 1
+
+    ## Returns the amplitudes of a partition.
+    # @param amplitudes
+    # The whole state vector as a flat numpy array.
+    # @param partition
+    # The number of the partition.
+    # @return Returns a view of shape (2, 2, ..., 2) with one axis per local qubit.
+    ##
+    def partition(self, amplitudes, partition):
+        return np.reshape(amplitudes[partition*self.partitionSize:(partition+1)*self.partitionSize], (2,) * self.localQubits)
+
+## Attaches to the shared memory of a state vector.
+# @param name
+# The name of the shared memory block.
+# @return Returns the SharedMemory.
+##
+def attachSharedMemory(name):
+    try:
+        #the block belongs to the main process, it must not be removed when a worker ends
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        #before Python 3.13 the workers share the resource tracker of the main process, which forgets the block when it is unlinked
+        return shared_memory.SharedMemory(name=name)
+
+## Applies the tasks of the main process to the partition of one worker until it receives None.
+# @param rank
+# The number of the worker, it works on the partition with the same number.
+# @param tasks
+# The queue the worker receives its tasks from.
+# @param results
+# The queue the worker reports finished tasks to, with an error message if a task failed.
+##
+def runWorker(rank, tasks, results):
+    simulator = DiskSim()
+    sharedMemory = None
+    amplitudes = None
+
+    for task in iter(tasks.get, None):
+        try:
+            if task[0] == "attach":
+                kind, name, numberOfQubits = task
+                sharedMemory = attachSharedMemory(name)
+                amplitudes = np.ndarray((2**numberOfQubits,), dtype=complex, buffer=sharedMemory.buf)
+            elif task[0] == "detach":
+                amplitudes = None
+                sharedMemory.close()
+                sharedMemory = None
+            elif task[0] == "gates":
+                kind, numberOfQubits, partitionQubits, layout, operations = task
+                state = PartitionedStatevector(numberOfQubits, partitionQubits, layout)
+                data = state.partition(amplitudes, rank)
+                for operation in operations:
+                    result = simulator.applyOperation(state, rank, data, operation)
+                    if result is not data:
+                        data[...] = result
+            elif task[0] == "swap":
+                kind, numberOfQubits, partitionQubits, layout, globalAxis, localAxis = task
+                state = PartitionedStatevector(numberOfQubits, partitionQubits, layout)
+                bit = state.chunkBit(rank, globalAxis)
+                partner = rank ^ (1 << (partitionQubits - 1 - globalAxis))
+                partitionZero, partitionOne = (rank, partner) if bit == 0 else (partner, rank)
+                #the half of partition zero with a 1 on the local axis is exchanged with the half of partition one with a 0,
+                #both workers of the pair exchange one half of it
+                localIndex = localAxis - partitionQubits
+                viewZero = np.moveaxis(state.partition(amplitudes, partitionZero), localIndex, 0)[1][bit]
+                viewOne = np.moveaxis(state.partition(amplitudes, partitionOne), localIndex, 0)[0][bit]
+                exchanged = viewZero.copy()
+                viewZero[...] = viewOne
+                viewOne[...] = exchanged
+            results.put((rank, None))
+        except Exception as error:
+            results.put((rank, repr(error)))
+
+    if sharedMemory is not None:
+        sharedMemory.close()
+
+## Stops worker processes. Processes forked later inherit the finalizer calling this, only the process that started the workers stops them.
+# @param ownerId
+# The process id of the process that started the workers.
+# @param processes
+# The processes.
+# @param queues
+# Their task queues.
+##
+def stopWorkers(ownerId, processes, queues):
+    if os.getpid() != ownerId:
+        return
+    for queue in queues:
+        queue.put(None)
+    for process in processes:
+        process.join()
+
+##
+# @class SharedSim
+# @brief Simulate a whole circuit with the state vector in shared memory, partitioned over worker processes by the most significant qubits.
+# Every worker applies the gates acting on local qubits to its partition without any locking. A gate on a partition qubit is preceded by a pass
+# in which pairs of workers exchange half of their partitions, moving the qubit to a local axis. The passes are planned like in DiskSim.
+##
+class SharedSim(object):
+
+    ##
+    # init method setting the number of worker processes. They are started on first use and kept for further simulations.
+    # @param rng
+    # A numpy Generator for Deutsch Oracles. None to create one with a random seed.
+    # @param workers
+    # The number of worker processes, rounded down to a power of two.
+    # @param matSim
+    # The MatSim used to plan passes. None to create one.
+    ##
+    def __init__(self, rng=None, workers=WORKERS, matSim=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        if matSim is None:
+            matSim = MatSim(rng=rng)
+        self.rng = rng
+        self.matSim = matSim
+        self.workers = workers
+        self.processes = []
+        self.queues = []
+        self.results = None
+        self.finalizer = None
+
+    ## Calculates the number of partition qubits of a register. Every partition keeps one local qubit more than a gate needs, so a swap pass can be split between two workers.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @return Returns the number of partition qubits.
+    ##
+    def choosePartitionQubits(self, numberOfQubits):
+        return max(0, min(self.workers.bit_length() - 1, numberOfQubits - MIN_LOCAL_QUBITS - 1))
+
+    ## Checks whether the shared memory has room for a state vector.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    # @return Returns True if the state vector fits.
+    ##
+    def fitsIntoSharedMemory(self, numberOfQubits):
+        if not os.path.isdir("/dev/shm"):
+            return True
+        return shutil.disk_usage("/dev/shm").free >= 2**numberOfQubits * np.dtype(complex).itemsize
+
+    ## Starts the worker processes if they are not running.
+    # @param numberOfWorkers
+    # The number of workers needed.
+    ##
+    def startWorkers(self, numberOfWorkers):
+        if len(self.processes) >= numberOfWorkers:
+            return
+        if self.results is None:
+            self.results = multiprocessing.Queue()
+        #workers attaching to a block register it with the resource tracker, it has to run before they are started so they share it
+        resource_tracker.ensure_running()
+
+        for rank in range(len(self.processes), numberOfWorkers):
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=runWorker, args=(rank, queue, self.results), daemon=True)
+            process.start()
+            self.processes.append(process)
+            self.queues.append(queue)
+
+        if self.finalizer is not None:
+            self.finalizer.detach()
+        self.finalizer = weakref.finalize(self, stopWorkers, os.getpid(), self.processes, self.queues)
+
+    ## Stops the worker processes.
+    ##
+    def close(self):
+        if self.finalizer is not None:
+            self.finalizer()
+        self.processes = []
+        self.queues = []
+        self.finalizer = None
+
+    ## Sends a task to some workers and waits until all of them finished it.
+    # @param numberOfWorkers
+    # The number of workers, starting with rank 0.
+    # @param task
+    # The task as a tuple.
+    ##
+    def broadcast(self, numberOfWorkers, task):
+        for queue in self.queues[:numberOfWorkers]:
+            queue.put(task)
+
+        errors = []
+        for _ in range(numberOfWorkers):
+            rank, error = self.results.get()
+            if error is not None:
+                errors.append("worker " + str(rank) + ": " + error)
+        if errors != []:
+            raise ValueError("The shared memory simulation failed, " + "; ".join(errors))
+
+    ## Calculates the state of all qubits after a compiled circuit. Measurements are skipped like in the matrix simulator.
+    # @param compiledCircuit
+    # The CompiledCircuit that will be simulated.
+    # @return Returns the result vector as a column vector.
+    ##
+    def runCompiledCircuit(self, compiledCircuit):
+        numberOfQubits = compiledCircuit.numberOfQubits
+        if not self.fitsIntoSharedMemory(numberOfQubits):
+            raise ValueError("The state vector of " + str(numberOfQubits) + " Qubits does not fit into the shared memory.")
+
+        state = PartitionedStatevector(numberOfQubits, self.choosePartitionQubits(numberOfQubits))
+        #the passes are planned like the passes over the chunks of a DiskStatevector
+        planner = DiskSim(self.rng, matSim=self.matSim)
+        operations = planner.buildOperations(compiledCircuit, [])
+        self.startWorkers(state.numberOfPartitions)
+
+        sharedMemory = shared_memory.SharedMemory(create=True, size=2**numberOfQubits * np.dtype(complex).itemsize)
+        try:
+            amplitudes = np.ndarray((2**numberOfQubits,), dtype=complex, buffer=sharedMemory.buf)
+            amplitudes[:] = 0
+            amplitudes[0] = 1
+            self.broadcast(state.numberOfPartitions, ("attach", sharedMemory.name, numberOfQubits))
+            try:
+                start = 0
+                while start < len(operations):
+                    plan = planner.planPass(state, operations, start)
+                    if plan[0] == "swap":
+                        kind, globalAxis, localAxis = plan
+                        self.broadcast(state.numberOfPartitions, ("swap", numberOfQubits, state.globalQubits, state.layout, globalAxis, localAxis))
+                        globalQubit = state.layout.index(globalAxis)
+                        localQubit = state.layout.index(localAxis)
+                        state.layout[globalQubit], state.layout[localQubit] = localAxis, globalAxis
+                    else:
+                        self.broadcast(state.numberOfPartitions, ("gates", numberOfQubits, state.globalQubits, state.layout, operations[start:plan[1]]))
+                        start = plan[1]
+            finally:
+                self.broadcast(state.numberOfPartitions, ("detach",))
+
+            #axis i of the result is the axis of qubit i
+            resultVector = np.reshape(np.transpose(np.reshape(amplitudes, (2,) * numberOfQubits), state.layout), (2**numberOfQubits, 1)).copy()
+            del amplitudes
+        finally:
+            sharedMemory.close()
+            sharedMemory.unlink()
+
+        return resultVector
@@ -9,9 +9,46 @@
 #
 ##
 
-from tableSim import TableSim
+import os
+import numpy as np
+
 from matSim import MatSim
-from cirqSim import CirqSim
+from circuitOptimizer import CircuitOptimizer
+from circuitCompiler import CircuitCompiler
+from sparseCircuit import SparseCircuit, buildSparseCircuit
+from cache import ResultCache
+from sampling import ShotSampler
+from backends import registry
+from tracing import tracer
+
+## number of compiled circuits kept by a Simulator.
+COMPILED_CIRCUIT_CACHE_SIZE = 64
+## default number of bytes of simulation results kept in memory by a Simulator.
+RESULT_CACHE_LIMIT = 256 * 1024**2
+## number of chunks every worker of a batch simulation gets on average, more chunks balance the load better but cost more communication.
+CHUNKS_PER_WORKER = 4
+
+## the Simulator of a worker process of a batch simulation.
+batchSimulator = None
+
+##
+# Creates the Simulator of a worker process with the settings of the Simulator starting the batch.
+# @param settings
+# The settings as returned by Simulator.batchSettings.
+##
+def initializeBatchWorker(settings):
+	global batchSimulator
+	batchSimulator = Simulator()
+	batchSimulator.applyBatchSettings(settings)
+
+##
+# Simulates one circuit of a batch in a worker process.
+# @param item
+# A tuple (index, simulation, circuit, repetitions, seed), see Simulator.simulateBatchItem.
+# @return the result of the simulation.
+##
+def simulateBatchItem(item):
+	return batchSimulator.simulateBatchItem(item)
 
 ##
 # @class Simulator
@@ -21,36 +58,268 @@ class Simulator(object):
 	
 	##
     # init method handling the imports and a variable to save the simulation result.
+    # @param resultCacheLimit
+    # The maximum number of bytes of simulation results kept in memory.
+    # @param resultCacheDirectory
+    # A directory to keep simulation results in between runs of Quasim. None to only keep them in memory.
+    # @param resultCacheDiskLimit
+    # The maximum number of bytes of simulation results kept in the directory. None for no limit.
+    # @param seed
+    # A seed for the sampling of shots. None for a random seed.
     ##
-	def __init__(self):
+	def __init__(self, resultCacheLimit=RESULT_CACHE_LIMIT, resultCacheDirectory=None, resultCacheDiskLimit=None, seed=None):
 		## list to save the result of simulation in.
 		self.result = []
-		self.tableSim = TableSim()
-		self.matSim = MatSim()
-		self.cirqSim = CirqSim()
+		## sampler drawing the shots of simulations with repetitions and the random numbers of all simulators.
+		self.shotSampler = ShotSampler(seed)
+		self.matSim = MatSim(rng=self.shotSampler.rng)
+		#the other simulators are only imported and created when they are used, see their properties
+		## backends created so far keyed by their name, see getBackend.
+		self.backends = {}
+		self._tableSim = None
+		self._cirqSim = None
+		self._stabSim = None
+		self._mpsSim = None
+		self._diskSim = None
+		self._sharedSim = None
+		self.circuitOptimizer = CircuitOptimizer()
+		self.circuitCompiler = CircuitCompiler()
+		## compiled circuits of the last simulations keyed by their circuit list.
+		self.compiledCircuits = {}
+		## results of whole circuit simulations keyed by a hash of the circuit.
+		self.resultCache = ResultCache(resultCacheLimit, resultCacheDirectory, resultCacheDiskLimit)
+		## remove cancelling gates and merge diagonal gates before simulating a circuit, see CircuitOptimizer.optimizeCircuit.
+		self.optimizeCircuits = True
+		## number of gates and columns the optimisation removed from the last compiled circuit, None if it was not optimised.
+		self.optimizationReport = None
+		## fuse consecutive single qubit gates before simulating a circuit.
+		self.fuseGates = True
+
+	##
+	# The truth table simulator, created on first use.
+	##
+	@property
+	def tableSim(self):
+		if self._tableSim is None:
+			from tableSim import TableSim
+			self._tableSim = TableSim()
+		return self._tableSim
+
+	##
+	# The Cirq simulator, created on first use so Cirq is only imported if it is selected.
+	##
+	@property
+	def cirqSim(self):
+		if self._cirqSim is None:
+			from cirqSim import CirqSim
+			self._cirqSim = CirqSim(self.shotSampler.rng)
+		return self._cirqSim
+
+	##
+	# The stabilizer simulator, created on first use.
+	##
+	@property
+	def stabSim(self):
+		if self._stabSim is None:
+			from stabSim import StabSim
+			self._stabSim = StabSim(self.shotSampler.rng)
+		return self._stabSim
+
+	##
+	# The matrix product state simulator, created on first use. Its bond dimension and truncation error can be changed before a simulation.
+	##
+	@property
+	def mpsSim(self):
+		if self._mpsSim is None:
+			from mpsSim import MpsSim
+			self._mpsSim = MpsSim(self.shotSampler.rng)
+		return self._mpsSim
+
+	##
+	# The out of core simulator, created on first use. Its RAM budget, directory and state file can be changed before a simulation.
+	##
+	@property
+	def diskSim(self):
+		if self._diskSim is None:
+			from diskSim import DiskSim
+			self._diskSim = DiskSim(self.shotSampler.rng, matSim=self.matSim)
+		return self._diskSim
+
+	##
+	# The shared memory simulator, created on first use. Its worker processes are started with the first simulation.
+	##
+	@property
+	def sharedSim(self):
+		if self._sharedSim is None:
+			from sharedSim import SharedSim
+			self._sharedSim = SharedSim(self.shotSampler.rng, matSim=self.matSim)
+		return self._sharedSim
 		
+	##
+	# Method to reseed the random numbers of shots, measurements and Deutsch Oracles.
+	# @param seed
+	# The new seed, anything accepted by np.random.default_rng.
+	##
+	def setSeed(self, seed):
+		self.shotSampler = ShotSampler(seed)
+		self.matSim.rng = self.shotSampler.rng
+		if self._cirqSim is not None:
+			self._cirqSim.rng = self.shotSampler.rng
+		if self._stabSim is not None:
+			self._stabSim.rng = self.shotSampler.rng
+		if self._mpsSim is not None:
+			self._mpsSim.rng = self.shotSampler.rng
+		if self._diskSim is not None:
+			self._diskSim.rng = self.shotSampler.rng
+		if self._sharedSim is not None:
+			self._sharedSim.rng = self.shotSampler.rng
+		
+	##
+	# Method to translate a circuit into the program executed by the simulators. Gaps are filled, the circuit is optimised, single qubit gates are fused 
+	# and the gate names are compiled to opcodes. The last compiled circuits are kept, so simulating an unchanged circuit again skips all of these steps.
+	# @param circuit
+	# A list containing the quantum circuit itself, or a SparseCircuit. A SparseCircuit is compiled from its operations without building its grid.
+	# @return the CompiledCircuit.
+	##
+	def compileCircuit(self, circuit):
+		if isinstance(circuit, SparseCircuit):
+			key = (self.optimizeCircuits, self.fuseGates, circuit.signature())
+		else:
+			key = (self.optimizeCircuits, self.fuseGates, tuple(tuple(lane) for lane in circuit))
+			#fused gates are only identified by their name, their matrix would be missing in the key
+			if any(type(gate) is not str for lane in circuit for gate in lane):
+				key = None
+
+		if key in self.compiledCircuits:
+			compiledCircuit, self.optimizationReport = self.compiledCircuits[key]
+			return compiledCircuit
+
+		self.optimizationReport = None
+		if self.optimizeCircuits:
+			with tracer.span("optimize"):
+				numberOfPositions = None
+				if not isinstance(circuit, SparseCircuit):
+					#the removed columns are counted from the width of the grid, buildSparseCircuit already drops its empty columns
+					numberOfPositions = len(circuit[0]) if circuit != [] else 0
+					circuit = buildSparseCircuit(self.matSim.fillGapsInCircuit(circuit))
+				circuit, self.optimizationReport = self.circuitOptimizer.optimizeCircuit(circuit, numberOfPositions)
+			tracer.count("gatesRemoved", self.optimizationReport["removedGates"])
+			tracer.count("columnsRemoved", self.optimizationReport["removedColumns"])
+
+		if isinstance(circuit, SparseCircuit):
+			if self.fuseGates:
+				with tracer.span("fuse"):
+					circuit = self.circuitOptimizer.fuseSparseSingleQubitGates(circuit)
+			with tracer.span("parse"):
+				compiledCircuit = self.circuitCompiler.compileSparseCircuit(circuit)
+		else:
+			with tracer.span("fill gaps"):
+				circuit = self.matSim.fillGapsInCircuit(circuit)
+			if self.fuseGates:
+				with tracer.span("fuse"):
+					circuit = self.circuitOptimizer.fuseSingleQubitGates(circuit)
+			with tracer.span("parse"):
+				compiledCircuit = self.circuitCompiler.compileCircuit(circuit)
+
+		if key is not None:
+			if len(self.compiledCircuits) >= COMPILED_CIRCUIT_CACHE_SIZE:
+				del self.compiledCircuits[next(iter(self.compiledCircuits))]
+			self.compiledCircuits[key] = (compiledCircuit, self.optimizationReport)
+
+		return compiledCircuit
+
+	##
+	# Method to return the backend of a simulator, it is created on first use.
+	# @param simulation
+	# The name of the simulator as registered in backends.registry.
+	# @return the Backend.
+	##
+	def getBackend(self, simulation):
+		if simulation not in self.backends:
+			self.backends[simulation] = registry.backendClass(simulation)(self)
+		return self.backends[simulation]
+
+	##
+	# Method to choose the cheapest exact state vector simulator supporting a circuit, so the result is always the probabilities of the basis states.
+	# The backends are compared by their classes, only the chosen one is created.
+	# @param compiledCircuit
+	# The CompiledCircuit.
+	# @return the name of the simulator.
+	##
+	def chooseBackend(self, compiledCircuit):
+		costs = {}
+		for name in registry.names():
+			backendClass = registry.backendClass(name)
+			if backendClass.wholeCircuit and backendClass.exact and backendClass.statevector and not backendClass.samples:
+				costs[name] = backendClass.cost(self, compiledCircuit)
+
+		#supports may need the engine of a backend, so it is only checked in the order of the costs
+		for name in sorted(costs, key=costs.get):
+			if registry.backendClass(name).supports(self, compiledCircuit):
+				return name
+		raise ValueError("No exact state vector simulator supports this circuit, select another simulator like stabilizer, disk or mps.")
+
 	##
 	# Method to simulate a whole circuit and returning the result of simulation.
 	# @param [in] simulation 
-	# A String variable containing the simulator. Can only be "matrix" or "cirq" because truth table simulation does not support whole circuit simulation.
+	# A String variable containing the simulator, one of the names in backends.registry like "matrix", "statevector", "stabilizer", "mps" or "cirq".
+	# "auto" selects the cheapest exact state vector simulator. Truth table simulation does not support whole circuit simulation.
 	# @param [in] numberOfQubits
 	# The number of Qubits the circuit has.
 	# @param circuit
-	# A list containing the quantum circuit itself.
-	# @return the result of the simulation.
+	# A list containing the quantum circuit itself, or a SparseCircuit.
+	# @param repetitions
+	# The number of shots measuring all qubits at the end of the circuit. None to return the probabilities, or for "cirq" its default number of runs.
+	# @return the result of the simulation, a ShotResult if repetitions were requested.
 	##
-	def circuitSimulation(self, simulation, numberOfQubits, circuit):
-		if simulation == "matrix":
-		    self.result = self.matSim.simulateCircuit(numberOfQubits, circuit)
-		elif simulation == "cirq":
-			self.result = self.cirqSim.simulateCircuit(numberOfQubits, circuit)
+	def circuitSimulation(self, simulation, numberOfQubits, circuit, repetitions=None):
+		if len(circuit) != numberOfQubits:
+			raise ValueError("The circuit has " + str(len(circuit)) + " lanes but " + str(numberOfQubits) + " Qubits were selected.")
+
+		with tracer.span("simulate", simulation=simulation, numberOfQubits=numberOfQubits):
+			#a sparse circuit has no gaps
+			if not isinstance(circuit, SparseCircuit):
+				with tracer.span("fill gaps"):
+					circuit = self.matSim.fillGapsInCircuit(circuit)
+
+			if simulation == "auto":
+				simulation = self.chooseBackend(self.compileCircuit(circuit))
+			backend = self.getBackend(simulation)
+			if not backend.wholeCircuit:
+				raise ValueError("The " + simulation + " simulator does not support whole circuit simulation.")
+
+			#sampling simulators return other shots every run, so only the state vector backends are cached
+			key = None
+			if backend.statevector:
+				key = self.resultCache.buildKey(simulation, numberOfQubits, circuit, (self.optimizeCircuits, self.fuseGates, self.matSim.dtype.name, self.matSim.renormalize))
+				cachedResult = self.resultCache.get(key)
+				if cachedResult is not None:
+					tracer.count("resultCacheHits")
+					self.result = list(cachedResult["result"])
+					if repetitions is not None:
+						self.result = self.shotSampler.sampleProbabilities(numberOfQubits, cachedResult["probabilities"], repetitions)
+					return self.result
+
+			compiledCircuit = self.compileCircuit(circuit)
+			if not backend.supports(self, compiledCircuit):
+				raise ValueError("The " + simulation + " simulator does not support the gates or the number of Qubits of this circuit.")
+
+			if backend.statevector:
+				manipulationMatrix, resultVector = backend.runState(compiledCircuit)
+				probabilities = np.abs(np.reshape(resultVector, -1))**2
+				self.result = self.matSim.buildResult(numberOfQubits, resultVector)
+				self.resultCache.put(key, {"unitary": manipulationMatrix, "state": resultVector, "probabilities": probabilities, "result": list(self.result)})
+				if repetitions is not None:
+					self.result = self.shotSampler.sampleProbabilities(numberOfQubits, probabilities, repetitions)
+			else:
+				self.result = backend.simulate(compiledCircuit, circuit, repetitions)
 			
 		return self.result			
 	
 	##
 	# Method to simulate all single lanes in a circuit independently and returning the result of simulation.
 	# @param [in] simulation 
-	# A String variable containing the simulator. Can only be "matrix" or "truth table" simulation because "cirq" does not support single lane simulation.
+	# A String variable containing the simulator. Can only be "matrix" or "truth table" simulation because the other simulators do not support single lane simulation.
 	# @param [in] numberOfQubits
 	# The number of Qubits the circuit has.
 	# @param circuit
@@ -58,28 +327,114 @@ class Simulator(object):
 	# @return the result of the simulation.
 	##		
 	def singleLaneSimulation(self, simulation, numberOfQubits, circuit):
+		backend = self.getBackend(simulation)
+		if not backend.singleLane:
+			raise ValueError("The " + simulation + " simulator does not support single lane simulation.")
+
 		#reduce the circuit to its minimum size to reduce the required time for calculation.
-		circuit = self.matSim.fillGapsInCircuit(circuit)
+		compiledCircuit = self.compileCircuit(circuit)
+
+		with tracer.span("simulate lanes", simulation=simulation, numberOfQubits=numberOfQubits):
+			self.result = backend.simulateLanes(compiledCircuit)
 		
-		qubitLanes = len(circuit)
-		self.result = [[] for _ in range(qubitLanes)]
-		lane = []
+		return self.result
+
+	##
+	# Method to collect the settings a user can change, so the worker processes of a batch simulate like this Simulator. Simulators that were not
+	# created yet still have their default settings and are left out, so they are not created just to read them. The result cache of a worker
+	# only keeps results in memory because its files are not safe to write from several processes.
+	# @return a dictionary with the changed attributes of every object, keyed by its attribute path from the Simulator, "" for the Simulator itself.
+	##
+	def batchSettings(self):
+		settings = {"": {"optimizeCircuits": self.optimizeCircuits, "fuseGates": self.fuseGates},
+			"matSim": {"memoryLimit": self.matSim.memoryLimit, "dtype": self.matSim.dtype, "renormalize": self.matSim.renormalize,
+				"normTolerance": self.matSim.normTolerance, "normCheckInterval": self.matSim.normCheckInterval, "workers": self.matSim.workers},
+			"matSim.columnCache": {"maxBytes": self.matSim.columnCache.maxBytes, "maxEntries": self.matSim.columnCache.maxEntries},
+			"resultCache.memoryCache": {"maxBytes": self.resultCache.memoryCache.maxBytes}}
+		if self._mpsSim is not None:
+			settings["mpsSim"] = {"maxBondDimension": self._mpsSim.maxBondDimension, "truncationError": self._mpsSim.truncationError}
+		if self._diskSim is not None:
+			#every worker keeps its state in its own temporary file, so the state file of this Simulator is not passed on
+			settings["diskSim"] = {"ramBudget": self._diskSim.ramBudget, "directory": self._diskSim.directory}
+		if self._sharedSim is not None:
+			settings["sharedSim"] = {"workers": self._sharedSim.workers}
+		return settings
 
-		while qubitLanes > 0:
+	##
+	# Method to apply the settings of another Simulator.
+	# @param settings
+	# The settings as returned by batchSettings.
+	##
+	def applyBatchSettings(self, settings):
+		for path, attributes in settings.items():
+			target = self
+			for name in path.split(".") if path != "" else []:
+				target = getattr(target, name)
+			for name, value in attributes.items():
+				setattr(target, name, value)
 
-			numberOfGates = len(circuit[qubitLanes-1])
-			counter = 0
+	##
+	# Method to simulate one circuit of a batch.
+	# @param item
+	# A tuple (index, simulation, circuit, repetitions, seed). With a seed the shots only depend on the seed and the index of the circuit, not on the worker.
+	# @return the result of the simulation.
+	##
+	def simulateBatchItem(self, item):
+		index, simulation, circuit, repetitions, seed = item
+		if seed is not None:
+			self.setSeed([seed, index])
+		return self.circuitSimulation(simulation, len(circuit), circuit, repetitions)
 
-			while numberOfGates > 0:
-				lane.append(circuit[qubitLanes-1][counter])
-				counter += 1
-				numberOfGates -= 1
-			
-			if simulation == "truth table":
-				self.result[qubitLanes-1].append(self.tableSim.simulateLane(lane))
-			elif simulation == "matrix":
-				self.result[qubitLanes-1].append(self.matSim.simulateLane(lane))
-			
-			qubitLanes -= 1
-		
-		return self.result
+	##
+	# Method to simulate many whole circuits in worker processes. The results are yielded as soon as they are ready, in the order of the circuits.
+	# @param circuits
+	# A list of circuits, the number of Qubits of each is its number of lanes.
+	# @param simulation
+	# The simulator used for all circuits, see circuitSimulation.
+	# @param workers
+	# The number of worker processes. None for the number of cores, 1 to simulate in this Simulator.
+	# @param repetitions
+	# The number of shots of every circuit, see circuitSimulation.
+	# @param seed
+	# A seed making the shots of the batch reproducible. None for random shots. In this Simulator it is reseeded for every circuit.
+	# @param chunkSize
+	# The number of circuits sent to a worker at once. None to split the batch into CHUNKS_PER_WORKER chunks per worker.
+	# @return a generator of the results.
+	##
+	def streamBatch(self, circuits, simulation, workers=None, repetitions=None, seed=None, chunkSize=None):
+		if workers is None:
+			workers = os.cpu_count() or 1
+		items = [(index, simulation, circuit, repetitions, seed) for index, circuit in enumerate(circuits)]
+
+		if workers == 1 or len(items) <= 1:
+			for item in items:
+				yield self.simulateBatchItem(item)
+			return
+
+		settings = self.batchSettings()
+
+		from concurrent.futures import ProcessPoolExecutor
+		if chunkSize is None:
+			chunkSize = max(1, len(items) // (workers * CHUNKS_PER_WORKER))
+		with ProcessPoolExecutor(max_workers=workers, initializer=initializeBatchWorker, initargs=(settings,)) as executor:
+			for result in executor.map(simulateBatchItem, items, chunksize=chunkSize):
+				yield result
+
+	##
+	# Method to simulate many whole circuits in worker processes.
+	# @param circuits
+	# A list of circuits, the number of Qubits of each is its number of lanes.
+	# @param simulation
+	# The simulator used for all circuits, see circuitSimulation.
+	# @param workers
+	# The number of worker processes. None for the number of cores, 1 to simulate in this Simulator.
+	# @param repetitions
+	# The number of shots of every circuit, see circuitSimulation.
+	# @param seed
+	# A seed making the shots of the batch reproducible. None for random shots.
+	# @param chunkSize
+	# The number of circuits sent to a worker at once. None to choose it from the size of the batch.
+	# @return a list of the results in the order of the circuits.
+	##
+	def simulateBatch(self, circuits, simulation, workers=None, repetitions=None, seed=None, chunkSize=None):
+		return list(self.streamBatch(circuits, simulation, workers, repetitions, seed, chunkSize))
@@ -0,0 +1,227 @@
+##
+# @file sparseCircuit.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing a circuit model storing only the gates of a circuit, so its depth and width are unbounded and empty cells cost nothing.
+#
+##
+
+from circuitCompiler import CircuitCompiler, singleQubitOpcodes, multiQubitOpcodes, FUSED
+
+## names of the cells of every multi qubit gate in the grid of the GUI, (cells of the targets, cells of the controls).
+multiQubitCells = {"CNot Gate": (("CNot Gate",), ("Control",)),
+                   "Swap Gate": (("Swap Gate", "Swap Gate"), ()),
+                   "Toffoli Gate": (("Toffoli Gate",), ("Toffoli1", "Toffoli2")),
+                   "Fredkin Gate": (("Fredkin1", "Fredkin2"), ("Fredkin Gate",)),
+                   "Deutsch Oracle": (("Deutsch Oracle",), ("Deutsch OracleC",))}
+
+## multi qubit gates whose qubits are found by their marker cells in the grid, only one of each can be placed in a column.
+markedGates = ("Toffoli Gate", "Fredkin Gate", "Deutsch Oracle")
+
+##
+# @class Operation
+# @brief One gate of a SparseCircuit with the lanes it acts on and the column it is placed in.
+##
+class Operation(object):
+
+    __slots__ = ("gate", "targets", "controls", "position")
+
+    ##
+    # init method storing the gate.
+    # @param gate
+    # The name of the gate as used in the GUI, e.g. "Hadamard Gate" or "CNot Gate", or a FusedGate.
+    # @param targets
+    # A tuple of the target lanes.
+    # @param controls
+    # A tuple of the control lanes.
+    # @param position
+    # The column of the gate.
+    ##
+    def __init__(self, gate, targets, controls, position):
+        self.gate = gate
+        self.targets = targets
+        self.controls = controls
+        self.position = position
+
+    ##
+    # All lanes of the gate, the controls followed by the targets.
+    ##
+    @property
+    def lanes(self):
+        return self.controls + self.targets
+
+    def __repr__(self):
+        return "Operation(" + repr(str(self.gate)) + ", " + repr(self.targets) + ", " + repr(self.controls) + ", " + repr(self.position) + ")"
+
+##
+# @class SparseCircuit
+# @brief A circuit stored as a list of operations with their targets, controls and column. Memory and construction time grow with the number of gates
+# only, the number of lanes and columns is not limited. The grid of gate names used by the GUI is one view of it, see toGrid and buildSparseCircuit.
+# Every operation is placed so that the grid view can express it, e.g. only one Toffoli Gate per column.
+##
+class SparseCircuit(object):
+
+    ##
+    # init method creating an empty circuit.
+    # @param numberOfQubits
+    # The number of lanes. It grows when a gate is added to a lane beyond it.
+    ##
+    def __init__(self, numberOfQubits=0):
+        self.numberOfQubits = numberOfQubits
+        self.numberOfPositions = 0
+        self.operations = []
+        ## operation occupying every used cell keyed by (lane, position).
+        self.cells = {}
+        ## operations of every used column keyed by its position.
+        self.columns = {}
+        ## first column after the last gate of every used lane.
+        self.laneEnds = {}
+
+    ##
+    # The number of lanes, like the length of the grid of the GUI.
+    ##
+    def __len__(self):
+        return self.numberOfQubits
+
+    ## Checks whether a gate can be placed in a column. Its cells must be empty and the grid view must be able to assign the cells of all multi qubit
+    # gates of the column to their gate: CNot Gates are paired with controls in the order of the lanes and Swap Gates with the next Swap Gate.
+    # @param gate
+    # The name of the gate.
+    # @param targets
+    # A tuple of the target lanes.
+    # @param controls
+    # A tuple of the control lanes.
+    # @param position
+    # The column.
+    # @return Returns an error message or None if the gate fits.
+    ##
+    def checkPlacement(self, gate, targets, controls, position):
+        for lane in controls + targets:
+            if (lane, position) in self.cells:
+                return "There already is a gate on q" + str(lane) + " position " + str(position) + "."
+
+        column = self.columns.get(position, [])
+        if gate in markedGates and any(operation.gate == gate for operation in column):
+            return "There already is a " + gate + " in position " + str(position) + "."
+        elif gate == "CNot Gate":
+            cnots = sorted([(operation.targets[0], operation.controls[0]) for operation in column if operation.gate == "CNot Gate"] + [(targets[0], controls[0])])
+            if [control for target, control in cnots] != sorted(control for target, control in cnots):
+                return "The CNot Gates in position " + str(position) + " would cross."
+        elif gate == "Swap Gate":
+            swaps = [tuple(sorted(operation.targets)) for operation in column if operation.gate == "Swap Gate"] + [tuple(sorted(targets))]
+            lanes = sorted(lane for swap in swaps for lane in swap)
+            if sorted(swaps) != [(lanes[index], lanes[index+1]) for index in range(0, len(lanes), 2)]:
+                return "The Swap Gates in position " + str(position) + " would overlap."
+        return None
+
+    ## Adds a gate to the circuit.
+    # @param gate
+    # The name of the gate as used in the GUI, e.g. "Hadamard Gate" or "CNot Gate", or a FusedGate.
+    # @param targets
+    # A list of the target lanes. A Fredkin Gate and a Swap Gate have two, all other gates one.
+    # @param controls
+    # A list of the control lanes. A Toffoli Gate has two, a CNot Gate, Fredkin Gate and Deutsch Oracle one.
+    # @param position
+    # The column of the gate. None to place it in the first column after the last gate on its lanes in which it fits.
+    # @return Returns the Operation.
+    ##
+    def addGate(self, gate, targets, controls=(), position=None):
+        targets = tuple(int(lane) for lane in targets)
+        controls = tuple(int(lane) for lane in controls)
+        if gate in multiQubitCells:
+            targetCells, controlCells = multiQubitCells[gate]
+        elif gate in singleQubitOpcodes or gate == "Fused Gate":
+            targetCells, controlCells = (gate,), ()
+        else:
+            raise ValueError("An unknown gate was found: " + str(gate) + ".")
+
+        lanes = controls + targets
+        if len(targets) != len(targetCells) or len(controls) != len(controlCells):
+            raise ValueError("The " + gate + " needs " + str(len(targetCells)) + " target and " + str(len(controlCells)) + " control qubits.")
+        if min(lanes) < 0 or len(set(lanes)) != len(lanes):
+            raise ValueError("The qubits of the " + gate + " must be different and not negative.")
+
+        if position is None:
+            position = max(self.laneEnds.get(lane, 0) for lane in lanes)
+            while self.checkPlacement(gate, targets, controls, position) is not None:
+                position += 1
+        else:
+            if position < 0:
+                raise ValueError("The position of a gate must not be negative.")
+            errorMessage = self.checkPlacement(gate, targets, controls, position)
+            if errorMessage is not None:
+                raise ValueError(errorMessage)
+
+        operation = Operation(gate, targets, controls, position)
+        self.operations.append(operation)
+        self.columns.setdefault(position, []).append(operation)
+        for lane in lanes:
+            self.cells[(lane, position)] = operation
+            self.laneEnds[lane] = max(self.laneEnds.get(lane, 0), position + 1)
+        self.numberOfQubits = max(self.numberOfQubits, max(lanes) + 1)
+        self.numberOfPositions = max(self.numberOfPositions, position + 1)
+
+        return operation
+
+    ## Returns the operations ordered by their column, operations of one column in the order they were added.
+    # @return Returns a list of Operations.
+    ##
+    def sortedOperations(self):
+        return sorted(self.operations, key=lambda operation: operation.position)
+
+    ## Builds a hashable description of the circuit, fused gates are described by their matrix.
+    # @return Returns a tuple of tuples (gate, targets, controls, position).
+    ##
+    def signature(self):
+        signature = [self.numberOfQubits]
+
+        for operation in self.sortedOperations():
+            gate = str(operation.gate)
+            if gate == "Fused Gate":
+                gate += ":" + operation.gate.matrix.tobytes().hex()
+            signature.append((gate, operation.targets, operation.controls, operation.position))
+
+        return tuple(signature)
+
+    ## Builds the grid view used by the GUI, a list of lanes with the name of the gate or marker of every cell and "0" for empty cells.
+    # @param numberOfPositions
+    # The minimal number of columns, e.g. the size of the GUI grid. The grid has more columns if the circuit needs them.
+    # @return Returns the circuit list.
+    ##
+    def toGrid(self, numberOfPositions=1):
+        grid = [["0"] * max(numberOfPositions, self.numberOfPositions, 1) for _ in range(self.numberOfQubits)]
+
+        for operation in self.operations:
+            if operation.gate in multiQubitCells:
+                targetCells, controlCells = multiQubitCells[operation.gate]
+            else:
+                targetCells, controlCells = (operation.gate,), ()
+            for lane, cell in zip(operation.targets + operation.controls, targetCells + controlCells):
+                grid[lane][operation.position] = cell
+
+        return grid
+
+## names of all gates indexed by their opcode, used to translate the operations of a grid back into gates.
+gateNames = dict((opcode, name) for name, opcode in list(singleQubitOpcodes.items()) + list(multiQubitOpcodes.items()))
+
+## Builds the sparse model of a circuit given as grid. The marker cells of multi qubit gates are resolved like in the CircuitCompiler, gaps and Identities are dropped.
+# @param circuit
+# A list representing the quantum circuit as generated from the GUI.
+# @return Returns the SparseCircuit.
+##
+def buildSparseCircuit(circuit):
+    sparseCircuit = SparseCircuit(len(circuit))
+    circuitCompiler = CircuitCompiler()
+
+    for position in range(len(circuit[0]) if circuit != [] else 0):
+        column = [lane[position] for lane in circuit]
+        for opcode, cycle, targets, controls, matrix in circuitCompiler.compileColumn(column, position, []):
+            targets = tuple(lane for lane in targets if lane >= 0)
+            controls = tuple(lane for lane in controls if lane >= 0)
+            gate = column[targets[0]] if opcode == FUSED else gateNames[opcode]
+            sparseCircuit.addGate(gate, targets, controls, position)
+
+    return sparseCircuit
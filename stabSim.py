@@ -0,0 +1,425 @@
+##
+# @file stabSim.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing a stabilizer simulator for circuits of Clifford gates based on the tableau of Aaronson and Gottesman.
+#
+##
+
+import numpy as np
+
+from gates import gateH, gateS
+from circuitCompiler import CircuitCompiler, PAULI_X, PAULI_Y, PAULI_Z, HADAMARD, S_GATE, MEASUREMENT, CNOT, SWAP, DEUTSCH_ORACLE, FUSED, cliffordOpcodes
+
+## Builds a key identifying a 2x2 matrix up to a global phase.
+# @param matrix
+# A 2x2 matrix.
+# @return Returns a hashable key.
+##
+def phaseFreeKey(matrix):
+    matrix = np.asarray(matrix, dtype=complex)
+    first = matrix.flat[np.flatnonzero(np.abs(matrix) > 1e-9)[0]]
+    #adding 0 turns -0.0 into 0.0
+    return tuple(np.round(matrix * abs(first) / first, 6).flatten() + 0)
+
+## Enumerates the 24 single qubit Clifford gates as sequences of H and S Gates, so fused Clifford gates can be applied to the tableau.
+# @return Returns a dictionary mapping the key of every Clifford matrix to the sequence of opcodes producing it.
+##
+def buildSingleQubitCliffords():
+    identity = np.eye(2, dtype=complex)
+    cliffords = {phaseFreeKey(identity): ()}
+    queue = [(identity, ())]
+
+    while queue:
+        matrix, sequence = queue.pop(0)
+        for opcode, gate in ((HADAMARD, gateH), (S_GATE, gateS)):
+            product = np.matmul(gate, matrix)
+            key = phaseFreeKey(product)
+            if key not in cliffords:
+                cliffords[key] = sequence + (opcode,)
+                queue.append((product, sequence + (opcode,)))
+
+    return cliffords
+
+## sequences of H and S Gates of all single qubit Clifford gates keyed by their matrix.
+singleQubitCliffords = buildSingleQubitCliffords()
+
+##
+# @class StabilizerTableau
+# @brief The tableau of a stabilizer state of n qubits. Rows 0 to n-1 are the destabilizers, rows n to 2n-1 the stabilizers. The x and z bits of every qubit
+# are stored as one column packed along the rows, so a gate only touches the packed columns of its qubits.
+##
+class StabilizerTableau(object):
+
+    ##
+    # init method building the tableau of the state |0...0>.
+    # @param numberOfQubits
+    # The number of Qubits of the register.
+    ##
+    def __init__(self, numberOfQubits):
+        self.numberOfQubits = numberOfQubits
+        self.numberOfRows = 2 * numberOfQubits
+        numberOfBytes = (self.numberOfRows + 7) // 8
+        ## x bits, row i of qubit q is bit i of x[q]
+        self.x = np.zeros((numberOfQubits, numberOfBytes), dtype=np.uint8)
+        ## z bits, packed like x
+        self.z = np.zeros((numberOfQubits, numberOfBytes), dtype=np.uint8)
+        ## phase bits of all rows, 1 for a sign of -1
+        self.r = np.zeros(numberOfBytes, dtype=np.uint8)
+
+        for qubit in range(numberOfQubits):
+            self.setBit(self.x[qubit], qubit, 1)
+            self.setBit(self.z[qubit], numberOfQubits + qubit, 1)
+
+        stabilizerRows = np.zeros(self.numberOfRows, dtype=np.uint8)
+        stabilizerRows[numberOfQubits:] = 1
+        ## packed mask of the stabilizer rows
+        self.stabilizerMask = np.packbits(stabilizerRows, bitorder="little")
+
+    ## Returns a copy of the tableau.
+    # @return Returns the new StabilizerTableau.
+    ##
+    def copy(self):
+        tableau = StabilizerTableau.__new__(StabilizerTableau)
+        tableau.numberOfQubits = self.numberOfQubits
+        tableau.numberOfRows = self.numberOfRows
+        tableau.x = self.x.copy()
+        tableau.z = self.z.copy()
+        tableau.r = self.r.copy()
+        tableau.stabilizerMask = self.stabilizerMask
+        return tableau
+
+    ## Reads one bit of a packed column.
+    # @param column
+    # A packed column.
+    # @param row
+    # The number of the row.
+    # @return Returns 0 or 1.
+    ##
+    def getBit(self, column, row):
+        return (int(column[row >> 3]) >> (row & 7)) & 1
+
+    ## Writes one bit of a packed column.
+    # @param column
+    # A packed column.
+    # @param row
+    # The number of the row.
+    # @param value
+    # 0 or 1.
+    ##
+    def setBit(self, column, row, value):
+        column[row >> 3] = (int(column[row >> 3]) & ~(1 << (row & 7))) | (value << (row & 7))
+
+    ## Reads a whole row of the tableau.
+    # @param row
+    # The number of the row.
+    # @return Returns the x bits and z bits of all qubits as numpy uint8 arrays and the phase bit.
+    ##
+    def getRow(self, row):
+        shift = row & 7
+        return (self.x[:, row >> 3] >> shift) & 1, (self.z[:, row >> 3] >> shift) & 1, self.getBit(self.r, row)
+
+    ## Writes a whole row of the tableau.
+    # @param row
+    # The number of the row.
+    # @param xRow
+    # The x bits of all qubits.
+    # @param zRow
+    # The z bits of all qubits.
+    # @param phase
+    # The phase bit.
+    ##
+    def setRow(self, row, xRow, zRow, phase):
+        shift = row & 7
+        keep = np.uint8(~(1 << shift) & 0xFF)
+        self.x[:, row >> 3] = (self.x[:, row >> 3] & keep) | (np.asarray(xRow, dtype=np.uint8) << shift)
+        self.z[:, row >> 3] = (self.z[:, row >> 3] & keep) | (np.asarray(zRow, dtype=np.uint8) << shift)
+        self.setBit(self.r, row, phase)
+
+    ## Applies a Hadamard Gate.
+    # @param qubit
+    # The lane of the gate.
+    ##
+    def applyH(self, qubit):
+        self.r ^= self.x[qubit] & self.z[qubit]
+        self.x[qubit], self.z[qubit] = self.z[qubit].copy(), self.x[qubit].copy()
+
+    ## Applies a S Gate.
+    # @param qubit
+    # The lane of the gate.
+    ##
+    def applyS(self, qubit):
+        self.r ^= self.x[qubit] & self.z[qubit]
+        self.z[qubit] ^= self.x[qubit]
+
+    ## Applies a Pauli-X-Gate.
+    # @param qubit
+    # The lane of the gate.
+    ##
+    def applyX(self, qubit):
+        self.r ^= self.z[qubit]
+
+    ## Applies a Pauli-Y-Gate.
+    # @param qubit
+    # The lane of the gate.
+    ##
+    def applyY(self, qubit):
+        self.r ^= self.x[qubit] ^ self.z[qubit]
+
+    ## Applies a Pauli-Z-Gate.
+    # @param qubit
+    # The lane of the gate.
+    ##
+    def applyZ(self, qubit):
+        self.r ^= self.x[qubit]
+
+    ## Applies a CNot Gate.
+    # @param control
+    # The lane of the control qubit.
+    # @param target
+    # The lane of the target qubit.
+    ##
+    def applyCnot(self, control, target):
+        self.r ^= self.x[control] & self.z[target] & ~(self.x[target] ^ self.z[control])
+        self.x[target] ^= self.x[control]
+        self.z[control] ^= self.z[target]
+
+    ## Applies a Swap Gate.
+    # @param first
+    # The lane of the first qubit.
+    # @param second
+    # The lane of the second qubit.
+    ##
+    def applySwap(self, first, second):
+        self.x[[first, second]] = self.x[[second, first]]
+        self.z[[first, second]] = self.z[[second, first]]
+
+    ## Multiplies the Pauli operator of one row into all rows selected by a mask, the rowsum of Aaronson and Gottesman for many rows at once.
+    # The exponent of i of every product is the sum of +1 and -1 contributions of all qubits the row acts on.
+    # @param mask
+    # A packed column selecting the rows that are multiplied.
+    # @param row
+    # The number of the row multiplied into them.
+    ##
+    def multiplyRows(self, mask, row):
+        xRow, zRow, phase = self.getRow(row)
+        qubits = np.flatnonzero(xRow | zRow)
+        x, z = self.x[qubits], self.z[qubits]
+        #spread the bits of the row over whole bytes to combine them with the packed columns
+        xBits = (xRow[qubits] * 0xFF).astype(np.uint8)[:, np.newaxis]
+        zBits = (zRow[qubits] * 0xFF).astype(np.uint8)[:, np.newaxis]
+
+        plus = (xBits & zBits & z & ~x) | (xBits & ~zBits & z & x) | (~xBits & zBits & x & ~z)
+        minus = (xBits & zBits & x & ~z) | (xBits & ~zBits & z & ~x) | (~xBits & zBits & x & z)
+        exponent = np.sum(np.unpackbits(plus, axis=1, count=self.numberOfRows, bitorder="little"), axis=0, dtype=np.int64)
+        exponent -= np.sum(np.unpackbits(minus, axis=1, count=self.numberOfRows, bitorder="little"), axis=0, dtype=np.int64)
+
+        #the exponent 2*r_h + 2*r_row + sum is 0 or 2, its high bit is the new phase
+        newPhase = np.packbits(((exponent % 4) >> 1).astype(np.uint8), bitorder="little") ^ self.r ^ np.uint8(0xFF * phase)
+        self.r = (self.r & ~mask) | (newPhase & mask)
+        self.x[qubits] = x ^ (mask & xBits)
+        self.z[qubits] = z ^ (mask & zBits)
+
+    ## Measures one qubit in the computational basis.
+    # @param qubit
+    # The lane of the measured qubit.
+    # @param chooseOutcome
+    # A function returning 0 or 1, called if the outcome is random.
+    # @return Returns the outcome and whether it was random.
+    ##
+    def measure(self, qubit, chooseOutcome):
+        candidates = np.unpackbits(self.x[qubit] & self.stabilizerMask, count=self.numberOfRows, bitorder="little")
+
+        if np.any(candidates):
+            #a stabilizer anticommutes with Z, the outcome is random
+            row = int(np.argmax(candidates))
+            mask = self.x[qubit].copy()
+            self.setBit(mask, row, 0)
+            self.multiplyRows(mask, row)
+
+            xRow, zRow, phase = self.getRow(row)
+            self.setRow(row - self.numberOfQubits, xRow, zRow, phase)
+            outcome = chooseOutcome()
+            zRow = np.zeros(self.numberOfQubits, dtype=np.uint8)
+            zRow[qubit] = 1
+            self.setRow(row, np.zeros(self.numberOfQubits, dtype=np.uint8), zRow, outcome)
+            return outcome, True
+
+        #the outcome is the sign of the product of the stabilizers selected by the destabilizers anticommuting with Z
+        xSum = np.zeros(self.numberOfQubits, dtype=np.int64)
+        zSum = np.zeros(self.numberOfQubits, dtype=np.int64)
+        exponent = 0
+        for row in np.flatnonzero(np.unpackbits(self.x[qubit], count=self.numberOfQubits, bitorder="little")):
+            xRow, zRow, phase = self.getRow(int(row) + self.numberOfQubits)
+            xRow, zRow = xRow.astype(np.int64), zRow.astype(np.int64)
+            g = np.where(xRow & zRow, zSum - xSum, np.where(xRow, zSum * (2 * xSum - 1), np.where(zRow, xSum * (1 - 2 * zSum), 0)))
+            exponent = (exponent + 2 * phase + int(np.sum(g))) % 4
+            xSum ^= xRow
+            zSum ^= zRow
+
+        return exponent // 2, False
+
+    ## Lists the stabilizer generators as Pauli strings.
+    # @return Returns a list of strings like "+XZ", the first letter belongs to q0.
+    ##
+    def stabilizerStrings(self):
+        paulis = np.array(["I", "X", "Z", "Y"])
+        strings = []
+
+        for row in range(self.numberOfQubits, self.numberOfRows):
+            xRow, zRow, phase = self.getRow(row)
+            strings.append(("-" if phase else "+") + "".join(paulis[xRow + 2 * zRow]))
+
+        return strings
+
+##
+# @class StabSim
+# @brief Simulate circuits that only contain Clifford gates in polynomial time with a StabilizerTableau.
+##
+class StabSim(object):
+
+    ##
+    # init method setting the random number generator.
+    # @param rng
+    # A numpy Generator for measurements and Deutsch Oracles. None to create one with a random seed.
+    ##
+    def __init__(self, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+        self.rng = rng
+
+    ## Checks whether a circuit can be simulated with a tableau. T Gates, Toffoli Gates, Fredkin Gates and fused gates outside of the Clifford group can not.
+    # @param compiledCircuit
+    # The CompiledCircuit to check.
+    # @return Returns True if all gates are Clifford gates.
+    ##
+    def isClifford(self, compiledCircuit):
+        for opcode, qubits, matrix in compiledCircuit.instructions:
+            if opcode == FUSED:
+                if phaseFreeKey(matrix) not in singleQubitCliffords:
+                    return False
+            elif opcode not in cliffordOpcodes:
+                return False
+
+        return True
+
+    ## Applies one single qubit gate to the tableau.
+    # @param tableau
+    # The StabilizerTableau.
+    # @param opcode
+    # The opcode of the gate.
+    # @param qubit
+    # The lane of the gate.
+    ##
+    def applySingleQubitGate(self, tableau, opcode, qubit):
+        if opcode == PAULI_X:
+            tableau.applyX(qubit)
+        elif opcode == PAULI_Y:
+            tableau.applyY(qubit)
+        elif opcode == PAULI_Z:
+            tableau.applyZ(qubit)
+        elif opcode == HADAMARD:
+            tableau.applyH(qubit)
+        elif opcode == S_GATE:
+            tableau.applyS(qubit)
+
+    ## Runs a compiled circuit on a tableau. Measurements collapse the state.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @return Returns the StabilizerTableau of the final state and the outcomes of all measurements keyed by (lane, position).
+    ##
+    def runCompiledCircuit(self, compiledCircuit):
+        if not self.isClifford(compiledCircuit):
+            raise ValueError("The circuit contains gates outside of the Clifford group. Circuit cant be simulated with the stabilizer simulator.")
+        tableau = StabilizerTableau(compiledCircuit.numberOfQubits)
+        measurements = {}
+
+        for position in range(compiledCircuit.numberOfPositions):
+            for opcode, qubits, matrix in compiledCircuit.positionInstructions(position):
+                if opcode == CNOT or (opcode == DEUTSCH_ORACLE and self.rng.integers(2) == 1):
+                    tableau.applyCnot(qubits[0], qubits[1])
+                elif opcode == SWAP:
+                    tableau.applySwap(qubits[0], qubits[1])
+                elif opcode == MEASUREMENT:
+                    measurements[(qubits[0], position)] = tableau.measure(qubits[0], lambda: int(self.rng.integers(2)))[0]
+                elif opcode == FUSED:
+                    for gate in singleQubitCliffords[phaseFreeKey(matrix)]:
+                        self.applySingleQubitGate(tableau, gate, qubits[0])
+                else:
+                    self.applySingleQubitGate(tableau, opcode, qubits[0])
+
+        return tableau, measurements
+
+    ## Simulate a compiled circuit and describe the final state by its stabilizers.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @return Returns a list of strings, one for every stabilizer generator of the final state.
+    ##
+    def simulateCompiledCircuit(self, compiledCircuit):
+        tableau, measurements = self.runCompiledCircuit(compiledCircuit)
+
+        return ["Stabilizer " + str(row) + " :  " + stabilizer for row, stabilizer in enumerate(tableau.stabilizerStrings())]
+
+    ## Simulate a circuit and describe the final state by its stabilizers.
+    # @param numberOfQubits
+    # The number of Qubits of the circuit.
+    # @param circuit
+    # A list containing the quantum circuit as generated in the gui, without gaps.
+    # @return Returns the result as returned by simulateCompiledCircuit.
+    ##
+    def simulateCircuit(self, numberOfQubits, circuit):
+        return self.simulateCompiledCircuit(CircuitCompiler().compileCircuit(circuit))
+
+    ## Samples measurements of all qubits of a stabilizer state. The outcomes are uniformly distributed over x0 + span(x parts of the stabilizers),
+    # so after one measurement of x0 all shots are drawn as random combinations of a basis of that span.
+    # @param tableau
+    # The StabilizerTableau of the state.
+    # @param repetitions
+    # The number of shots.
+    # @return Returns the shots as a bit-packed numpy uint8 array of shape (repetitions, ceil(numberOfQubits / 8)).
+    ##
+    def sampleTableau(self, tableau, repetitions):
+        numberOfQubits = tableau.numberOfQubits
+        measuredTableau = tableau.copy()
+        origin = np.array([measuredTableau.measure(qubit, lambda: 0)[0] for qubit in range(numberOfQubits)], dtype=np.uint8)
+
+        #row reduce the x parts of the stabilizers to a basis of the span
+        xParts = np.unpackbits(tableau.x, axis=1, count=tableau.numberOfRows, bitorder="little")[:, numberOfQubits:].T.copy()
+        basis = []
+        for qubit in range(numberOfQubits):
+            pivots = np.flatnonzero(xParts[:, qubit])
+            if len(pivots) == 0:
+                continue
+            pivot = xParts[pivots[0]].copy()
+            xParts[pivots] ^= pivot
+            basis.append(pivot)
+
+        shots = np.repeat(np.packbits(origin)[np.newaxis, :], repetitions, axis=0)
+        for vector in basis:
+            chosen = self.rng.integers(0, 2, size=(repetitions, 1), dtype=np.uint8)
+            shots ^= chosen * np.packbits(vector)
+
+        return shots
+
+    ## Simulate a compiled circuit and measure all qubits at its end. Circuits with measurements inside are run once per shot, because every run may collapse differently.
+    # @param compiledCircuit
+    # The CompiledCircuit of the quantum circuit.
+    # @param repetitions
+    # The number of shots.
+    # @return Returns the shots as returned by sampleTableau.
+    ##
+    def sampleCompiledCircuit(self, compiledCircuit, repetitions):
+        isRandom = any(opcode == MEASUREMENT or opcode == DEUTSCH_ORACLE for opcode, qubits, matrix in compiledCircuit.instructions)
+
+        if isRandom:
+            shots = np.zeros((repetitions, (compiledCircuit.numberOfQubits + 7) // 8), dtype=np.uint8)
+            for shot in range(repetitions):
+                tableau = self.runCompiledCircuit(compiledCircuit)[0]
+                shots[shot] = np.packbits([tableau.measure(qubit, lambda: int(self.rng.integers(2)))[0] for qubit in range(compiledCircuit.numberOfQubits)])
+        else:
+            shots = self.sampleTableau(self.runCompiledCircuit(compiledCircuit)[0], repetitions)
+
+        return shots
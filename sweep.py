@@ -0,0 +1,156 @@
+##
+# @file sweep.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing parameter sweeps simulating all variants of a randomly chosen circuit in one pass.
+#
+##
+
+import numpy as np
+
+from matSim import MatSim
+from circuitCompiler import CircuitCompiler, MEASUREMENT, DEUTSCH_ORACLE
+from algorithms import Algorithms
+
+##
+# @class Sweep
+# @brief Simulate the variants of circuits with random choices, the oracles of Deutsch and the bit sequences of Grover, together. The state vectors of all variants
+# are stacked along a batch axis and every cycle is applied once to all variants sharing it.
+##
+class Sweep(object):
+
+    ##
+    # init method creating the random number generator used to sample variants.
+    # @param seed
+    # A seed to make sampled variants reproducible. None for a random seed.
+    ##
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.matSim = MatSim(rng=self.rng)
+        self.circuitCompiler = CircuitCompiler()
+        self.algorithms = Algorithms()
+
+    ## Lists all combinations of choices.
+    # @param numberOfChoices
+    # The number of binary choices.
+    # @return Returns a numpy array of shape (2^numberOfChoices, numberOfChoices) containing 0 or 1.
+    ##
+    def enumerateChoices(self, numberOfChoices):
+        return (np.arange(2**numberOfChoices)[:, np.newaxis] >> np.arange(numberOfChoices - 1, -1, -1)) & 1
+
+    ## Draws combinations of choices.
+    # @param numberOfChoices
+    # The number of binary choices.
+    # @param numberOfSamples
+    # The number of drawn combinations.
+    # @return Returns a numpy array of shape (numberOfSamples, numberOfChoices) containing 0 or 1.
+    ##
+    def sampleChoices(self, numberOfChoices, numberOfSamples):
+        return self.rng.integers(0, 2, size=(numberOfSamples, numberOfChoices))
+
+    ## Simulates variants of circuits with the same number of lanes and positions in one pass. In every cycle the variants are grouped by their operations
+    # and every group is updated with one application of its gates to its slice of the batch.
+    # @param circuits
+    # A list with the circuit of every variant.
+    # @param oracleChoices
+    # A list with the choices of every variant, one entry for each Deutsch Oracle in the order of the circuit: 1 if the oracle is balanced, 0 if it is constant.
+    # @return Returns a numpy array of shape (variants, 2^numberOfQubits) with the probabilities of the final states.
+    ##
+    def simulateVariants(self, circuits, oracleChoices):
+        compiledCircuits = []
+        compiled = {}
+        for circuit in circuits:
+            key = tuple(tuple(lane) for lane in circuit)
+            if key not in compiled:
+                compiled[key] = self.circuitCompiler.compileCircuit(self.matSim.fillGapsInCircuit(circuit))
+            compiledCircuits.append(compiled[key])
+
+        numberOfQubits = compiledCircuits[0].numberOfQubits
+        numberOfPositions = compiledCircuits[0].numberOfPositions
+        if any(compiledCircuit.numberOfQubits != numberOfQubits or compiledCircuit.numberOfPositions != numberOfPositions for compiledCircuit in compiledCircuits):
+            raise ValueError("All variants of a sweep need the same number of lanes and positions.")
+
+        numberOfVariants = len(compiledCircuits)
+        self.matSim.checkMemoryRequirement(numberOfVariants * 2**numberOfQubits, 2)
+        stateVectors = np.zeros((numberOfVariants,) + (2,) * numberOfQubits, dtype=self.matSim.dtype)
+        stateVectors[(slice(None),) + (0,) * numberOfQubits] = 1
+        oracleCounters = [0] * numberOfVariants
+
+        for position in range(numberOfPositions):
+            groups = {}
+            for variant in range(numberOfVariants):
+                operations = []
+                for opcode, qubits, matrix in compiledCircuits[variant].positionInstructions(position):
+                    if opcode == DEUTSCH_ORACLE:
+                        choice = oracleChoices[variant][oracleCounters[variant]]
+                        oracleCounters[variant] += 1
+                        if choice == 0:
+                            continue
+                    elif opcode == MEASUREMENT:
+                        continue
+                    operations.append((opcode, qubits, matrix))
+                if operations != []:
+                    signature = self.matSim.buildOneCycleSignature(numberOfQubits, operations)
+                    groups.setdefault(signature, (operations, []))[1].append(variant)
+
+            for operations, variants in groups.values():
+                #the batch axis comes first, the axis of lane q is q+1
+                if len(variants) == numberOfVariants:
+                    for opcode, qubits, matrix in operations:
+                        stateVectors = self.matSim.applyGate(stateVectors, matrix, [qubit + 1 for qubit in qubits])
+                else:
+                    group = stateVectors[variants]
+                    for opcode, qubits, matrix in operations:
+                        group = self.matSim.applyGate(group, matrix, [qubit + 1 for qubit in qubits])
+                    stateVectors[variants] = group
+
+        return np.abs(np.reshape(stateVectors, (numberOfVariants, -1)))**2
+
+    ## Simulates a circuit for every choice of its Deutsch Oracles.
+    # @param circuit
+    # A list containing the quantum circuit.
+    # @param numberOfSamples
+    # The number of variants drawn from the random number generator. None to simulate every combination once.
+    # @return Returns the choices of every variant as returned by enumerateChoices and the probabilities as returned by simulateVariants.
+    ##
+    def sweepOracles(self, circuit, numberOfSamples=None):
+        numberOfOracles = sum(gate == "Deutsch Oracle" for lane in circuit for gate in lane)
+        if numberOfSamples is None:
+            choices = self.enumerateChoices(numberOfOracles)
+        else:
+            choices = self.sampleChoices(numberOfOracles, numberOfSamples)
+
+        return choices, self.simulateVariants([circuit] * len(choices), choices)
+
+    ## Simulates the algorithm of Deutsch for a constant and a balanced oracle, or for sampled oracles.
+    # @param numberOfSamples
+    # The number of variants drawn from the random number generator. None to simulate both oracles once.
+    # @return Returns the choices and probabilities as returned by sweepOracles.
+    ##
+    def sweepDeutsch(self, numberOfSamples=None):
+        return self.sweepOracles(self.algorithms.buildDeutschCircuit(), numberOfSamples)
+
+    ## Simulates the algorithm of Grover for every searched bit sequence, or for sampled bit sequences.
+    # @param numberOfSamples
+    # The number of bit sequences drawn from the random number generator. None to simulate all four once.
+    # @return Returns the bit sequences as a numpy array of shape (variants, 2) and the probabilities as returned by simulateVariants.
+    ##
+    def sweepGrover(self, numberOfSamples=None):
+        if numberOfSamples is None:
+            bitSequences = self.enumerateChoices(2)
+        else:
+            bitSequences = self.sampleChoices(2, numberOfSamples)
+        circuits = [self.algorithms.buildGroverCircuit(bitSequence) for bitSequence in bitSequences]
+
+        return bitSequences, self.simulateVariants(circuits, [()] * len(circuits))
+
+    ## Counts how often every distinct outcome of a sweep occurred.
+    # @param probabilities
+    # The probabilities as returned by simulateVariants.
+    # @return Returns the distinct rows of probabilities and the number of variants with each of them.
+    ##
+    def countOutcomes(self, probabilities):
+        return np.unique(np.round(probabilities, 6), axis=0, return_counts=True)
@@ -10,6 +10,8 @@
 ##
 
 import math
+
+from circuitCompiler import CircuitCompiler, PAULI_X, PAULI_Y, PAULI_Z, HADAMARD, S_GATE, T_GATE, MEASUREMENT, FUSED
 	
 ##
 # @class TableSim
@@ -108,39 +110,54 @@ class TableSim(object):
 		
 		return qubitState
 
+	## Method to simulate a gate that was fused out of several single qubit gates. There is no truth table for it so the state is multiplied with its matrix.
+	# @param qubitState
+	# A list containing two values representing the state of the qubit.
+	# @param matrix
+	# The 2x2 matrix of the fused gate.
+	# @return The state of the qubit after the manipulation.
+	def GateFused(self, qubitState, matrix):
+		alpha = matrix[0][0]*qubitState[0] + matrix[0][1]*qubitState[1]
+		beta = matrix[1][0]*qubitState[0] + matrix[1][1]*qubitState[1]
+		qubitState = [alpha, beta]
+
+		return qubitState
+
 	## Method to simulate a single lane. Calling the corresponding method for each gate.
 	# @param lane
 	# A list containing all gates on a single lane.
 	# @return The state of the qubit after the simulation.
 	def simulateLane(self, lane):
-		counter = 0
+		return self.simulateCompiledLane(CircuitCompiler().compileCircuit([lane]), 0)
+
+	## Method to simulate a single lane of a compiled circuit. Calling the corresponding method for each opcode.
+	# @param compiledCircuit
+	# The CompiledCircuit containing the lane.
+	# @param lane
+	# The number of the lane that is simulated.
+	# @return The state of the qubit after the simulation.
+	def simulateCompiledLane(self, compiledCircuit, lane):
 		#alpha, beta
 		qubitState = [1, 0]
-		# The number of gates on the lane.
-		numberOfGates = len(lane)
 
-		while numberOfGates > 0:
-			if lane[counter] == "Pauli-X-Gate":
+		for opcode, qubits, matrix in compiledCircuit.laneInstructions(lane):
+			if opcode == PAULI_X:
 				qubitState = self.GateX(qubitState)
-			elif lane[counter] == "Pauli-Y-Gate":
+			elif opcode == PAULI_Y:
 				qubitState = self.GateY(qubitState)
-			elif lane[counter] == "Pauli-Z-Gate":
+			elif opcode == PAULI_Z:
 				qubitState = self.GateZ(qubitState)
-			elif lane[counter] == "Hadamard Gate":
+			elif opcode == HADAMARD:
 				qubitState = self.GateH(qubitState)
-			elif lane[counter] == "S Gate":
+			elif opcode == S_GATE:
 				qubitState = self.GateS(qubitState)
-			elif lane[counter] == "T Gate":
+			elif opcode == T_GATE:
 				qubitState = self.GateT(qubitState)
-			elif lane[counter] == "Identity":
-				pass
-			elif lane[counter] == "Measurement":
+			elif opcode == FUSED:
+				qubitState = self.GateFused(qubitState, matrix)
+			elif opcode == MEASUREMENT:
 				pass
 			else:
-				print(lane[counter])
-				raise ValueError("An unknown gate was found. Lane cant be simulated.")
-			counter += 1
-			#checked one gate so reduce number of remaining gates
-			numberOfGates -= 1
+				raise ValueError("A multi qubit gate was found. Lane cant be simulated.")
 
 		return qubitState
@@ -0,0 +1,174 @@
+##
+# @file tracing.py
+#
+# @author Janis Mohr
+#
+# @date 2018
+#
+# @brief File containing the tracer recording the time of the stages of a simulation and counters like built matrices and floating point operations.
+#
+##
+
+import os
+import json
+import time
+import threading
+import tracemalloc
+
+##
+# @class NoSpan
+# @brief The span returned while tracing is disabled. Entering and leaving it does nothing.
+##
+class NoSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+## the only NoSpan, returned for every span while tracing is disabled.
+noSpan = NoSpan()
+
+##
+# @class Span
+# @brief A stage of a simulation, e.g. compiling a circuit or multiplying the matrix of one cycle. Its duration is recorded when it is left.
+##
+class Span(object):
+
+    ##
+    # init method storing the name of the stage.
+    # @param tracer
+    # The Tracer recording the span.
+    # @param name
+    # The name of the stage.
+    # @param arguments
+    # A dictionary of values describing the span, e.g. the number of Qubits.
+    ##
+    def __init__(self, tracer, name, arguments):
+        self.tracer = tracer
+        self.name = name
+        self.arguments = arguments
+
+    def __enter__(self):
+        self.tracer.depth += 1
+        if self.tracer.trackMemory:
+            self.memoryBefore = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        end = time.perf_counter_ns()
+        self.tracer.depth -= 1
+        if self.tracer.trackMemory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.arguments["bytesAllocated"] = current - self.memoryBefore
+            #nested spans are part of their parent, only the outermost ones are added up
+            if self.tracer.depth == 0:
+                self.tracer.count("bytesAllocated", max(0, current - self.memoryBefore))
+            self.tracer.counters["peakMemory"] = max(self.tracer.counters.get("peakMemory", 0), peak)
+        self.tracer.events.append((self.name, self.start, end - self.start, threading.get_ident(), self.arguments))
+        return False
+
+##
+# @class Tracer
+# @brief Records spans and counters of simulations and exports them as JSON or in the Chrome trace format. While it is disabled, span returns a shared
+# object doing nothing and count returns at once, so tracing costs nothing but a function call.
+##
+class Tracer(object):
+
+    ##
+    # init method creating a disabled tracer.
+    ##
+    def __init__(self):
+        self.enabled = False
+        self.trackMemory = False
+        ## number of spans currently entered
+        self.depth = 0
+        ## recorded spans as tuples (name, start in ns, duration in ns, thread, arguments)
+        self.events = []
+        self.counters = {}
+
+    ## Starts recording.
+    # @param trackMemory
+    # Record the bytes allocated by every span and the peak memory with tracemalloc. This slows down the simulation considerably.
+    ##
+    def enable(self, trackMemory=False):
+        self.enabled = True
+        self.trackMemory = trackMemory
+        if trackMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    ## Stops recording. The recorded spans and counters are kept.
+    ##
+    def disable(self):
+        self.enabled = False
+        if self.trackMemory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trackMemory = False
+
+    ## Removes all recorded spans and counters.
+    ##
+    def reset(self):
+        self.events = []
+        self.counters = {}
+
+    ## Returns a context manager recording a stage.
+    # @param name
+    # The name of the stage.
+    # @param arguments
+    # Values describing the span, e.g. numberOfQubits=3.
+    # @return Returns a Span, or noSpan if tracing is disabled.
+    ##
+    def span(self, name, **arguments):
+        if not self.enabled:
+            return noSpan
+        return Span(self, name, arguments)
+
+    ## Adds to a counter.
+    # @param name
+    # The name of the counter, e.g. "flops".
+    # @param value
+    # The value added.
+    ##
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    ## Sums up the recorded spans per stage.
+    # @return Returns a dictionary mapping the name of every stage to its number of calls and total time in seconds.
+    ##
+    def summary(self):
+        stages = {}
+        for name, start, duration, thread, arguments in self.events:
+            stage = stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            stage["calls"] += 1
+            stage["seconds"] += duration / 1e9
+        return stages
+
+    ## Writes the spans, their summary and the counters to a JSON file.
+    # @param path
+    # The path of the file.
+    ##
+    def exportJson(self, path):
+        spans = [{"name": name, "start": start / 1e9, "seconds": duration / 1e9, "thread": thread, "arguments": arguments}
+                 for name, start, duration, thread, arguments in self.events]
+        with open(path, "w") as traceFile:
+            json.dump({"spans": spans, "summary": self.summary(), "counters": self.counters}, traceFile, indent=1, default=str)
+
+    ## Writes the spans and counters in the Chrome trace event format, which can be opened in chrome://tracing or Perfetto.
+    # @param path
+    # The path of the file.
+    ##
+    def exportChromeTrace(self, path):
+        processId = os.getpid()
+        traceEvents = [{"name": name, "ph": "X", "ts": start / 1000.0, "dur": duration / 1000.0, "pid": processId, "tid": thread, "args": arguments}
+                       for name, start, duration, thread, arguments in self.events]
+        if self.events:
+            end = max(start + duration for name, start, duration, thread, arguments in self.events)
+            traceEvents.append({"name": "counters", "ph": "C", "ts": end / 1000.0, "pid": processId, "args": self.counters})
+        with open(path, "w") as traceFile:
+            json.dump({"traceEvents": traceEvents, "displayTimeUnit": "ms"}, traceFile, default=str)
+
+## the tracer used by all simulators.
+tracer = Tracer()